@@ -211,8 +211,8 @@ class SortOrderPopup(PopupOptionList):
                 sort_by=cast(SortByOptions, event.option.id)
             )
 
-        # Refresh file list to apply the change
-        self.app.file_list.update_file_list(add_to_session=False)
+        # Re-sort the file list to apply the change
+        self.app.file_list.update_view()
 
         self.go_hide()
         self.button.update_icon()
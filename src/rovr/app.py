@@ -1,10 +1,9 @@
 import asyncio
 import shutil
-import threading
 from contextlib import suppress
 from io import TextIOWrapper
 from os import chdir, getcwd, path
-from time import perf_counter
+from time import monotonic, perf_counter
 from typing import Callable, Iterable
 
 from rich.console import Console, RenderableType
@@ -39,6 +38,8 @@ from rovr.action_buttons import (
     ZipButton,
 )
 from rovr.action_buttons.sort_order import SortOrderButton, SortOrderPopup
+from rovr.classes.change_watcher import create_change_watcher
+from rovr.classes.file_entry import FileEntry
 from rovr.components import SearchInput
 from rovr.components.popup_option_list import PopupOptionList
 from rovr.core import FileList, FileListContainer, PinnedSidebar, PreviewContainer
@@ -48,10 +49,13 @@ from rovr.functions import icons
 from rovr.functions.path import (
     dump_exc,
     ensure_existing_directory,
+    get_cwd_entry,
     get_filtered_dir_names,
     get_mounted_drives,
+    listing_cache,
     normalise,
 )
+from rovr.functions.preview_utils import preview_cache
 from rovr.functions.themes import get_custom_themes
 from rovr.header import HeaderArea
 from rovr.navigation_widgets import (
@@ -148,8 +152,10 @@ class Application(App, inherit_bindings=False):
 
         self._file_list_container = FileListContainer()
         self.file_list = self._file_list_container.filelist
-        # shutdown event for bg thread
-        self._shutdown_event = threading.Event()
+        # watcher for the bg thread, stopping it also shuts the thread down
+        self._change_watcher = create_change_watcher(
+            config["interface"]["change_watcher"]
+        )
         # cannot use self.clipboard, reserved for Textual's clipboard
         self.Clipboard = Clipboard(id="clipboard")
         if startup_path:
@@ -284,7 +290,7 @@ class Application(App, inherit_bindings=False):
         1 / 0
 
     def on_unmount(self) -> None:
-        self._shutdown_event.set()
+        self._change_watcher.stop()
 
     def action_focus_next(self) -> None:
         if config["interface"]["allow_tab_nav"]:
@@ -655,75 +661,111 @@ class Application(App, inherit_bindings=False):
 
     @work(thread=True)
     def watch_for_changes_and_update(self) -> None:
+        try:
+            self._watch_for_changes()
+        finally:
+            self._change_watcher.close()
+
+    def _watch_for_changes(self) -> None:
         cwd = getcwd()
         file_list: FileList = self.query_one(FileList)
-        pins_path = path.join(VAR_TO_DIR["CONFIG"], "pins.json")
+        preview: PreviewContainer = self.query_one(PreviewContainer)
+        config_dir = VAR_TO_DIR["CONFIG"]
+        pins_path = path.join(config_dir, "pins.json")
         pins_mtime = None
         with suppress(OSError):
             pins_mtime = path.getmtime(pins_path)
-        state_path = path.join(VAR_TO_DIR["CONFIG"], "state.toml")
+        state_path = path.join(config_dir, "state.toml")
         state_mtime = None
         with suppress(OSError):
             state_mtime = path.getmtime(state_path)
         drives = get_mounted_drives()
-        drive_update_every = int(config["interface"]["drive_watcher_frequency"])
-        count: int = -1
+        drive_update_every = config["interface"]["drive_watcher_frequency"]
+        # wake ups depend on file activity, so drives are checked by time instead
+        drives_checked = monotonic()
         style_available: bool = self.CUSTOM_STYLE_AVAILABLE
-        custom_style_path = path.join(VAR_TO_DIR["CONFIG"], "style.tcss")
+        custom_style_path = path.join(config_dir, "style.tcss")
+        # a change in the cwd that arrived while the file list was busy
+        cwd_changed: bool = False
+        # the names that changed in the cwd, or None to compare everything
+        cwd_changed_names: set[str] | None = set()
         while True:
-            for _ in range(4):
-                # essentially sleep 1 second, but with extra steps
-                if self._shutdown_event.wait(timeout=0.25):
-                    return
-                if self.return_code is not None:
-                    # fail safe if for any reason, the thread continues running after exit
-                    return
-            count += 1
-            if count >= drive_update_every:
-                count = 0
+            preview_folder = preview._current_file_path
+            if not (isinstance(preview_folder, str) and path.isdir(preview_folder)):
+                preview_folder = None
+            # the cwd may be the config dir, whose writes still have to be seen
+            watched = {config_dir: True}
+            watched.setdefault(cwd, False)
+            if preview_folder is not None:
+                watched.setdefault(preview_folder, False)
+            self._change_watcher.watch(watched)
+            # essentially sleep 1 second, but wakes up early for changes
+            changes = self._change_watcher.wait(timeout=1)
+            if changes is None or self.return_code is not None:
+                # fail safe if for any reason, the thread continues running after exit
+                return
+            check_drives = monotonic() - drives_checked >= drive_update_every
+            if check_drives:
+                drives_checked = monotonic()
+            if cwd in changes:
+                cwd_changed = True
+                names = changes[cwd]
+                if names is None or cwd_changed_names is None:
+                    cwd_changed_names = None
+                else:
+                    cwd_changed_names |= names
             new_cwd = getcwd()
             if not self.file_list.file_list_pause_check:
                 if not path.exists(new_cwd):
                     file_list.update_file_list(add_to_session=False)
                 elif cwd != new_cwd:
                     cwd = new_cwd
+                    # catch anything that changed before the new cwd was watched
+                    cwd_changed = True
+                    cwd_changed_names = None
                     continue
-                else:
-                    items = None
-                    with suppress(OSError):
-                        items = get_filtered_dir_names(
-                            cwd,
-                            config["interface"]["show_hidden_files"],
-                        )
-                    if items is not None and items != file_list.items_in_cwd:
-                        self.cd(cwd)
+                elif cwd_changed:
+                    self._apply_cwd_changes(file_list, cwd, cwd_changed_names)
+                    cwd_changed = False
+                    cwd_changed_names = set()
+            if (
+                preview_folder is not None
+                and preview_folder in changes
+                and preview_folder != cwd
+                and preview._current_file_path == preview_folder
+            ):
+                # the mtime check in show_preview skips it if nothing changed
+                self.call_from_thread(preview.show_preview, preview_folder)
+            config_changes = changes.get(config_dir, set())
             # check pins.json
-            new_mtime = None
             reload_called: bool = False
-            with suppress(OSError):
-                new_mtime = path.getmtime(pins_path)
-            if new_mtime != pins_mtime:
-                pins_mtime = new_mtime
-                if new_mtime is not None:
-                    # no, this doesn't need to be called from thread
-                    # this is _not_ a sync function, it is a worker
-                    # and workers run separate from a thread, so there
-                    # really is no issue here, thanks to any AI
-                    # models raising false issues on thread safety
-                    self.query_one(PinnedSidebar).reload_pins()
-                    reload_called = True
+            if config_changes is None or "pins.json" in config_changes:
+                new_mtime = None
+                with suppress(OSError):
+                    new_mtime = path.getmtime(pins_path)
+                if new_mtime != pins_mtime:
+                    pins_mtime = new_mtime
+                    if new_mtime is not None:
+                        # no, this doesn't need to be called from thread
+                        # this is _not_ a sync function, it is a worker
+                        # and workers run separate from a thread, so there
+                        # really is no issue here, thanks to any AI
+                        # models raising false issues on thread safety
+                        self.query_one(PinnedSidebar).reload_pins()
+                        reload_called = True
             # check state.toml
-            new_state_mtime = None
-            with suppress(OSError):
-                new_state_mtime = path.getmtime(state_path)
-            if new_state_mtime != state_mtime:
-                state_mtime = new_state_mtime
-                if new_state_mtime is not None:
-                    state_manager: StateManager = self.query_one(StateManager)
-                    self.app.call_from_thread(state_manager._load_state)
-                    self.app.call_from_thread(state_manager.restore_state)
+            if config_changes is None or "state.toml" in config_changes:
+                new_state_mtime = None
+                with suppress(OSError):
+                    new_state_mtime = path.getmtime(state_path)
+                if new_state_mtime != state_mtime:
+                    state_mtime = new_state_mtime
+                    if new_state_mtime is not None:
+                        state_manager: StateManager = self.query_one(StateManager)
+                        self.app.call_from_thread(state_manager._load_state)
+                        self.app.call_from_thread(state_manager.restore_state)
             # check drives
-            if count == 0 and not reload_called:
+            if check_drives and not reload_called:
                 try:
                     new_drives = get_mounted_drives()
                     if new_drives != drives:
@@ -735,7 +777,9 @@ class Application(App, inherit_bindings=False):
                         title="Change Watcher",
                         severity="warning",
                     )
-            if not self.CUSTOM_STYLE_AVAILABLE:
+            if not self.CUSTOM_STYLE_AVAILABLE and (
+                config_changes is None or "style.tcss" in config_changes
+            ):
                 if not style_available and path.exists(custom_style_path):
                     style_available = True
                     self.notify(
@@ -746,6 +790,37 @@ class Application(App, inherit_bindings=False):
                 elif not path.exists(custom_style_path):
                     style_available = False
 
+    def _apply_cwd_changes(
+        self, file_list: FileList, cwd: str, changed_names: set[str] | None
+    ) -> None:
+        """Work out what changed in the cwd, and update the file list in place.
+
+        Args:
+            file_list (FileList): The file list showing the cwd
+            cwd (str): The current working directory
+            changed_names (set[str] | None): The names that changed, or None to compare every name
+        """
+        # hidden items are tracked too, the file list hides them itself
+        listed = set(file_list.items_in_cwd)
+        removed: set[str] = set()
+        if changed_names is None:
+            try:
+                names = get_filtered_dir_names(cwd, True)
+            except OSError:
+                return
+            removed = listed - names
+            changed_names = names - listed
+        cwd = normalise(cwd)
+        added: list[FileEntry] = []
+        for name in changed_names:
+            entry = get_cwd_entry(cwd, name, True)
+            if entry is not None:
+                added.append(entry)
+            elif name in listed:
+                removed.add(name)
+        if added or removed:
+            self.call_from_thread(file_list.apply_changes, cwd, added, removed)
+
     @work(exclusive=True)
     async def on_resize(self, event: events.Resize) -> None:
         if (
@@ -930,9 +1005,14 @@ class Application(App, inherit_bindings=False):
         yield SystemCommand(
             "Reload File List",
             "Send a forceful reload of the file list, in case something goes wrong",
-            lambda: self.cd(getcwd()),
+            self._force_reload_file_list,
         )
 
+    def _force_reload_file_list(self) -> None:
+        listing_cache.invalidate()
+        preview_cache.invalidate()
+        self.cd(getcwd())
+
     @work
     async def _toggle_transparency(self) -> None:
         self.ansi_color = not self.ansi_color
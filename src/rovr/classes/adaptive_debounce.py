@@ -0,0 +1,60 @@
+import time
+
+# a highlight this long after the previous one is previewed straight away
+BURST_GAP = 0.2
+# how long to wait after a highlight while moving quickly, when it is learned
+MIN_DELAY = 0.05
+MAX_DELAY = 0.3
+# how many repeat intervals to wait for before the highlight counts as resting
+REPEATS_TO_WAIT = 2
+# how much each new interval moves the learned one
+SMOOTHING = 0.3
+
+
+class AdaptiveDebounce:
+    """Works out how long to wait before acting on an event that may repeat quickly.
+
+    Events that come after a pause are acted on straight away, so a single
+    key press is as quick as without debouncing. Once events come in a
+    burst, like a held down key, the time between them is averaged, and each
+    one waits a couple of those intervals, so it is only acted on once the
+    burst has stopped.
+
+    Attributes:
+        delay (float): How long to wait in a burst, in seconds. 0 learns it
+            from how quickly the events come.
+    """
+
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self._last: float | None = None
+        self._interval: float | None = None
+
+    @property
+    def interval(self) -> float | None:
+        """The learned time between events in a burst, in seconds."""
+        return self._interval
+
+    def delay_for(self, now: float | None = None) -> float:
+        """Record an event, and get how long to wait before acting on it.
+
+        Args:
+            now (float | None): When the event happened, from `time.monotonic`
+
+        Returns:
+            float: How long to wait, in seconds. 0 means to act on it now.
+        """
+        if now is None:
+            now = time.monotonic()
+        gap = None if self._last is None else now - self._last
+        self._last = now
+        if gap is None or gap > BURST_GAP:
+            return 0
+        self._interval = (
+            gap
+            if self._interval is None
+            else self._interval + (gap - self._interval) * SMOOTHING
+        )
+        if self.delay:
+            return self.delay
+        return min(max(self._interval * REPEATS_TO_WAIT, MIN_DELAY), MAX_DELAY)
@@ -2,19 +2,25 @@
 import bz2 as bzip2
 import gzip
 import lzma
+import os
+import stat
 import sys
 import zipfile
+from functools import lru_cache
 from pathlib import Path
 from types import TracebackType
-from typing import IO, List, Literal, NamedTuple
+from typing import IO, Callable, List, Literal, NamedTuple
 
 import rarfile
 
 if sys.version_info.major == 3 and sys.version_info.minor <= 13:
+    from backports import zstd
     from backports.zstd import tarfile
 else:
     import tarfile
 
+    from compression import zstd
+
 
 class BadArchiveError(Exception):
     """Custom exception for handling bad or unsupported archive files."""
@@ -41,14 +47,139 @@ ARCHIVE_EXTENSIONS = ArchiveExtensions(
 )
 
 
+ArchiveFormat = Literal["zip", "rar", "tar", "tar.gz", "tar.bz2", "tar.xz", "tar.zst"]
+
+ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+# files that can be zips with something in front, like a self extracting stub,
+# so their central directory is checked when the magic bytes do not match
+PREFIXED_ZIP_EXTENSIONS = (
+    *ARCHIVE_EXTENSIONS.zip,
+    ".exe",
+    ".jar",
+    ".war",
+    ".ear",
+    ".apk",
+    ".sfx",
+)
+RAR_MAGIC = (b"Rar!\x1a\x07\x00", b"Rar!\x1a\x07\x01\x00")
+# compressed streams that may hold a tar, and how to peek into them
+COMPRESSED_TAR_MAGIC: tuple[
+    tuple[tuple[bytes, ...], ArchiveFormat, Callable[[IO[bytes]], IO]], ...
+] = (
+    ((b"\x1f\x8b",), "tar.gz", gzip.open),
+    ((b"BZh",), "tar.bz2", bzip2.open),
+    ((b"\xfd7zXZ\x00", b"\x5d\x00\x00"), "tar.xz", lzma.open),
+    ((b"\x28\xb5\x2f\xfd",), "tar.zst", zstd.open),
+)
+
+
+class ArchiveSniff(NamedTuple):
+    format: ArchiveFormat | None
+    # only known for zip files, from their first entry
+    encrypted: bool = False
+
+
+TAR_READ_MODES: dict[ArchiveFormat, Literal["r:", "r:gz", "r:bz2", "r:xz", "r:zst"]] = {
+    "tar": "r:",
+    "tar.gz": "r:gz",
+    "tar.bz2": "r:bz2",
+    "tar.xz": "r:xz",
+    "tar.zst": "r:zst",
+}
+
+
+def _is_tar_header(block: bytes) -> bool:
+    """Check whether a block looks like the first header of a tar archive.
+
+    Args:
+        block: The first 512 bytes of the (decompressed) file
+
+    Returns:
+        Whether the block is a tar header
+    """
+    if len(block) < tarfile.BLOCKSIZE:
+        return False
+    if block[257:262] == b"ustar":
+        return True
+    # old v7 archives have no magic, only a checksum
+    try:
+        checksum = int(block[148:156].strip(b"\0 ") or b"-", 8)
+    except ValueError:
+        return False
+    return checksum in tarfile.calc_chksums(block)
+
+
+@lru_cache(maxsize=4096)
+def _sniff_archive(filename: str, mtime_ns: int, size: int) -> ArchiveSniff:
+    """Work out the archive format from the start of a file.
+
+    Cached by modification time and size, so an unchanged file is only read once.
+
+    Args:
+        filename: Path to the file
+        mtime_ns: The file's modification time, only used as part of the cache key
+        size: The file's size, only used as part of the cache key
+
+    Returns:
+        The archive format, which is None if it is not a supported archive
+    """
+    with open(filename, "rb") as file:
+        head = file.read(tarfile.BLOCKSIZE)
+        if head.startswith(ZIP_MAGIC):
+            # encrypted entries are already flagged in the first local header
+            encrypted = (
+                head.startswith(ZIP_MAGIC[0]) and len(head) > 6 and bool(head[6] & 0x1)
+            )
+            return ArchiveSniff("zip", encrypted)
+        if head.startswith(RAR_MAGIC):
+            return ArchiveSniff("rar")
+        if _is_tar_header(head):
+            return ArchiveSniff("tar")
+        for magics, archive_format, open_stream in COMPRESSED_TAR_MAGIC:
+            if not head.startswith(magics):
+                continue
+            # only the first block is decompressed, never the whole stream
+            file.seek(0)
+            try:
+                with open_stream(file) as stream:
+                    block = stream.read(tarfile.BLOCKSIZE)
+            except (OSError, EOFError, lzma.LZMAError, zstd.ZstdError):
+                return ArchiveSniff(None)
+            return ArchiveSniff(archive_format if _is_tar_header(block) else None)
+    if filename.lower().endswith(PREFIXED_ZIP_EXTENSIONS) and zipfile.is_zipfile(
+        filename
+    ):
+        # only reads the end of central directory, nothing is decompressed
+        return ArchiveSniff("zip")
+    return ArchiveSniff(None)
+
+
+def sniff_archive(filename: str | Path) -> ArchiveSniff:
+    """Cheaply detect the format of an archive from its magic bytes, without opening it.
+
+    Args:
+        filename: Path to the file
+
+    Returns:
+        The archive format, which is None if it is not a supported archive
+
+    Raises:
+        OSError: If the file cannot be read
+    """  # noqa: DOC502
+    filename = str(filename)
+    file_stat = os.stat(filename)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return ArchiveSniff(None)
+    return _sniff_archive(filename, file_stat.st_mtime_ns, file_stat.st_size)
+
+
 class Archive:
     """Unified handler for ZIP, TAR and RAR files with context manager support."""
 
     def __init__(
         self,
         filename: str | Path,
-        algo: Literal["zip", "tar", "rar", "tar.gz", "tar.bz2", "tar.xz", "tar.zst"]
-        | None = None,
+        algo: ArchiveFormat | None = None,
         mode: str = "r",
         compression_level: int | None = None,
     ) -> None:
@@ -101,9 +232,9 @@ class Archive:
     def _detect_and_open(self) -> None:
         """Detect file type and open appropriate handler.
 
-        For read mode, attempts to open as ZIP, then RAR, then TAR by trying each
-        format and catching format-specific errors. For write mode, uses file
-        extension to determine the format.
+        For read mode, sniffs the format from the file's magic bytes and opens
+        it with the matching handler. For write mode, uses file extension to
+        determine the format.
 
         Raises:
             FileNotFoundError: If the archive file doesn't exist (for read mode)
@@ -121,18 +252,18 @@ class Archive:
             raise
 
     def _detect_and_open_read(self) -> None:
-        """Attempt to open archive for reading by trying each format.
+        """Open archive for reading with the handler its magic bytes point to.
 
-        Tries ZIP first, then RAR, then TAR. Uses actual file content detection
-        rather than relying on file extensions.
+        Uses actual file content detection rather than relying on file
+        extensions, see `sniff_archive`.
 
         Raises:
             FileNotFoundError: If the archive file doesn't exist
             ValueError: If file cannot be opened as any supported archive format,
                        or if the archive is password-protected
         """  # noqa: DOC502
-        # Try ZIP first
-        try:
+        archive_format = sniff_archive(self.filename).format
+        if archive_format == "zip":
             archive = zipfile.ZipFile(self.filename, "r")
             # Check for password protection
             if any(zinfo.flag_bits & 0x1 for zinfo in archive.infolist()):
@@ -140,12 +271,7 @@ class Archive:
                 raise ValueError("Password-protected ZIP files are not supported")
             self._archive = archive
             self._archive_type = "zip"
-            return
-        except zipfile.BadZipFile:
-            pass
-
-        # Try RAR
-        try:
+        elif archive_format == "rar":
             archive = rarfile.RarFile(self.filename, "r")
             # Check for password protection
             if archive.needs_password():
@@ -153,21 +279,15 @@ class Archive:
                 raise ValueError("Password-protected RAR files are not supported")
             self._archive = archive
             self._archive_type = "rar"
-            return
-        except rarfile.NotRarFile:
-            pass
-
-        # Try TAR (with auto-detection for compression)
-        try:
-            self._archive = tarfile.open(self.filename, "r:*")  # noqa: SIM115
+        elif archive_format is not None:
+            self._archive = tarfile.open(  # noqa: SIM115
+                self.filename, TAR_READ_MODES[archive_format]
+            )
             self._archive_type = "tar"
-            return
-        except tarfile.TarError:
-            pass
-
-        raise ValueError(
-            f"Cannot open '{self.filename}': not a valid ZIP, RAR, or TAR archive"
-        )
+        else:
+            raise ValueError(
+                f"Cannot open '{self.filename}': not a valid ZIP, RAR, or TAR archive"
+            )
 
     def _detect_and_open_write(self) -> None:
         """Open archive for writing based on file extension.
@@ -0,0 +1,198 @@
+import contextlib
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import IO, Callable, NamedTuple
+
+from rovr.classes.exceptions import ProcessCancelled
+from rovr.functions.utils import should_cancel
+
+# how often the worker is checked for cancellation while the process runs
+POLL_INTERVAL = 0.05
+# how much of stderr is kept, it is only used for error messages
+MAX_STDERR = 64 * 1024
+# how long to wait for the output once the process exited
+JOIN_TIMEOUT = 1
+# how long taskkill may take to kill the process tree on windows
+TASKKILL_TIMEOUT = 5
+_CHUNK_SIZE = 64 * 1024
+
+
+class ProcessResult(NamedTuple):
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    # whether the process was stopped because it wrote more than `max_output`
+    truncated: bool = False
+
+
+class _CappedReader:
+    """Reads a pipe on a thread, keeping up to a number of bytes of it."""
+
+    def __init__(self, pipe: IO[bytes], max_bytes: int | None) -> None:
+        self.max_bytes = max_bytes
+        self.data = bytearray()
+        self.full = threading.Event()
+        self._thread = threading.Thread(target=self._read, args=(pipe,), daemon=True)
+        self._thread.start()
+
+    def _read(self, pipe: IO[bytes]) -> None:
+        with pipe:
+            while chunk := os.read(pipe.fileno(), _CHUNK_SIZE):
+                if self.max_bytes is None:
+                    self.data += chunk
+                elif not self.full.is_set():
+                    self.data += chunk[: self.max_bytes - len(self.data)]
+                    if len(self.data) >= self.max_bytes:
+                        self.full.set()
+                # past the limit the rest is dropped, so the process never blocks on a full pipe
+
+    def join(self, timeout: float) -> bytes:
+        # something the process started may still hold the pipe open
+        self._thread.join(timeout)
+        return bytes(self.data)
+
+
+class CancellableProcess:
+    """Runs a command for a preview, killing it if the preview is no longer wanted.
+
+    The command is started in its own process group, so anything it starts
+    is killed along with it, by taskkill on windows. While it runs, the worker that started it is
+    checked for cancellation every `POLL_INTERVAL` seconds, rather than
+    only once the process exits.
+
+    Attributes:
+        command (list[str]): The command
+        timeout (float | None): How long the process may run, in seconds
+        max_output (int | None): How much of stdout to keep, in bytes. The
+            process is stopped once it writes more.
+        should_stop (Callable[[], bool]): Checked while the process runs, to kill it early
+        input (bytes | None): Written to the process's stdin on a thread, if given
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        timeout: float | None,
+        max_output: int | None = None,
+        should_stop: Callable[[], bool] = should_cancel,
+        env: dict[str, str] | None = None,
+        startupinfo: "subprocess.STARTUPINFO | None" = None,
+        input: bytes | None = None,
+    ) -> None:
+        """Start the command.
+
+        Raises:
+            OSError: If the command could not be started
+        """  # noqa: DOC502
+        self.command = command
+        self.timeout = timeout
+        self.max_output = max_output
+        self.should_stop = should_stop
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        if os.name == "nt":
+            group_options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            group_options = {"start_new_session": True}
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            startupinfo=startupinfo,
+            **group_options,
+        )
+        assert self.process.stdout is not None and self.process.stderr is not None
+        self._stdout = _CappedReader(self.process.stdout, max_output)
+        self._stderr = _CappedReader(self.process.stderr, MAX_STDERR)
+        if input is not None:
+            assert self.process.stdin is not None
+            threading.Thread(
+                target=self._write, args=(self.process.stdin, input), daemon=True
+            ).start()
+
+    @staticmethod
+    def _write(pipe: IO[bytes], data: bytes) -> None:
+        # the process may exit, or be killed, before reading all of it
+        with contextlib.suppress(OSError), pipe:
+            pipe.write(data)
+
+    @classmethod
+    def run(
+        cls,
+        command: list[str],
+        timeout: float | None,
+        max_output: int | None = None,
+        should_stop: Callable[[], bool] = should_cancel,
+        env: dict[str, str] | None = None,
+        startupinfo: "subprocess.STARTUPINFO | None" = None,
+        input: bytes | None = None,
+    ) -> ProcessResult:
+        """Run a command and wait for it, see `wait`.
+
+        Returns:
+            ProcessResult: The exit code and output of the command
+        """
+        return cls(
+            command, timeout, max_output, should_stop, env, startupinfo, input
+        ).wait()
+
+    def kill(self) -> None:
+        """Kill the process and everything it started, if it is still running."""
+        if self.process.poll() is not None:
+            return
+        if os.name == "nt":
+            # windows has no process groups to kill, so taskkill walks the tree
+            with contextlib.suppress(OSError, subprocess.SubprocessError):
+                subprocess.run(
+                    ["taskkill", "/T", "/F", "/PID", str(self.process.pid)],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=TASKKILL_TIMEOUT,
+                    creationflags=subprocess.CREATE_NO_WINDOW,
+                )
+            # the process itself is always killed, even if taskkill failed
+            with contextlib.suppress(OSError):
+                self.process.kill()
+        else:
+            with contextlib.suppress(OSError):
+                os.killpg(self.process.pid, signal.SIGKILL)
+        self.process.wait()
+
+    def wait(self) -> ProcessResult:
+        """Wait for the process to exit, killing it if it should stop.
+
+        Returns:
+            ProcessResult: The exit code and output of the process
+
+        Raises:
+            ProcessCancelled: If `should_stop` returned True while it ran
+            subprocess.TimeoutExpired: If it ran for longer than `timeout`
+        """
+        truncated = False
+        try:
+            while True:
+                try:
+                    self.process.wait(POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                if self._stdout.full.is_set():
+                    truncated = True
+                    break
+                if self.should_stop():
+                    raise ProcessCancelled(f"{self.command[0]} was cancelled")
+                if self._deadline is not None and time.monotonic() > self._deadline:
+                    raise subprocess.TimeoutExpired(self.command, self.timeout or 0)
+        finally:
+            self.kill()
+        return ProcessResult(
+            self.process.returncode,
+            self._stdout.join(JOIN_TIMEOUT),
+            self._stderr.join(JOIN_TIMEOUT),
+            truncated,
+        )
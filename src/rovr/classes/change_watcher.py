@@ -0,0 +1,251 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from contextlib import suppress
+
+from rovr.classes.type_aliases import os_type
+
+# directory -> names that changed in it, or None when anything might have changed
+Changes = dict[str, set[str] | None]
+
+# from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_MASK_ADD = 0x20000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+LISTING_MASK = (
+    IN_CREATE
+    | IN_DELETE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+CONTENTS_MASK = LISTING_MASK | IN_CLOSE_WRITE | IN_MODIFY
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ChangeWatcher:
+    """Reports changes in a set of watched directories.
+
+    This is the polling fallback, which reports every watched directory as
+    possibly changed whenever `wait` times out, leaving the caller to work
+    out what actually changed. Subclasses report real changes only.
+    """
+
+    def __init__(self) -> None:
+        self._watched: dict[str, bool] = {}
+        self._stop_event = threading.Event()
+
+    def watch(self, directories: dict[str, bool]) -> None:
+        """Replace the set of watched directories.
+
+        Args:
+            directories (dict[str, bool]): The directories to watch, mapped to
+                whether writes to files inside them should be reported too,
+                instead of only items being created, removed or renamed.
+        """
+        self._watched = dict(directories)
+
+    def wait(self, timeout: float) -> Changes | None:
+        """Wait for changes.
+
+        Args:
+            timeout (float): How long to wait for, in seconds
+
+        Returns:
+            Changes | None: The directories that changed, which may be empty,
+                or None once the watcher was stopped
+        """
+        if self._stop_event.wait(timeout):
+            return None
+        return dict.fromkeys(self._watched)
+
+    def stop(self) -> None:
+        """Wake up and stop any thread waiting in `wait`."""
+        self._stop_event.set()
+
+    def close(self) -> None:
+        """Release any resources held by the watcher."""
+
+
+class InotifyWatcher(ChangeWatcher):
+    """A change watcher backed by Linux inotify.
+
+    Directories that cannot be watched, for example once the user's watch
+    limit is reached, are polled instead, the same way `ChangeWatcher` does.
+    Paths that lead to the same directory share one watch, which reports
+    changes for all of them.
+    """
+
+    def __init__(self, debounce: float = 0.1) -> None:
+        """Initialise the watcher.
+
+        Args:
+            debounce (float): How long to keep collecting events after the first one, in seconds
+
+        Raises:
+            OSError: When inotify is not available
+        """
+        super().__init__()
+        self.debounce = debounce
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+        self._wake_read, self._wake_write = os.pipe()
+        # inotify gives the same descriptor for every path to a directory
+        self._descriptor_to_paths: dict[int, set[str]] = {}
+        self._path_to_descriptor: dict[str, int] = {}
+        self._path_masks: dict[str, int] = {}
+        self._polled: set[str] = set()
+
+    def watch(self, directories: dict[str, bool]) -> None:
+        for watched_path in list(self._path_to_descriptor):
+            if self._watched.get(watched_path) != directories.get(watched_path):
+                self._unwatch(watched_path)
+        self._polled = set()
+        for directory, contents in directories.items():
+            if directory in self._path_to_descriptor:
+                continue
+            mask = CONTENTS_MASK if contents else LISTING_MASK
+            # added to the mask of another path to the same directory, if any
+            descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), mask | IN_MASK_ADD
+            )
+            if descriptor < 0:
+                # ENOSPC when the watch limit is reached, or the directory
+                # is gone or not a directory. poll it either way.
+                self._polled.add(directory)
+                continue
+            self._descriptor_to_paths.setdefault(descriptor, set()).add(directory)
+            self._path_to_descriptor[directory] = descriptor
+            self._path_masks[directory] = mask
+        self._watched = dict(directories)
+
+    def _unwatch(self, watched_path: str) -> None:
+        descriptor = self._path_to_descriptor.pop(watched_path)
+        self._path_masks.pop(watched_path, None)
+        paths = self._descriptor_to_paths.get(descriptor, set())
+        paths.discard(watched_path)
+        if not paths:
+            self._descriptor_to_paths.pop(descriptor, None)
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+            return
+        # another path still needs it, so shrink the mask to what that one needs
+        remaining = next(iter(paths))
+        mask = 0
+        for path in paths:
+            mask |= self._path_masks[path]
+        self._libc.inotify_add_watch(self._fd, os.fsencode(remaining), mask)
+
+    def wait(self, timeout: float) -> Changes | None:
+        if self._stop_event.is_set():
+            return None
+        changes: Changes = {}
+        deadline: float | None = None
+        remaining = timeout
+        while True:
+            ready, _, _ = select.select([self._fd, self._wake_read], [], [], remaining)
+            if self._wake_read in ready or self._stop_event.is_set():
+                return None
+            if self._fd in ready:
+                self._read_events(changes)
+                if deadline is None:
+                    deadline = time.monotonic() + self.debounce
+            if deadline is None:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+        for directory in self._polled:
+            changes[directory] = None
+        return changes
+
+    def _read_events(self, changes: Changes) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name_start = offset + _EVENT_HEADER.size
+            name = data[name_start : name_start + length].rstrip(b"\0")
+            offset = name_start + length
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped, so anything could have changed
+                for directory in self._path_to_descriptor:
+                    changes[directory] = None
+                continue
+            directories = self._descriptor_to_paths.get(descriptor)
+            if directories is None:
+                continue
+            if mask & IN_IGNORED:
+                # the directory was removed, or the watch was
+                self._descriptor_to_paths.pop(descriptor, None)
+                for directory in directories:
+                    self._path_to_descriptor.pop(directory, None)
+                    self._path_masks.pop(directory, None)
+                    changes[directory] = None
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF) or not name:
+                for directory in directories:
+                    changes[directory] = None
+            else:
+                for directory in directories:
+                    names = changes.setdefault(directory, set())
+                    if names is not None:
+                        names.add(os.fsdecode(name))
+
+    def stop(self) -> None:
+        super().stop()
+        with suppress(OSError):
+            os.write(self._wake_write, b"\0")
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            with suppress(OSError):
+                os.close(fd)
+
+
+def create_change_watcher(backend: str = "auto") -> ChangeWatcher:
+    """Create the best available change watcher.
+
+    Args:
+        backend (str): `auto` to use inotify where available, or `polling`
+
+    Returns:
+        ChangeWatcher: The watcher
+    """
+    if backend == "auto" and os_type == "Linux":
+        with suppress(OSError):
+            return InotifyWatcher()
+    return ChangeWatcher()
@@ -36,6 +36,10 @@ _ROVR_CONFIG_INTERFACE_APPEND_NEW_TABS_DEFAULT = True
 r""" Default value of the field path 'Rovr Config interface append_new_tabs' """
 
 
+_ROVR_CONFIG_INTERFACE_CHANGE_WATCHER_DEFAULT = "auto"
+r""" Default value of the field path 'Rovr Config interface change_watcher' """
+
+
 _ROVR_CONFIG_INTERFACE_CLOCK_ALIGN_DEFAULT = "right"
 r""" Default value of the field path 'Rovr Config interface clock align' """
 
@@ -60,6 +64,86 @@ _ROVR_CONFIG_INTERFACE_DRIVE_WATCHER_FREQUENCY_DEFAULT = 3.0
 r""" Default value of the field path 'Rovr Config interface drive_watcher_frequency' """
 
 
+_ROVR_CONFIG_INTERFACE_EXTENSION_RULES_ADDITIONALPROPERTIES_VERIFY_DEFAULT = False
+r""" Default value of the field path 'Rovr Config interface extension_rules additionalProperties verify' """
+
+
+_ROVR_CONFIG_INTERFACE_EXTENSION_RULES_DEFAULT = {
+    ".txt": {"type": "text"},
+    ".md": {"type": "text"},
+    ".rst": {"type": "text"},
+    ".log": {"type": "text"},
+    ".csv": {"type": "text"},
+    ".json": {"type": "text"},
+    ".toml": {"type": "text"},
+    ".yaml": {"type": "text"},
+    ".yml": {"type": "text"},
+    ".ini": {"type": "text"},
+    ".cfg": {"type": "text"},
+    ".xml": {"type": "text"},
+    ".html": {"type": "text"},
+    ".css": {"type": "text"},
+    ".py": {"type": "text"},
+    ".pyi": {"type": "text"},
+    ".js": {"type": "text"},
+    ".mjs": {"type": "text"},
+    ".cjs": {"type": "text"},
+    ".jsx": {"type": "text"},
+    ".tsx": {"type": "text"},
+    ".rs": {"type": "text"},
+    ".go": {"type": "text"},
+    ".c": {"type": "text"},
+    ".h": {"type": "text"},
+    ".cpp": {"type": "text"},
+    ".hpp": {"type": "text"},
+    ".cc": {"type": "text"},
+    ".java": {"type": "text"},
+    ".kt": {"type": "text"},
+    ".rb": {"type": "text"},
+    ".lua": {"type": "text"},
+    ".sh": {"type": "text"},
+    ".bash": {"type": "text"},
+    ".zsh": {"type": "text"},
+    ".fish": {"type": "text"},
+    ".ps1": {"type": "text"},
+    ".sql": {"type": "text"},
+    ".tcss": {"type": "text"},
+    ".nix": {"type": "text"},
+    ".zig": {"type": "text"},
+    ".diff": {"type": "text"},
+    ".patch": {"type": "text"},
+    ".png": {"type": "image"},
+    ".jpg": {"type": "image"},
+    ".jpeg": {"type": "image"},
+    ".gif": {"type": "image"},
+    ".bmp": {"type": "image"},
+    ".webp": {"type": "image"},
+    ".tif": {"type": "image"},
+    ".tiff": {"type": "image"},
+    ".ico": {"type": "image"},
+    ".avif": {"type": "image"},
+    ".heic": {"type": "image"},
+    ".heif": {"type": "image"},
+    ".jxl": {"type": "image"},
+    ".svg": {"type": "resvg"},
+    ".pdf": {"type": "pdf"},
+    ".zip": {"type": "archive"},
+    ".7z": {"type": "archive"},
+    ".rar": {"type": "archive"},
+    ".tar": {"type": "archive"},
+    ".tar.gz": {"type": "archive"},
+    ".tgz": {"type": "archive"},
+    ".tar.xz": {"type": "archive"},
+    ".tar.bz2": {"type": "archive"},
+    ".tar.zst": {"type": "archive"},
+    ".ttf": {"type": "font"},
+    ".otf": {"type": "font"},
+    ".woff": {"type": "font"},
+    ".woff2": {"type": "font"},
+}
+r""" Default value of the field path 'Rovr Config interface extension_rules' """
+
+
 _ROVR_CONFIG_INTERFACE_IMAGE_VIEWER_MAX_SIZE_DEFAULT = [4000, 4000]
 r""" Default value of the field path 'Rovr Config interface image_viewer max_size' """
 
@@ -100,6 +184,14 @@ _ROVR_CONFIG_INTERFACE_NERD_FONT_DEFAULT = False
 r""" Default value of the field path 'Rovr Config interface nerd_font' """
 
 
+_ROVR_CONFIG_INTERFACE_PREVIEW_DEBOUNCE_DELAY_DEFAULT = 0
+r""" Default value of the field path 'Rovr Config interface preview_debounce delay' """
+
+
+_ROVR_CONFIG_INTERFACE_PREVIEW_DEBOUNCE_ENABLED_DEFAULT = True
+r""" Default value of the field path 'Rovr Config interface preview_debounce enabled' """
+
+
 _ROVR_CONFIG_INTERFACE_PREVIEW_TEXT_ERROR_DEFAULT = "couldn't read this file! (¬_¬ )"
 r""" Default value of the field path 'Rovr Config interface preview_text error' """
 
@@ -178,6 +270,10 @@ _ROVR_CONFIG_PLUGINS_BAT_EXECUTABLE_DEFAULT = "bat"
 r""" Default value of the field path 'Rovr Config plugins bat executable' """
 
 
+_ROVR_CONFIG_PLUGINS_BAT_TIMEOUT_DEFAULT = 5
+r""" Default value of the field path 'Rovr Config plugins bat timeout' """
+
+
 _ROVR_CONFIG_PLUGINS_FD_DEFAULT_FILTER_TYPES_DEFAULT = ["file", "directory"]
 r""" Default value of the field path 'Rovr Config plugins fd default_filter_types' """
 
@@ -214,6 +310,14 @@ _ROVR_CONFIG_PLUGINS_FILE_ONE_GET_DESCRIPTION_DEFAULT = True
 r""" Default value of the field path 'Rovr Config plugins file_one get_description' """
 
 
+_ROVR_CONFIG_PLUGINS_FILE_ONE_TIMEOUT_DEFAULT = 1
+r""" Default value of the field path 'Rovr Config plugins file_one timeout' """
+
+
+_ROVR_CONFIG_PLUGINS_PDFIUM_ENABLED_DEFAULT = True
+r""" Default value of the field path 'Rovr Config plugins pdfium enabled' """
+
+
 _ROVR_CONFIG_PLUGINS_POPPLER_ENABLED_DEFAULT = True
 r""" Default value of the field path 'Rovr Config plugins poppler enabled' """
 
@@ -230,6 +334,10 @@ _ROVR_CONFIG_PLUGINS_POPPLER_THREADS_DEFAULT = 1
 r""" Default value of the field path 'Rovr Config plugins poppler threads' """
 
 
+_ROVR_CONFIG_PLUGINS_POPPLER_TIMEOUT_DEFAULT = 15
+r""" Default value of the field path 'Rovr Config plugins poppler timeout' """
+
+
 _ROVR_CONFIG_PLUGINS_POPPLER_USE_PDFTOCAIRO_DEFAULT = False
 r""" Default value of the field path 'Rovr Config plugins poppler use_pdftocairo' """
 
@@ -278,6 +386,30 @@ _ROVR_CONFIG_SETTINGS_BULK_RENAME_SHOW_AS_MAPPING_DEFAULT = True
 r""" Default value of the field path 'Rovr Config settings bulk_rename show_as_mapping' """
 
 
+_ROVR_CONFIG_SETTINGS_CACHE_LISTINGS_DEFAULT = 32
+r""" Default value of the field path 'Rovr Config settings cache listings' """
+
+
+_ROVR_CONFIG_SETTINGS_CACHE_LISTINGS_MAX_MEMORY_DEFAULT = 64
+r""" Default value of the field path 'Rovr Config settings cache listings_max_memory' """
+
+
+_ROVR_CONFIG_SETTINGS_CACHE_MIME_TYPES_DEFAULT = 50000
+r""" Default value of the field path 'Rovr Config settings cache mime_types' """
+
+
+_ROVR_CONFIG_SETTINGS_CACHE_PDF_PAGES_MAX_MEMORY_DEFAULT = 64
+r""" Default value of the field path 'Rovr Config settings cache pdf_pages_max_memory' """
+
+
+_ROVR_CONFIG_SETTINGS_CACHE_PREVIEWS_MAX_MEMORY_DEFAULT = 128
+r""" Default value of the field path 'Rovr Config settings cache previews_max_memory' """
+
+
+_ROVR_CONFIG_SETTINGS_CACHE_PREVIEW_PREFETCH_DEFAULT = 2
+r""" Default value of the field path 'Rovr Config settings cache preview_prefetch' """
+
+
 _ROVR_CONFIG_SETTINGS_COPY_INCLUDES_METADATA_DEFAULT = True
 r""" Default value of the field path 'Rovr Config settings copy_includes_metadata' """
 
@@ -609,9 +741,19 @@ class _RovrConfigInterface(TypedDict, total=False):
     default: 3.0
     """
 
+    change_watcher: "_RovrConfigInterfaceChangeWatcher"
+    r"""
+    How to watch the current directory and config files for changes.
+    `auto`: use inotify on Linux, and polling everywhere else
+    `polling`: check every second. Use this if changes made on a network filesystem (such as NFS) from other machines do not show up.
+
+    default: auto
+    """
+
     clock: "_RovrConfigInterfaceClock"
     preview_text: "_RovrConfigInterfacePreviewText"
     compact_mode: "_RovrConfigInterfaceCompactMode"
+    preview_debounce: "_RovrConfigInterfacePreviewDebounce"
     mime_rules: dict[str, "_RovrConfigInterfaceMimeRulesAdditionalproperties"]
     r"""
     Map MIME type patterns to preview types. Uses regex patterns. Valid preview types: text, image, pdf, archive, folder, resvg, font, remime.
@@ -639,6 +781,169 @@ class _RovrConfigInterface(TypedDict, total=False):
       text/.*: text
     """
 
+    extension_rules: dict[str, "_RovrConfigInterfaceExtensionRulesAdditionalproperties"]
+    r"""
+    Map file extensions to preview types, so files with them are previewed without reading them to find their MIME type. The longest matching extension is used, ignoring case, and files with any other extension are checked with the mime rules.
+
+    default:
+      .7z:
+        type: archive
+      .avif:
+        type: image
+      .bash:
+        type: text
+      .bmp:
+        type: image
+      .c:
+        type: text
+      .cc:
+        type: text
+      .cfg:
+        type: text
+      .cjs:
+        type: text
+      .cpp:
+        type: text
+      .css:
+        type: text
+      .csv:
+        type: text
+      .diff:
+        type: text
+      .fish:
+        type: text
+      .gif:
+        type: image
+      .go:
+        type: text
+      .h:
+        type: text
+      .heic:
+        type: image
+      .heif:
+        type: image
+      .hpp:
+        type: text
+      .html:
+        type: text
+      .ico:
+        type: image
+      .ini:
+        type: text
+      .java:
+        type: text
+      .jpeg:
+        type: image
+      .jpg:
+        type: image
+      .js:
+        type: text
+      .json:
+        type: text
+      .jsx:
+        type: text
+      .jxl:
+        type: image
+      .kt:
+        type: text
+      .log:
+        type: text
+      .lua:
+        type: text
+      .md:
+        type: text
+      .mjs:
+        type: text
+      .nix:
+        type: text
+      .otf:
+        type: font
+      .patch:
+        type: text
+      .pdf:
+        type: pdf
+      .png:
+        type: image
+      .ps1:
+        type: text
+      .py:
+        type: text
+      .pyi:
+        type: text
+      .rar:
+        type: archive
+      .rb:
+        type: text
+      .rs:
+        type: text
+      .rst:
+        type: text
+      .sh:
+        type: text
+      .sql:
+        type: text
+      .svg:
+        type: resvg
+      .tar:
+        type: archive
+      .tar.bz2:
+        type: archive
+      .tar.gz:
+        type: archive
+      .tar.xz:
+        type: archive
+      .tar.zst:
+        type: archive
+      .tcss:
+        type: text
+      .tgz:
+        type: archive
+      .tif:
+        type: image
+      .tiff:
+        type: image
+      .toml:
+        type: text
+      .tsx:
+        type: text
+      .ttf:
+        type: font
+      .txt:
+        type: text
+      .webp:
+        type: image
+      .woff:
+        type: font
+      .woff2:
+        type: font
+      .xml:
+        type: text
+      .yaml:
+        type: text
+      .yml:
+        type: text
+      .zig:
+        type: text
+      .zip:
+        type: archive
+      .zsh:
+        type: text
+    """
+
+
+_RovrConfigInterfaceChangeWatcher = Literal["auto"] | Literal["polling"]
+r"""
+How to watch the current directory and config files for changes.
+`auto`: use inotify on Linux, and polling everywhere else
+`polling`: check every second. Use this if changes made on a network filesystem (such as NFS) from other machines do not show up.
+
+default: auto
+"""
+_ROVRCONFIGINTERFACECHANGEWATCHER_AUTO: Literal["auto"] = "auto"
+r"""The values for the 'How to watch the current directory and config files for changes' enum"""
+_ROVRCONFIGINTERFACECHANGEWATCHER_POLLING: Literal["polling"] = "polling"
+r"""The values for the 'How to watch the current directory and config files for changes' enum"""
+
 
 class _RovrConfigInterfaceClock(TypedDict, total=False):
     enabled: bool
@@ -684,6 +989,55 @@ class _RovrConfigInterfaceCompactMode(TypedDict, total=False):
     """
 
 
+class _RovrConfigInterfaceExtensionRulesAdditionalproperties(TypedDict, total=False):
+    type: Required["_RovrConfigInterfaceExtensionRulesAdditionalpropertiesType"]
+    r"""
+    The preview type of files with this extension.
+
+    Required property
+    """
+
+    verify: bool
+    r"""
+    Check the file's content, with the mime rules, instead of trusting the extension.
+
+    default: False
+    """
+
+
+_RovrConfigInterfaceExtensionRulesAdditionalpropertiesType = (
+    Literal["text"]
+    | Literal["image"]
+    | Literal["pdf"]
+    | Literal["archive"]
+    | Literal["resvg"]
+    | Literal["font"]
+)
+r""" The preview type of files with this extension. """
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_TEXT: Literal["text"] = (
+    "text"
+)
+r"""The values for the 'The preview type of files with this extension' enum"""
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_IMAGE: Literal["image"] = (
+    "image"
+)
+r"""The values for the 'The preview type of files with this extension' enum"""
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_PDF: Literal["pdf"] = "pdf"
+r"""The values for the 'The preview type of files with this extension' enum"""
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_ARCHIVE: Literal[
+    "archive"
+] = "archive"
+r"""The values for the 'The preview type of files with this extension' enum"""
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_RESVG: Literal["resvg"] = (
+    "resvg"
+)
+r"""The values for the 'The preview type of files with this extension' enum"""
+_ROVRCONFIGINTERFACEEXTENSIONRULESADDITIONALPROPERTIESTYPE_FONT: Literal["font"] = (
+    "font"
+)
+r"""The values for the 'The preview type of files with this extension' enum"""
+
+
 class _RovrConfigInterfaceImageViewer(TypedDict, total=False):
     r"""Settings related to the image viewer used in the preview sidebar"""
 
@@ -798,6 +1152,23 @@ _ROVRCONFIGINTERFACEMIMERULESADDITIONALPROPERTIES_FONT: Literal["font"] = "font"
 r"""The values for the '_RovrConfigInterfaceMimeRulesAdditionalproperties' enum"""
 
 
+class _RovrConfigInterfacePreviewDebounce(TypedDict, total=False):
+    enabled: bool
+    r"""
+    Wait for the highlight to rest before previewing files while it moves quickly, only showing their names in the meantime. A single move is always previewed straight away.
+
+    default: True
+    """
+
+    delay: int | float
+    r"""
+    How long the highlight has to rest before a file is previewed while moving through files quickly, in seconds. 0 learns it from how quickly the highlight moves, so it follows your key repeat rate.
+
+    minimum: 0
+    default: 0
+    """
+
+
 class _RovrConfigInterfacePreviewText(TypedDict, total=False):
     error: str
     r"""
@@ -1074,6 +1445,7 @@ class _RovrConfigPlugins(TypedDict, total=False):
     fd: "_RovrConfigPluginsFd"
     rg: "_RovrConfigPluginsRg"
     poppler: "_RovrConfigPluginsPoppler"
+    pdfium: "_RovrConfigPluginsPdfium"
     file_one: "_RovrConfigPluginsFileOne"
 
 
@@ -1092,6 +1464,14 @@ class _RovrConfigPluginsBat(TypedDict, total=False):
     default: bat
     """
 
+    timeout: int | float
+    r"""
+    How long bat may take to preview a file, in seconds, before it is stopped.
+
+    default: 5
+    exclusiveMinimum: 0
+    """
+
 
 class _RovrConfigPluginsFd(TypedDict, total=False):
     enabled: bool
@@ -1193,6 +1573,23 @@ class _RovrConfigPluginsFileOne(TypedDict, total=False):
     default: True
     """
 
+    timeout: int | float
+    r"""
+    How long file(1) may take to classify a file, in seconds, before it is skipped.
+
+    default: 1
+    exclusiveMinimum: 0
+    """
+
+
+class _RovrConfigPluginsPdfium(TypedDict, total=False):
+    enabled: bool
+    r"""
+    Render PDF previews in-process with pypdfium2 when it is installed (`pip install rovr[pdfium]`). Documents stay open between pages, so turning a page does not start poppler again. Poppler is used when pypdfium2 is not installed.
+
+    default: True
+    """
+
 
 class _RovrConfigPluginsPoppler(TypedDict, total=False):
     enabled: bool
@@ -1226,12 +1623,20 @@ class _RovrConfigPluginsPoppler(TypedDict, total=False):
 
     pdf_batch_size: int
     r"""
-    Number of PDF pages to load in each batch.
+    Number of PDF pages after the current one to render along with it, with half as many before it, so scrolling either way is instant.
 
     default: 2
     minimum: 1
     """
 
+    timeout: int | float
+    r"""
+    How long each poppler command may take, in seconds, before it is stopped.
+
+    default: 15
+    exclusiveMinimum: 0
+    """
+
 
 class _RovrConfigPluginsRg(TypedDict, total=False):
     enabled: bool
@@ -1312,6 +1717,9 @@ class _RovrConfigSettings(TypedDict, total=False):
     default: True
     """
 
+    cache: "_RovrConfigSettingsCache"
+    r""" Settings related to caches """
+
     bulk_rename: "_RovrConfigSettingsBulkRename"
     editor: "_RovrConfigSettingsEditor"
     r""" Settings related to the editor used for different operations """
@@ -1326,6 +1734,58 @@ class _RovrConfigSettingsBulkRename(TypedDict, total=False):
     """
 
 
+class _RovrConfigSettingsCache(TypedDict, total=False):
+    r"""Settings related to caches"""
+
+    listings: int
+    r"""
+    The number of directory listings to keep in memory, so revisiting an unchanged directory does not rescan it. Set to 0 to disable.
+
+    minimum: 0
+    default: 32
+    """
+
+    listings_max_memory: int
+    r"""
+    The estimated memory budget for cached directory listings, in MiB. The least recently used listings are dropped first.
+
+    minimum: 0
+    default: 64
+    """
+
+    mime_types: int
+    r"""
+    The number of files whose MIME type and preview type are remembered across sessions, in `mime_cache.bin` in the config folder, so previewing them again does not read their header. Each file takes 10 bytes on disk, and the least recently previewed files are dropped first. Set to 0 to disable.
+
+    minimum: 0
+    default: 50000
+    """
+
+    pdf_pages_max_memory: int
+    r"""
+    The estimated memory budget for the rendered pages of the previewed PDF, in MiB. Any page can be jumped to without rendering the pages before it, and the least recently viewed pages are dropped first. The current page is always kept.
+
+    minimum: 0
+    default: 64
+    """
+
+    previews_max_memory: int
+    r"""
+    The estimated memory budget for finished previews, such as resampled images and highlighted text, in MiB. Coming back to an unchanged file shows its preview without rendering it again. The least recently used previews are dropped first. Set to 0 to disable.
+
+    minimum: 0
+    default: 128
+    """
+
+    preview_prefetch: int
+    r"""
+    The number of files above and below the highlighted one to render previews for in the background, so moving onto them shows the preview instantly. Needs `previews_max_memory` to be above 0. Set to 0 to disable.
+
+    minimum: 0
+    default: 2
+    """
+
+
 class _RovrConfigSettingsEditor(TypedDict, total=False):
     r"""Settings related to the editor used for different operations"""
 
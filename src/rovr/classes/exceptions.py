@@ -4,3 +4,11 @@ class FolderNotFileError(Exception):
     def __init__(self, message: str) -> None:
         super().__init__(message)
         self.message = message
+
+
+class ProcessCancelled(Exception):
+    """Raised when a process is killed because the worker waiting on it was cancelled."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
@@ -0,0 +1,237 @@
+import os
+import stat
+import threading
+from contextlib import suppress
+from os import path
+
+from rovr.classes.type_aliases import DirEntryType, os_type
+
+IS_DIR = 1
+IS_FILE = 2
+IS_SYMLINK = 4
+IS_JUNCTION = 8
+IS_HIDDEN = 16
+# whether IS_HIDDEN was worked out yet, it is only needed when hiding items
+HIDDEN_KNOWN = 32
+FLAG_BITS = 6
+# stat.IO_REPARSE_TAG_MOUNT_POINT, which only exists on windows
+_REPARSE_TAG_JUNCTION = 0xA0000003
+
+# icons are shared by a lot of entries, so every entry only keeps an index into this table
+_icon_table: list[tuple[str, str]] = []
+_icon_indexes: dict[tuple[str, str], int] = {}
+_icon_lock = threading.Lock()
+
+
+def intern_icon(icon: list[str] | tuple[str, str]) -> int:
+    """Get the index of an icon in the shared icon table, adding it if needed.
+
+    Args:
+        icon (list[str] | tuple[str, str]): The icon and its colour
+
+    Returns:
+        int: The index of the icon
+    """
+    key = (icon[0], icon[1])
+    index = _icon_indexes.get(key)
+    if index is None:
+        with _icon_lock:
+            index = _icon_indexes.get(key)
+            if index is None:
+                index = len(_icon_table)
+                _icon_table.append(key)
+                _icon_indexes[key] = index
+    return index
+
+
+def _hidden_flags(hidden: bool | None) -> int:
+    if hidden is None:
+        return 0
+    return HIDDEN_KNOWN | IS_HIDDEN if hidden else HIDDEN_KNOWN
+
+
+class FileEntry:
+    """A compact record of an item in a directory listing.
+
+    This is what the scanner produces instead of holding onto `os.DirEntry`
+    objects. It keeps the name, type bits and an icon index, while the parent
+    path is shared by every entry of the same listing. Stat fields are read
+    lazily on first use and then kept, so sorting by size or time only stats
+    each entry once. Whether the entry is hidden is also only checked once
+    it is asked for.
+
+    It mimics the parts of `os.DirEntry` that rovr uses, so it can be passed
+    around wherever a DirEntry was expected.
+    """
+
+    __slots__ = ("name", "parent", "_bits", "_stat")
+
+    def __init__(
+        self,
+        name: str,
+        parent: str,
+        flags: int,
+        icon_index: int,
+        stat_fields: tuple[int, int, int] | None = None,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        # the type flags and the icon index share one int, it adds up over a large listing
+        self._bits = icon_index << FLAG_BITS | flags
+        # (size, mtime_ns, ctime_ns), filled in on first use
+        self._stat = stat_fields
+
+    @classmethod
+    def from_dir_entry(
+        cls,
+        dir_entry: DirEntryType,
+        parent: str,
+        icon: list[str],
+        hidden: bool | None = None,
+    ) -> "FileEntry":
+        """Create a record from a scandir entry.
+
+        Args:
+            dir_entry (DirEntryType): The entry from `os.scandir`
+            parent (str): The directory that was scanned, shared between entries
+            icon (list[str]): The icon for the entry
+            hidden (bool | None): Whether the entry is hidden, None to check when asked for
+
+        Returns:
+            FileEntry: The record
+        """
+        flags = _hidden_flags(hidden)
+        with suppress(OSError):
+            if dir_entry.is_dir():
+                flags |= IS_DIR
+            elif dir_entry.is_file():
+                flags |= IS_FILE
+            if dir_entry.is_symlink():
+                flags |= IS_SYMLINK
+            if dir_entry.is_junction():
+                flags |= IS_JUNCTION
+        entry = cls(dir_entry.name, parent, flags, intern_icon(icon))
+        if os_type == "Windows":
+            # scandir already has the stat result on windows, so it is free to keep
+            with suppress(OSError):
+                entry._store_stat(dir_entry.stat())
+        return entry
+
+    @classmethod
+    def from_stat(
+        cls,
+        name: str,
+        parent: str,
+        link_stat: os.stat_result,
+        target_stat: os.stat_result | None,
+        icon: list[str] | tuple[str, str],
+        hidden: bool,
+    ) -> "FileEntry":
+        """Create a record for an item that was looked up on its own.
+
+        Args:
+            name (str): The name of the item
+            parent (str): The directory the item is in
+            link_stat (os.stat_result): The `lstat` result of the item
+            target_stat (os.stat_result | None): The `stat` result following symlinks, None for a broken symlink
+            icon (list[str] | tuple[str, str]): The icon for the entry
+            hidden (bool): Whether the entry is hidden
+
+        Returns:
+            FileEntry: The record
+        """
+        flags = _hidden_flags(hidden)
+        if target_stat is not None:
+            if stat.S_ISDIR(target_stat.st_mode):
+                flags |= IS_DIR
+            elif stat.S_ISREG(target_stat.st_mode):
+                flags |= IS_FILE
+        if stat.S_ISLNK(link_stat.st_mode):
+            flags |= IS_SYMLINK
+        if getattr(link_stat, "st_reparse_tag", 0) == _REPARSE_TAG_JUNCTION:
+            flags |= IS_JUNCTION
+        entry = cls(name, parent, flags, intern_icon(icon))
+        if target_stat is not None:
+            entry._store_stat(target_stat)
+        return entry
+
+    @property
+    def path(self) -> str:
+        return path.join(self.parent, self.name)
+
+    @property
+    def flags(self) -> int:
+        return self._bits & ((1 << FLAG_BITS) - 1)
+
+    @property
+    def icon_index(self) -> int:
+        return self._bits >> FLAG_BITS
+
+    @property
+    def icon(self) -> tuple[str, str]:
+        return _icon_table[self.icon_index]
+
+    def is_dir(self) -> bool:
+        return bool(self._bits & IS_DIR)
+
+    def is_file(self) -> bool:
+        return bool(self._bits & IS_FILE)
+
+    def is_symlink(self) -> bool:
+        return bool(self._bits & IS_SYMLINK)
+
+    def is_junction(self) -> bool:
+        return bool(self._bits & IS_JUNCTION)
+
+    @property
+    def hidden(self) -> bool:
+        if not self._bits & HIDDEN_KNOWN:
+            # imported here, as the path functions are what build entries
+            from rovr.functions.path import is_hidden_file
+
+            self._bits |= _hidden_flags(is_hidden_file(self.path))
+        return bool(self._bits & IS_HIDDEN)
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        """Stat the item, keeping the fields used for sorting.
+
+        Args:
+            follow_symlinks (bool): Whether to follow symlinks
+
+        Returns:
+            os.stat_result: The stat result
+        """
+        result = os.stat(self.path, follow_symlinks=follow_symlinks)
+        if follow_symlinks or not self._bits & IS_SYMLINK:
+            self._store_stat(result)
+        return result
+
+    def forget_stat(self) -> None:
+        """Drop the kept stat fields, so they are read again on next use."""
+        self._stat = None
+
+    def _store_stat(self, result: os.stat_result) -> None:
+        self._stat = (result.st_size, result.st_mtime_ns, result.st_ctime_ns)
+
+    def _stat_fields(self) -> tuple[int, int, int]:
+        if self._stat is None:
+            try:
+                self.stat()
+            except OSError:
+                self._stat = (0, 0, 0)
+        return self._stat  # ty: ignore[invalid-return-type]
+
+    @property
+    def size(self) -> int:
+        return self._stat_fields()[0]
+
+    @property
+    def mtime_ns(self) -> int:
+        return self._stat_fields()[1]
+
+    @property
+    def ctime_ns(self) -> int:
+        return self._stat_fields()[2]
+
+    def __repr__(self) -> str:
+        return f"<FileEntry {self.name!r}>"
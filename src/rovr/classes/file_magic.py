@@ -0,0 +1,273 @@
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Literal
+
+from rovr.classes.cancellable_process import POLL_INTERVAL
+from rovr.classes.mime_cache import MimeCache
+from rovr.functions.utils import should_cancel
+
+# from <magic.h>
+MAGIC_NONE = 0x0000000
+MAGIC_MIME_TYPE = 0x0000010
+
+Mode = Literal["mime_type", "description"]
+_FLAGS: dict[Mode, int] = {"mime_type": MAGIC_MIME_TYPE, "description": MAGIC_NONE}
+_ARGS: dict[Mode, list[str]] = {"mime_type": ["--mime-type"], "description": []}
+
+
+class _LibMagic:
+    """A libmagic handle, loaded in-process with ctypes."""
+
+    def __init__(self, flags: int) -> None:
+        """Open libmagic with its default database.
+
+        Args:
+            flags (int): The `MAGIC_*` flags to open it with
+
+        Raises:
+            OSError: When libmagic or its database is not available
+        """
+        library = next(
+            (
+                found
+                for name in ("magic", "magic-1", "libmagic-1")
+                if (found := ctypes.util.find_library(name))
+            ),
+            None,
+        )
+        if library is None:
+            raise OSError("libmagic is not available")
+        self._lib = ctypes.CDLL(library)
+        self._lib.magic_open.argtypes = [ctypes.c_int]
+        self._lib.magic_open.restype = ctypes.c_void_p
+        self._lib.magic_load.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        self._lib.magic_load.restype = ctypes.c_int
+        self._lib.magic_file.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        self._lib.magic_file.restype = ctypes.c_char_p
+        self._lib.magic_close.argtypes = [ctypes.c_void_p]
+        self._lib.magic_close.restype = None
+        self._cookie = self._lib.magic_open(flags)
+        if not self._cookie:
+            raise OSError("Could not open libmagic")
+        if self._lib.magic_load(self._cookie, None) != 0:
+            self.close()
+            raise OSError("Could not load the libmagic database")
+
+    def classify(self, file_path: str, should_stop: Callable[[], bool]) -> str | None:
+        # in-process and quick, so it is not cancelled
+        result = self._lib.magic_file(self._cookie, os.fsencode(file_path))
+        return result.decode("utf-8", errors="replace") if result else None
+
+    def close(self) -> None:
+        if self._cookie:
+            self._lib.magic_close(self._cookie)
+            self._cookie = None
+
+
+class _FileCoprocess:
+    """A `file -f -` process that is kept running and sent one path at a time."""
+
+    def __init__(self, executable: str, args: list[str], timeout: float) -> None:
+        self._command = [
+            executable,
+            "--no-buffer",
+            "--brief",
+            *args,
+            "--files-from",
+            "-",
+        ]
+        self.timeout = timeout
+        self._process: subprocess.Popen[bytes] | None = None
+        self._lines: queue.Queue[bytes | None] = queue.Queue()
+        # paths sent whose answers have not been read yet
+        self._unanswered = 0
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        process = subprocess.Popen(
+            self._command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # a thread reads the output, so waiting for a line can time out on any platform
+        lines: queue.Queue[bytes | None] = queue.Queue()
+
+        def read_lines() -> None:
+            assert process.stdout is not None
+            for line in process.stdout:
+                lines.put(line)
+            lines.put(None)
+
+        threading.Thread(target=read_lines, daemon=True).start()
+        self._process = process
+        self._lines = lines
+        self._unanswered = 0
+        return process
+
+    def classify(self, file_path: str, should_stop: Callable[[], bool]) -> str | None:
+        # a newline would end the path early, and every later answer would be off by one
+        if "\n" in file_path:
+            return None
+        process = self._process
+        try:
+            if process is None or process.poll() is not None:
+                process = self._start()
+            assert process.stdin is not None
+            process.stdin.write(os.fsencode(file_path) + b"\n")
+            process.stdin.flush()
+        except OSError:
+            self.close()
+            return None
+        self._unanswered += 1
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if should_stop():
+                    # the answer is skipped when it comes, before the next one
+                    return None
+                if time.monotonic() > deadline:
+                    # it may be stuck on this file, so start again for the next one
+                    self.close()
+                    return None
+                continue
+            if line is None:
+                self.close()
+                return None
+            self._unanswered -= 1
+            if self._unanswered == 0:
+                return line.decode("utf-8", errors="replace").strip() or None
+
+    def close(self) -> None:
+        if self._process is not None:
+            with contextlib.suppress(OSError):
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+
+class FileMagic:
+    """Classifies files with file(1)'s magic without starting a process for each file.
+
+    libmagic is used in-process when it can be loaded, otherwise one `file -f -`
+    process per mode is kept running and sent paths over a pipe. Both are
+    started the first time they are needed. MIME types are kept for the
+    files classified most recently, so a folder can be classified in the
+    background ahead of being previewed.
+
+    Attributes:
+        file_executable (str | None): The file(1) executable, for when libmagic is not available
+        timeout (float): How long to wait for file(1) to classify a file, in seconds
+        max_entries (int): The maximum number of MIME types to keep
+        should_stop (Callable[[], bool]): Checked while waiting for file(1), to give up early
+    """
+
+    def __init__(
+        self,
+        file_executable: str | None,
+        timeout: float = 1,
+        max_entries: int = 4096,
+        should_stop: Callable[[], bool] = should_cancel,
+    ) -> None:
+        self.file_executable = file_executable
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.should_stop = should_stop
+        self._backends: dict[Mode, _LibMagic | _FileCoprocess | None] = {}
+        self._locks: dict[Mode, threading.Lock] = {
+            "mime_type": threading.Lock(),
+            "description": threading.Lock(),
+        }
+        self._results: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._results_lock = threading.Lock()
+
+    def _backend(self, mode: Mode) -> _LibMagic | _FileCoprocess | None:
+        if mode not in self._backends:
+            try:
+                self._backends[mode] = _LibMagic(_FLAGS[mode])
+            except (OSError, AttributeError):
+                self._backends[mode] = (
+                    None
+                    if self.file_executable is None
+                    else _FileCoprocess(self.file_executable, _ARGS[mode], self.timeout)
+                )
+        return self._backends[mode]
+
+    def _classify(self, file_path: str, mode: Mode) -> str | None:
+        with self._locks[mode]:
+            backend = self._backend(mode)
+            if backend is None:
+                return None
+            return backend.classify(file_path, self.should_stop)
+
+    def mime_type(self, file_path: str) -> str | None:
+        """Get the MIME type of a file, as `file --mime-type -b` would.
+
+        Args:
+            file_path (str): The file
+
+        Returns:
+            str | None: The MIME type, or None if file(1) is not available or failed
+        """
+        try:
+            key = MimeCache.make_key(os.stat(file_path, follow_symlinks=False))
+        except OSError:
+            key = None
+        if key is not None:
+            with self._results_lock:
+                mime_type = self._results.get((file_path, key))
+                if mime_type is not None:
+                    self._results.move_to_end((file_path, key))
+                    return mime_type
+        mime_type = self._classify(file_path, "mime_type")
+        if key is not None and mime_type is not None:
+            with self._results_lock:
+                self._results[file_path, key] = mime_type
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return mime_type
+
+    def describe(self, file_path: str) -> str | None:
+        """Describe a file, as `file -b` would.
+
+        Args:
+            file_path (str): The file
+
+        Returns:
+            str | None: The description, or None if file(1) is not available or failed
+        """
+        return self._classify(file_path, "description")
+
+    def classify_many(
+        self, file_paths: Iterable[str], should_stop: Callable[[], bool]
+    ) -> None:
+        """Get the MIME types of many files, so they are ready when asked for.
+
+        Files are classified one at a time, so a file that is previewed in
+        the meantime only waits for one file.
+
+        Args:
+            file_paths (Iterable[str]): The files, in the order to classify them
+            should_stop (Callable[[], bool]): Checked before each file, to stop early
+        """
+        for file_path in file_paths:
+            if should_stop():
+                return
+            self.mime_type(file_path)
+
+    def close(self) -> None:
+        """Close libmagic and stop the file(1) processes."""
+        for mode, lock in self._locks.items():
+            with lock:
+                backend = self._backends.pop(mode, None)
+                if backend is not None:
+                    backend.close()
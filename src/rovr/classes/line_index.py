@@ -0,0 +1,231 @@
+import mmap
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from os import path
+
+# newlines are counted per block, so 10 GiB only needs 1.25 MiB of counts
+BLOCK_SIZE = 64 * 1024
+# how much of the file is read at a time while indexing
+READ_SIZE = 16 * BLOCK_SIZE
+
+
+class LineIndex:
+    """Finds lines in a text file of any size without reading all of it.
+
+    Lines are looked up by byte offset in a memory map of the file, so moving
+    between lines, or to the start or end of the file, only touches the lines
+    in between. Line numbers come from an index built in a background thread,
+    which keeps the number of newlines before every `BLOCK_SIZE` bytes rather
+    than the offset of every line, so it stays small for any file.
+
+    Only the first `size` bytes are used, so text appended to the file later
+    is left out. Encodings where a newline is not the byte `\\n`, like utf-16,
+    are not supported.
+
+    Attributes:
+        file_path (str): The file
+        size (int): The size of the file when it was opened, in bytes
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.size = path.getsize(file_path)
+        # the number of newlines before the start of each indexed block
+        self._newlines_before = array("Q", [0])
+        self._line_count: int | None = 0 if self.size == 0 else None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def line_count(self) -> int | None:
+        """The number of lines, or None until the file is indexed."""
+        return self._line_count
+
+    @property
+    def indexed_bytes(self) -> int:
+        """How much of the file the index covers."""
+        return min(self.size, (len(self._newlines_before) - 1) * BLOCK_SIZE)
+
+    def start(self) -> None:
+        """Start indexing the file in the background."""
+        if self._thread is None and self._line_count is None:
+            self._thread = threading.Thread(target=self._build_index, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop indexing the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _build_index(self) -> None:
+        newlines = 0
+        last_byte = 0
+        buffer = bytearray(READ_SIZE)
+        try:
+            with open(self.file_path, "rb") as f:
+                remaining = self.size
+                while remaining > 0:
+                    if self._stop.is_set():
+                        return
+                    read = f.readinto(buffer)
+                    if not read:
+                        # the file was cut short while it was indexed
+                        return
+                    read = min(read, remaining)
+                    remaining -= read
+                    for start in range(0, read, BLOCK_SIZE):
+                        newlines += buffer.count(
+                            b"\n", start, min(start + BLOCK_SIZE, read)
+                        )
+                        self._newlines_before.append(newlines)
+                    last_byte = buffer[read - 1]
+        except OSError:
+            return
+        self._line_count = newlines + (last_byte != ord("\n"))
+
+    @contextmanager
+    def _mapped(self) -> Iterator[mmap.mmap]:
+        """Map the file for a lookup.
+
+        The map is not kept between lookups, so the file is not held open.
+
+        Yields:
+            mmap.mmap: The first `size` bytes of the file
+
+        Raises:
+            ValueError: If the file is now smaller than it was
+        """  # noqa: DOC502
+        with (
+            open(self.file_path, "rb") as f,
+            mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ) as mapped,
+        ):
+            yield mapped
+
+    def _last_lines(self, mapped: mmap.mmap, lines: int) -> int:
+        # a newline at the very end does not start another line
+        offset = mapped.rfind(b"\n", 0, self.size - 1) + 1
+        for _ in range(lines - 1):
+            if offset == 0:
+                break
+            offset = mapped.rfind(b"\n", 0, offset - 1) + 1
+        return offset
+
+    def skip_lines(
+        self, offset: int, lines: int, keep_lines: int = 1
+    ) -> tuple[int, int]:
+        """Move from the start of a line by a number of lines, stopping at either end.
+
+        Args:
+            offset (int): Where the line starts, in bytes
+            lines (int): How many lines to move, negative to move back
+            keep_lines (int): How many lines to leave after moving forward, so
+                a screen of lines can still be shown
+
+        Returns:
+            tuple[int, int]: Where the line moved to starts, and how many lines were moved
+        """
+        if self.size == 0:
+            return 0, 0
+        moved = 0
+        with self._mapped() as mapped:
+            last_offset = self._last_lines(mapped, keep_lines) if lines > 0 else 0
+            while moved < lines and offset < last_offset:
+                offset = mapped.find(b"\n", offset) + 1
+                moved += 1
+            while moved > lines and offset > 0:
+                offset = mapped.rfind(b"\n", 0, offset - 1) + 1
+                moved -= 1
+        return offset, moved
+
+    def last_lines(self, lines: int) -> int:
+        """Find where the last lines of the file start.
+
+        Args:
+            lines (int): How many lines to fit at the end
+
+        Returns:
+            int: Where the first of those lines starts, in bytes
+        """
+        if self.size == 0:
+            return 0
+        with self._mapped() as mapped:
+            return self._last_lines(mapped, lines)
+
+    def read_lines(self, offset: int, lines: int, max_line_size: int) -> list[bytes]:
+        """Read lines from the start of a line, without their line endings.
+
+        Args:
+            offset (int): Where the first line starts, in bytes
+            lines (int): The most lines to read
+            max_line_size (int): The most bytes to read of each line
+
+        Returns:
+            list[bytes]: The lines, cut to `max_line_size`
+        """
+        result: list[bytes] = []
+        if self.size == 0:
+            return result
+        with self._mapped() as mapped:
+            while len(result) < lines and offset < self.size:
+                end = mapped.find(b"\n", offset)
+                if end == -1:
+                    end = self.size
+                line = mapped[offset : min(end, offset + max_line_size)]
+                result.append(line.removesuffix(b"\r"))
+                offset = end + 1
+        return result
+
+    def line_offset(self, line: int) -> tuple[int, int]:
+        """Find where a line starts, stopping at the last line.
+
+        The index is used for as much of the file as it covers, lines past
+        that are counted through the map.
+
+        Args:
+            line (int): The 0-based line number
+
+        Returns:
+            tuple[int, int]: Where the line starts, in bytes, and its line number
+        """
+        if line <= 0 or self.size == 0:
+            return 0, 0
+        # the last block with fewer newlines before it, which the line starts after
+        block = max(0, bisect_left(self._newlines_before, line) - 1)
+        # the count after the last block is for the end of the file
+        block = min(block, (self.size - 1) // BLOCK_SIZE)
+        newlines = self._newlines_before[block]
+        offset = block * BLOCK_SIZE
+        with self._mapped() as mapped:
+            while newlines < line:
+                # a newline at the very end does not start another line
+                end = mapped.find(b"\n", offset, self.size - 1)
+                if end == -1:
+                    # past the last line, so go back to where it starts
+                    offset = mapped.rfind(b"\n", 0, offset) + 1
+                    break
+                offset = end + 1
+                newlines += 1
+        return offset, newlines
+
+    def line_number(self, offset: int) -> int | None:
+        """Get the number of the line starting at an offset.
+
+        Args:
+            offset (int): Where the line starts, in bytes
+
+        Returns:
+            int | None: The 0-based line number, or None if it is not indexed yet
+        """
+        block = offset // BLOCK_SIZE
+        if block >= len(self._newlines_before):
+            return None
+        block_start = block * BLOCK_SIZE
+        with self._mapped() as mapped:
+            return self._newlines_before[block] + mapped[block_start:offset].count(
+                b"\n"
+            )
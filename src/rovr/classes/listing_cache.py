@@ -0,0 +1,162 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import NamedTuple
+
+from rovr.classes.file_entry import FileEntry
+
+# filesystems like FAT only store mtimes with 2 second granularity, so a
+# directory that changed within that window of being scanned could change
+# again without its mtime moving. those listings are not worth trusting.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+class CachedListing(NamedTuple):
+    mtime_ns: int
+    folders: list[FileEntry]
+    files: list[FileEntry]
+    size: int
+
+
+class ListingCache:
+    """A process-wide LRU cache of scanned directory listings.
+
+    Listings are keyed by the normalised directory path and whether hidden
+    items were included, and are only served while the directory's
+    `st_mtime_ns` still matches the one recorded before the scan. Rewriting
+    a file does not change its directory's mtime, so only the names and
+    types are trusted, the entries stat themselves again when next sorted
+    by size or time.
+
+    Attributes:
+        max_entries (int): The maximum number of listings to keep. 0 disables the cache.
+        max_bytes (int): The estimated memory budget for all listings, in bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, bool], CachedListing] = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def estimate_size(folders: list[FileEntry], files: list[FileEntry]) -> int:
+        """Roughly estimate how much memory a listing holds onto.
+
+        Args:
+            folders (list[FileEntry]): The scanned folders
+            files (list[FileEntry]): The scanned files
+
+        Returns:
+            int: The estimated size in bytes
+        """
+        # the record itself plus its name, the parent path and icons are shared
+        per_entry = sys.getsizeof(FileEntry("", "", 0, 0)) + sys.getsizeof("")
+        total = sys.getsizeof(folders) + sys.getsizeof(files)
+        for item in folders:
+            total += per_entry + len(item.name)
+        for item in files:
+            total += per_entry + len(item.name)
+        return total
+
+    def get(self, cwd: str, show_hidden: bool) -> CachedListing | None:
+        """Get a listing if the directory has not changed since it was cached.
+
+        Revalidation costs a single `stat` of the directory.
+
+        Args:
+            cwd (str): The normalised directory path
+            show_hidden (bool): Whether the listing includes hidden items
+
+        Returns:
+            CachedListing | None: The cached listing, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        key = (cwd, show_hidden)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is None:
+            return None
+        try:
+            mtime_ns = os.stat(cwd).st_mtime_ns
+        except OSError:
+            self.invalidate(cwd)
+            return None
+        with self._lock:
+            if mtime_ns != cached.mtime_ns:
+                self._pop(key)
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        for entry in chain(cached.folders, cached.files):
+            entry.forget_stat()
+        return cached
+
+    def put(
+        self,
+        cwd: str,
+        show_hidden: bool,
+        mtime_ns: int,
+        folders: list[FileEntry],
+        files: list[FileEntry],
+        scan_started_ns: int | None = None,
+    ) -> None:
+        """Store a listing, evicting the least recently used ones to fit.
+
+        Args:
+            cwd (str): The normalised directory path
+            show_hidden (bool): Whether the listing includes hidden items
+            mtime_ns (int): The directory's `st_mtime_ns`, taken before scanning
+            folders (list): The scanned folders
+            files (list): The scanned files
+            scan_started_ns (int | None): When the scan started, in `time.time_ns()`
+        """
+        if not self.enabled:
+            return
+        if scan_started_ns is None:
+            scan_started_ns = time.time_ns()
+        if scan_started_ns - mtime_ns < RACY_MTIME_WINDOW_NS:
+            return
+        size = self.estimate_size(folders, files)
+        if size > self.max_bytes:
+            return
+        key = (cwd, show_hidden)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = CachedListing(mtime_ns, folders, files, size)
+            self._total_size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self._total_size > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_size -= evicted.size
+
+    def invalidate(self, cwd: str | None = None) -> None:
+        """Drop cached listings.
+
+        Args:
+            cwd (str | None): The normalised directory to drop, or None to drop everything
+        """
+        with self._lock:
+            if cwd is None:
+                self._entries.clear()
+                self._total_size = 0
+                return
+            for show_hidden in (True, False):
+                self._pop((cwd, show_hidden))
+
+    def _pop(self, key: tuple[str, bool]) -> None:
+        # caller must hold the lock
+        cached = self._entries.pop(key, None)
+        if cached is not None:
+            self._total_size -= cached.size
@@ -0,0 +1,186 @@
+import contextlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import NamedTuple
+
+MAGIC = b"RVMC"
+FORMAT_VERSION = 1
+# magic, format version, signature, number of values, number of records
+HEADER = struct.Struct("<4sBIII")
+# the hashed key of a file and which of the values it has
+RECORD = struct.Struct("<QH")
+_KEY = struct.Struct("<QQQq")
+
+
+class CachedMime(NamedTuple):
+    method: str
+    mime_type: str
+    language: str | None
+    preview_type: str
+
+
+class MimeCache:
+    """An LRU cache of MIME types and preview types that is kept between sessions.
+
+    Files are keyed by a 64 bit hash of their device, inode, size and
+    `st_mtime_ns`, so a file that changed, or was replaced, is looked at again.
+    On disk each file takes 10 bytes, with the few distinct results stored
+    once. The file is only read the first time the cache is used.
+
+    Attributes:
+        file_path (str): Where the cache is saved.
+        max_entries (int): The maximum number of files to remember. 0 disables the cache.
+        signature (int): Identifies the rules the results were made with, the
+            saved cache is ignored if it was made with other rules.
+    """
+
+    def __init__(self, file_path: str, max_entries: int, signature: int) -> None:
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.signature = signature
+        self._entries: OrderedDict[int, CachedMime] = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(stat: os.stat_result) -> int | None:
+        """Make the key for a file.
+
+        Args:
+            stat (os.stat_result): The result of `os.stat` on the file
+
+        Returns:
+            int | None: The key, or None if the file cannot be told apart reliably
+        """
+        # some filesystems, like FAT on windows, have no inode numbers
+        if not stat.st_ino:
+            return None
+        try:
+            packed = _KEY.pack(stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except struct.error:
+            return None
+        return int.from_bytes(blake2b(packed, digest_size=8).digest(), "little")
+
+    def get(self, key: int) -> CachedMime | None:
+        """Get what a file was classified as.
+
+        Args:
+            key (int): The key from `make_key`
+
+        Returns:
+            CachedMime | None: The result, or None if the file is not cached
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load()
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._dirty = True
+            return cached
+
+    def put(self, key: int, value: CachedMime) -> None:
+        """Remember what a file was classified as.
+
+        Args:
+            key (int): The key from `make_key`
+            value (CachedMime): The result
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._load()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.file_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        # an unreadable cache is only a slower start, so it is dropped
+        with contextlib.suppress(
+            struct.error, UnicodeDecodeError, ValueError, IndexError
+        ):
+            magic, version, signature, value_count, record_count = HEADER.unpack_from(
+                data
+            )
+            if (magic, version, signature) != (MAGIC, FORMAT_VERSION, self.signature):
+                return
+            offset = HEADER.size
+            values: list[CachedMime] = []
+            for _ in range(value_count):
+                (length,) = struct.unpack_from("<H", data, offset)
+                offset += 2
+                method, mime_type, language, preview_type = (
+                    data[offset : offset + length].decode("utf-8").split("\0")
+                )
+                offset += length
+                values.append(
+                    CachedMime(method, mime_type, language or None, preview_type)
+                )
+            records = data[offset : offset + record_count * RECORD.size]
+            entries: OrderedDict[int, CachedMime] = OrderedDict()
+            for key, value_index in RECORD.iter_unpack(records):
+                entries[key] = values[value_index]
+            # keep the most recently used ones, they are saved last
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._entries = entries
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed, replacing the file in one go."""
+        with self._lock:
+            if not self._dirty:
+                return
+            value_indexes: dict[CachedMime, int] = {}
+            records = bytearray()
+            for key, value in self._entries.items():
+                index = value_indexes.setdefault(value, len(value_indexes))
+                records += RECORD.pack(key, index)
+            record_count = len(self._entries)
+            self._dirty = False
+        encoded_values = bytearray()
+        for value in value_indexes:
+            encoded = "\0".join((
+                value.method,
+                value.mime_type,
+                value.language or "",
+                value.preview_type,
+            )).encode("utf-8")
+            encoded_values += struct.pack("<H", len(encoded)) + encoded
+        temp_path = f"{self.file_path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(
+                    HEADER.pack(
+                        MAGIC,
+                        FORMAT_VERSION,
+                        self.signature,
+                        len(value_indexes),
+                        record_count,
+                    )
+                )
+                f.write(encoded_values)
+                f.write(records)
+            os.replace(temp_path, self.file_path)
+        except OSError:
+            # something beyond our control
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+
+from PIL.Image import Image as PILImage
+
+
+class PDFPageCache:
+    """An LRU cache of the rendered pages of a single PDF.
+
+    Pages are keyed by their 0-based page number, so any page can be loaded
+    on its own without the pages before it. The page that was used last is
+    never evicted, even if it alone is over the budget.
+
+    Attributes:
+        max_bytes (int): The estimated memory budget for all pages, in bytes.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._pages: OrderedDict[int, tuple[PILImage, int]] = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, page: int) -> bool:
+        with self._lock:
+            return page in self._pages
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    def get(self, page: int) -> PILImage | None:
+        """Get a rendered page.
+
+        Args:
+            page (int): The 0-based page number
+
+        Returns:
+            PILImage | None: The page, or None if it is not loaded
+        """
+        with self._lock:
+            cached = self._pages.get(page)
+            if cached is None:
+                return None
+            self._pages.move_to_end(page)
+            return cached[0]
+
+    def put(self, page: int, image: PILImage) -> None:
+        """Store a rendered page, evicting the least recently used ones to fit.
+
+        Args:
+            page (int): The 0-based page number
+            image (PILImage): The rendered page
+        """
+        size = image.width * image.height * len(image.getbands())
+        with self._lock:
+            previous = self._pages.pop(page, None)
+            if previous is not None:
+                self._total_size -= previous[1]
+            self._pages[page] = (image, size)
+            self._total_size += size
+            while len(self._pages) > 1 and self._total_size > self.max_bytes:
+                _, (_, evicted_size) = self._pages.popitem(last=False)
+                self._total_size -= evicted_size
+
+    def clear(self) -> None:
+        """Drop every page."""
+        with self._lock:
+            self._pages.clear()
+            self._total_size = 0
@@ -0,0 +1,166 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from PIL.Image import Image as PILImage
+from rich.syntax import Syntax
+from rich.text import Text
+
+if TYPE_CHECKING:
+    from rovr.functions.path import MimeResult
+
+# path, mtime_ns, size, preview width, preview height, theme
+PreviewKey = tuple[str, int, int, int, int, str]
+
+
+class CachedPreview(NamedTuple):
+    file_type: str
+    mime_type: "MimeResult | None"
+    content: str | list[str] | None
+    renderable: Any
+    size: int
+
+
+class PreviewCache:
+    """A process-wide LRU cache of finished previews.
+
+    Previews are keyed by the file's path, `st_mtime_ns` and size, along with
+    the size of the preview and the theme, so a cached preview is only served
+    while the file is unchanged and it would still render the same way.
+
+    Attributes:
+        max_bytes (int): The estimated memory budget for all previews, in bytes. 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[PreviewKey, CachedPreview] = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(
+        file_path: str, width: int, height: int, theme: str
+    ) -> PreviewKey | None:
+        """Build the cache key of a file, which costs a single `stat`.
+
+        Args:
+            file_path (str): The path to the file
+            width (int): The width of the preview
+            height (int): The height of the preview
+            theme (str): The name of the current theme
+
+        Returns:
+            PreviewKey | None: The key, or None if the file cannot be stat-ed
+        """
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (
+            file_path,
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+            width,
+            height,
+            theme,
+        )
+
+    @staticmethod
+    def estimate_size(content: str | list[str] | None, renderable: Any) -> int:
+        """Roughly estimate how much memory a preview holds onto.
+
+        Args:
+            content (str | list[str] | None): The file content or archive members
+            renderable (Any): The rendered preview
+
+        Returns:
+            int: The estimated size in bytes
+        """
+        total = sys.getsizeof(content)
+        if isinstance(content, list):
+            total += sum(sys.getsizeof(item) for item in content)
+        if isinstance(renderable, PILImage):
+            total += renderable.width * renderable.height * len(renderable.getbands())
+        elif isinstance(renderable, Syntax):
+            # the highlighted segments are only built when rendering, the code is kept
+            total += sys.getsizeof(renderable.code)
+        elif isinstance(renderable, Text):
+            total += sys.getsizeof(renderable.plain) + 64 * len(renderable.spans)
+        elif isinstance(renderable, str):
+            total += sys.getsizeof(renderable)
+        return total
+
+    def get(self, key: PreviewKey | None) -> CachedPreview | None:
+        """Get a cached preview.
+
+        Args:
+            key (PreviewKey | None): The key from `make_key`
+
+        Returns:
+            CachedPreview | None: The cached preview, or None on a miss
+        """
+        if key is None or not self.enabled:
+            return None
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        return cached
+
+    def put(
+        self,
+        key: PreviewKey | None,
+        file_type: str,
+        mime_type: "MimeResult | None",
+        content: str | list[str] | None,
+        renderable: Any = None,
+    ) -> None:
+        """Store a preview, evicting the least recently used ones to fit.
+
+        Args:
+            key (PreviewKey | None): The key from `make_key`
+            file_type (str): The preview type the file was matched to
+            mime_type (MimeResult | None): The MIME type of the file
+            content (str | list[str] | None): The file content or archive members
+            renderable (Any): The rendered preview, if there is one to keep
+        """
+        if key is None or not self.enabled:
+            return
+        size = self.estimate_size(content, renderable)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            # older versions of the same file can never be served again
+            for stale_key in [
+                cached_key
+                for cached_key in self._entries
+                if cached_key[0] == key[0] and cached_key[1:3] != key[1:3]
+            ]:
+                self._pop(stale_key)
+            self._entries[key] = CachedPreview(
+                file_type, mime_type, content, renderable, size
+            )
+            self._total_size += size
+            while self._entries and self._total_size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_size -= evicted.size
+
+    def invalidate(self) -> None:
+        """Drop every cached preview."""
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
+
+    def _pop(self, key: PreviewKey) -> None:
+        # caller must hold the lock
+        cached = self._entries.pop(key, None)
+        if cached is not None:
+            self._total_size -= cached.size
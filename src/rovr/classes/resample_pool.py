@@ -0,0 +1,191 @@
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable
+
+
+def _serve(conn: Connection) -> None:
+    """Run tasks sent down the pipe until it is closed."""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        func, args = task
+        try:
+            result = func(*args)
+        except Exception as exc:
+            result = exc
+        try:
+            conn.send(result)
+        except (BrokenPipeError, OSError):
+            return
+
+
+class _PoolProcess:
+    def __init__(self, generation: int) -> None:
+        self.generation = generation
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(0.5)
+        except (BrokenPipeError, OSError):
+            pass
+        self.kill()
+
+
+class ResamplePool:
+    """A bounded pool of long-lived processes for resampling images.
+
+    Processes are only started once they are needed, and are then kept for
+    the next task. Unlike `ProcessPoolExecutor`, a task can be cancelled while
+    it runs: the process working on it is killed, and a new one takes its
+    place the next time one is needed.
+
+    Attributes:
+        max_workers (int): The maximum number of processes to keep.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._idle: list[_PoolProcess] = []
+        self._process_count = 0
+        # bumped on shutdown, so processes that were busy then are not kept
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def _acquire(
+        self, block: bool, cancelled: Callable[[], bool]
+    ) -> _PoolProcess | None:
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._process_count < self.max_workers:
+                    self._process_count += 1
+                    generation = self._generation
+                    break
+                if not block or cancelled():
+                    return None
+                self._condition.wait(0.1)
+        try:
+            return _PoolProcess(generation)
+        except Exception:
+            with self._condition:
+                self._process_count -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, process: _PoolProcess, reusable: bool) -> None:
+        with self._condition:
+            if reusable and process.generation == self._generation:
+                self._idle.append(process)
+                self._condition.notify()
+                return
+            if process.generation == self._generation:
+                self._process_count -= 1
+            self._condition.notify()
+        process.kill()
+
+    def map(
+        self,
+        func: Callable[..., Any],
+        payloads: list[tuple],
+        cancelled: Callable[[], bool],
+    ) -> list[Any] | None:
+        """Run a function over every payload, spread over the pool.
+
+        Args:
+            func (Callable[..., Any]): A picklable, module level function
+            payloads (list[tuple]): The arguments for each call
+            cancelled (Callable[[], bool]): Polled while waiting, return True to give up
+
+        Returns:
+            list[Any] | None: The results in order, or None if cancelled or a process died
+
+        Raises:
+            Exception: Whatever a call raised in its process
+        """  # noqa: DOC502
+        results: list[Any] = [None] * len(payloads)
+        pending = list(enumerate(payloads))[::-1]
+        busy: dict[Connection, tuple[_PoolProcess, int]] = {}
+        try:
+            while pending or busy:
+                if cancelled():
+                    return None
+                while pending:
+                    process = self._acquire(not busy, cancelled)
+                    if process is None:
+                        break
+                    index, payload = pending.pop()
+                    try:
+                        process.conn.send((func, payload))
+                    except (BrokenPipeError, OSError):
+                        self._release(process, reusable=False)
+                        return None
+                    busy[process.conn] = (process, index)
+                if not busy:
+                    continue
+                for conn in wait(list(busy), timeout=0.1):
+                    process, index = busy.pop(conn)  # ty: ignore[invalid-argument-type]
+                    try:
+                        result = process.conn.recv()
+                    except (EOFError, OSError):
+                        self._release(process, reusable=False)
+                        return None
+                    self._release(process, reusable=True)
+                    if isinstance(result, Exception):
+                        raise result
+                    results[index] = result
+            return results
+        finally:
+            # anything still running was cancelled, so its process is stuck on it
+            for process, _ in busy.values():
+                self._release(process, reusable=False)
+
+    def run(
+        self, func: Callable[..., Any], args: tuple, cancelled: Callable[[], bool]
+    ) -> Any | None:
+        """Run a function in the pool.
+
+        Args:
+            func (Callable[..., Any]): A picklable, module level function
+            args (tuple): The arguments for the call
+            cancelled (Callable[[], bool]): Polled while waiting, return True to give up
+
+        Returns:
+            Any | None: The result, or None if cancelled or the process died
+
+        Raises:
+            Exception: Whatever the call raised in its process
+        """  # noqa: DOC502
+        results = self.map(func, [args], cancelled)
+        return None if results is None else results[0]
+
+    def shutdown(self) -> None:
+        """Stop every idle process. Busy ones are stopped once their task is done.
+
+        The pool can still be used afterwards, and starts new processes as needed.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+            self._process_count = 0
+            self._condition.notify_all()
+        for process in idle:
+            process.stop()
@@ -0,0 +1,126 @@
+import contextlib
+import os
+import sys
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+# segments are rounded up to a power of two so they can be reused for similar sizes
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+
+class SharedMemoryPool:
+    """Hands out shared memory segments, keeping released ones for reuse.
+
+    Creating a segment costs a few system calls and mapping fresh pages, so
+    segments are rounded up to a power of two and kept after use, up to a
+    budget for idle segments. Idle segments still hold on to the memory that
+    was written to them, which is why the budget exists.
+
+    Attributes:
+        max_idle_bytes (int): The most memory to keep in idle segments.
+    """
+
+    def __init__(self, max_idle_bytes: int) -> None:
+        self.max_idle_bytes = max_idle_bytes
+        self._idle: dict[int, list[SharedMemory]] = {}
+        self._idle_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def segment_size(nbytes: int) -> int:
+        """Get the size of the segment that would be used for a buffer.
+
+        Args:
+            nbytes (int): The size of the buffer
+
+        Returns:
+            int: The size of the segment
+        """
+        return max(MIN_SEGMENT_SIZE, 1 << (max(nbytes, 1) - 1).bit_length())
+
+    @staticmethod
+    def attach(name: str) -> SharedMemory:
+        """Open a segment made by a pool in another process.
+
+        The segment stays owned by the pool that made it, so it is not handed
+        to the resource tracker, which would otherwise unlink it once this
+        process exits.
+
+        Args:
+            name (str): The name of the segment
+
+        Returns:
+            SharedMemory: The segment, which should be closed but not unlinked
+        """
+        if sys.version_info >= (3, 13):
+            return SharedMemory(name=name, track=False)
+        segment = SharedMemory(name=name)
+        if os.name == "posix":
+            # before 3.13 attaching registers the segment, so take it back out
+            resource_tracker.unregister(segment._name, "shared_memory")  # ty: ignore[unresolved-attribute]
+        return segment
+
+    @staticmethod
+    def buffer(segment: SharedMemory) -> memoryview:
+        """Get the memory of a segment.
+
+        Args:
+            segment (SharedMemory): An open segment
+
+        Returns:
+            memoryview: The segment's memory
+
+        Raises:
+            ValueError: If the segment was closed
+        """
+        buffer = segment.buf
+        if buffer is None:
+            raise ValueError(f"Shared memory segment {segment.name} is closed")
+        return buffer
+
+    def acquire(self, nbytes: int) -> SharedMemory:
+        """Get a segment that can hold at least `nbytes`.
+
+        Args:
+            nbytes (int): The size of the buffer
+
+        Returns:
+            SharedMemory: A segment, which must be given back with `release`
+        """
+        size = self.segment_size(nbytes)
+        with self._lock:
+            idle = self._idle.get(size)
+            if idle:
+                self._idle_bytes -= size
+                return idle.pop()
+        return SharedMemory(create=True, size=size)
+
+    def release(self, segment: SharedMemory) -> None:
+        """Give a segment back, keeping it for reuse if the budget allows.
+
+        Args:
+            segment (SharedMemory): A segment from `acquire`
+        """
+        size = self.segment_size(segment.size)
+        with self._lock:
+            if size == segment.size and self._idle_bytes + size <= self.max_idle_bytes:
+                self._idle.setdefault(size, []).append(segment)
+                self._idle_bytes += size
+                return
+        self._destroy(segment)
+
+    def close(self) -> None:
+        """Destroy every idle segment."""
+        with self._lock:
+            idle = [segment for segments in self._idle.values() for segment in segments]
+            self._idle.clear()
+            self._idle_bytes = 0
+        for segment in idle:
+            self._destroy(segment)
+
+    @staticmethod
+    def _destroy(segment: SharedMemory) -> None:
+        segment.close()
+        with contextlib.suppress(FileNotFoundError):
+            segment.unlink()
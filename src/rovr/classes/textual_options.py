@@ -1,4 +1,3 @@
-from os import DirEntry
 from typing import Literal, NamedTuple
 
 from textual.content import Content, ContentText
@@ -6,6 +5,7 @@ from textual.widgets import SelectionList
 from textual.widgets.option_list import Option
 from textual.widgets.selection_list import Selection
 
+from rovr.classes.file_entry import FileEntry
 from rovr.functions.path import normalise
 
 
@@ -60,9 +60,7 @@ class FileListSelectionWidget(Selection):
 
     def __init__(
         self,
-        icon: list[str],
-        label: str,
-        dir_entry: DirEntry,
+        dir_entry: FileEntry,
         clipboard: SelectionList,
         disabled: bool = False,
     ) -> None:
@@ -70,46 +68,90 @@ class FileListSelectionWidget(Selection):
         Initialise the selection.
 
         Args:
-            icon (list[str]): The icon list from a utils function.
-            label (str): The label for the option.
-            dir_entry (DirEntry): The nt.DirEntry class
+            dir_entry (FileEntry): The listing entry, which also provides the icon and label.
+            clipboard (SelectionList): The clipboard, used to dim cut items.
             disabled (bool) = False: The initial enabled/disabled state. Enabled by default.
         """
-        cache_key = (icon[0], icon[1])
-        if cache_key not in FileListSelectionWidget._icon_content_cache:
-            # Parse the icon markup once and cache it as Content
-            FileListSelectionWidget._icon_content_cache[cache_key] = (
-                Content.from_markup(f" [{icon[1]}]{icon[0]}[/{icon[1]}] ")
-            )
-
-        # Create prompt by combining cached icon content with label
-        prompt = FileListSelectionWidget._icon_content_cache[cache_key] + Content(label)
-        dir_entry_path = normalise(dir_entry.path)
-        if any(
-            clipboard_val.type_of_selection == "cut"
-            and dir_entry_path == clipboard_val.path
-            for clipboard_val in clipboard.selected
-        ):
-            prompt = prompt.stylize("dim")
         self.dir_entry = dir_entry
+        self.label = dir_entry.name
+        self._clipboard = clipboard
+        # whether the item is cut, None until it is resolved on first render
+        self._dimmed: bool | None = None
         this_id = str(id(self))
 
-        super().__init__(
-            prompt=prompt,
+        # Selection.__init__ would parse the prompt straight away, which is
+        # wasted work for the options that never get scrolled into view.
+        # the prompt is instead built the first time it is rendered, until
+        # then it is left as an empty string.
+        Option.__init__(
+            self,
+            prompt="",
             # this is kinda required for FileList.get_selected_object's select mode
             # because it gets selected (which is dictionary of values)
             # which it then queries for `id` (because there's no way to query for
             # values directly)
-            value=str(this_id),
-            id=str(this_id),
+            id=this_id,
             disabled=disabled,
         )
-        self._prompt: Content
-        self.label = label
+        self._value = this_id
+        self._initial_state = False
+
+    # same identity hash as Option's, without a python call each time the
+    # file list reindexes its options
+    __hash__ = object.__hash__
 
     @property
     def prompt(self) -> Content:
-        return self._prompt
+        prompt = self._prompt
+        if not isinstance(prompt, Content):
+            prompt = self._prompt = self._build_prompt()
+        return prompt
+
+    def _build_prompt(self) -> Content:
+        icon = self.dir_entry.icon
+        if icon not in FileListSelectionWidget._icon_content_cache:
+            # Parse the icon markup once and cache it as Content
+            FileListSelectionWidget._icon_content_cache[icon] = Content.from_markup(
+                f" [{icon[1]}]{icon[0]}[/{icon[1]}] "
+            )
+
+        # Create prompt by combining cached icon content with label
+        prompt = FileListSelectionWidget._icon_content_cache[icon] + Content(self.label)
+        if self._dimmed is None:
+            dir_entry_path = normalise(self.dir_entry.path)
+            self._dimmed = any(
+                clipboard_val.type_of_selection == "cut"
+                and dir_entry_path == clipboard_val.path
+                for clipboard_val in self._clipboard.selected
+            )
+        if self._dimmed:
+            prompt = prompt.stylize("dim")
+        return prompt
+
+    def update_dimmed(self, cut_paths: set[str]) -> None:
+        """Update whether the item is shown as cut.
+
+        Args:
+            cut_paths (set[str]): The normalised paths of all cut items.
+        """
+        if not isinstance(self._prompt, Content):
+            # never rendered, so let it check the clipboard when it is
+            self._dimmed = None
+            return
+        dimmed = normalise(self.dir_entry.path) in cut_paths
+        if dimmed != self._dimmed:
+            self._dimmed = dimmed
+            self._set_prompt("")
+
+    def replace_dir_entry(self, dir_entry: FileEntry) -> None:
+        """Show another entry with the same name, like a file that was saved over.
+
+        Args:
+            dir_entry (FileEntry): The new entry
+        """
+        self.dir_entry = dir_entry
+        # its icon can differ, so the prompt is built again when it is rendered
+        self._set_prompt("")
 
 
 class ClipboardSelectionValue(NamedTuple):
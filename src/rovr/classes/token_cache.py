@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+
+from pygments.lexer import Lexer
+from pygments.token import _TokenType
+
+Token = tuple[_TokenType, str]
+# path, mtime_ns, size, and the offset, line count and line size of the lines
+# the text was read from, or None if it is the start of the file
+TokenSource = tuple[str, int, int, tuple[int, int, int] | None]
+# the source, the length of the text, which changes if the file did while it
+# was read, and the lexer with the tab size it expands tabs to
+TokenKey = tuple[TokenSource, int, str, int]
+
+
+class _LazyTokens:
+    """The tokens of some text, lexed only as far as they have been read."""
+
+    def __init__(self, source: Iterator[Token]) -> None:
+        self._source: Iterator[Token] | None = source
+        self._tokens: list[Token] = []
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Token]:
+        index = 0
+        while True:
+            with self._lock:
+                if index == len(self._tokens):
+                    if self._source is None:
+                        return
+                    token = next(self._source, None)
+                    if token is None:
+                        self._source = None
+                        return
+                    self._tokens.append(token)
+                token = self._tokens[index]
+            yield token
+            index += 1
+
+
+class TokenCache:
+    """An LRU cache of the tokens pygments made for recently highlighted text.
+
+    Tokens are keyed by the file the text was read from, its `st_mtime_ns`
+    and size, and the lexer and its tab size, so the text itself is not kept or hashed. They
+    are only lexed as far as they are read, so text that is cut to a few lines when shown is only
+    lexed up to those lines, and showing more of it later carries on from
+    where lexing stopped.
+
+    Attributes:
+        max_entries (int): The maximum number of texts to keep tokens for.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[TokenKey, _LazyTokens] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_tokens(
+        self, lexer: Lexer, source: TokenSource, text: str
+    ) -> Iterator[Token]:
+        """Get the tokens of some text, lexing it only if it is not cached.
+
+        Args:
+            lexer (Lexer): The lexer to use
+            source (TokenSource): Where the text was read from
+            text (str): The text to lex
+
+        Returns:
+            Iterator[Token]: The tokens, as `lexer.get_tokens` would give them
+        """
+        key = (source, len(text), lexer.name or type(lexer).__name__, lexer.tabsize)
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is None:
+                tokens = self._entries[key] = _LazyTokens(lexer.get_tokens(text))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+        return iter(tokens)
+
+
+class CachedLexer(Lexer):
+    """Wraps a lexer so the tokens it makes for some text are kept in a `TokenCache`."""
+
+    def __init__(self, lexer: Lexer, cache: TokenCache, source: TokenSource) -> None:
+        super().__init__()
+        self.lexer = lexer
+        self.cache = cache
+        self.source = source
+        self.name = lexer.name
+        self.aliases = lexer.aliases
+
+    def get_tokens(self, text: str, unfiltered: bool = False) -> Iterator[Token]:
+        if unfiltered:
+            return self.lexer.get_tokens(text, unfiltered=True)
+        return self.cache.get_tokens(self.lexer, self.source, text)
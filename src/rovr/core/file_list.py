@@ -1,20 +1,38 @@
+import asyncio
+import bisect
+import contextlib
+import threading
+from functools import partial
+from operator import attrgetter
 from os import getcwd, listdir, path
-from typing import Callable, ClassVar, Iterable, Self, Sequence, cast
+from typing import (
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    KeysView,
+    Mapping,
+    Self,
+    Sequence,
+    overload,
+)
 
 from textual import events, on, work
 from textual.binding import BindingType
 from textual.content import ContentText
 from textual.css.query import NoMatches
-from textual.geometry import Region
-from textual.style import Style as TextualStyle
+from textual.geometry import Region, Size
+from textual.timer import Timer
 from textual.widgets import Button, Input, OptionList, SelectionList
 from textual.widgets.option_list import Option, OptionDoesNotExist
 from textual.widgets.selection_list import Selection, SelectionType
-from textual.worker import WorkerError
 
+from rovr.classes.adaptive_debounce import AdaptiveDebounce
+from rovr.classes.file_entry import FileEntry
 from rovr.classes.mixins import CheckboxRenderingMixin
 from rovr.classes.session_manager import SessionManager
 from rovr.classes.textual_options import FileListSelectionWidget
+from rovr.classes.type_aliases import SortByOptions
 from rovr.components import PopupOptionList
 from rovr.functions import icons as icon_utils
 from rovr.functions import path as path_utils
@@ -29,6 +47,73 @@ from rovr.variables.constants import (
 )
 
 
+def _next_chunk(
+    stream: Iterator[tuple[list[FileEntry], list[FileEntry], bool]],
+) -> tuple[list[FileEntry], list[FileEntry], bool] | None:
+    return next(stream, None)
+
+
+class _SingleLines(Sequence[tuple[int, int]]):
+    def __init__(self) -> None:
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[int, int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[int, int]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> tuple[int, int] | list[tuple[int, int]]:
+        if isinstance(index, slice):
+            return [(y, 0) for y in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return (index, 0)
+
+
+class _SingleLineMapping(Mapping[int, int]):
+    def __init__(self, lines: _SingleLines, same_as_index: bool) -> None:
+        self._source = lines
+        self._same_as_index = same_as_index
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self._source.length:
+            raise KeyError(index)
+        return index if self._same_as_index else 1
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._source.length))
+
+    def __len__(self) -> int:
+        return self._source.length
+
+
+class SingleLineCache:
+    """A stand-in for OptionList's line cache, for lists where every option is one line tall.
+
+    OptionList measures every option to lay itself out, which means building
+    and measuring a prompt for every single item in a directory. File names
+    never wrap, so the lines, heights and line offsets are all derived from
+    the option count instead, and only options that get scrolled into view
+    have their prompt built.
+    """
+
+    def __init__(self) -> None:
+        self.lines = _SingleLines()
+        self.heights = _SingleLineMapping(self.lines, same_as_index=False)
+        self.index_to_line = _SingleLineMapping(self.lines, same_as_index=True)
+
+    def clear(self) -> None:
+        self.lines.length = 0
+
+
 class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
     """
     OptionList but can multi-select files and folders.
@@ -53,12 +138,34 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
         """
         super().__init__(*args, **kwargs)
         self._options: list[FileListSelectionWidget] = []
+        self._single_line_cache = SingleLineCache()
+        self._line_cache = self._single_line_cache  # ty: ignore[invalid-assignment]
         self.dummy = dummy
         self.enter_into = enter_into
         self.select_mode_enabled = select
-        if not self.dummy:
-            self.items_in_cwd: set[str] = set()
         self.file_list_pause_check = False
+        # every scanned entry in the listed directory, hidden ones included,
+        # so that sorting and hiding are applied without scanning again
+        self._entries_in_cwd: dict[str, FileEntry] = {}
+        # the directory and (sort_by, descending) the current options were listed with
+        self._listed_cwd: str | None = None
+        self._listed_sort: tuple[SortByOptions, bool] = ("name", False)
+        # options made for the listed entries, including ones hidden since
+        self._name_to_option: dict[str, FileListSelectionWidget] = {}
+        # bumped whenever the listed entries change
+        self._listing_version = 0
+        # the index highlighted before the current one, to prefetch in the direction of travel
+        self._previous_highlighted: int | None = None
+        # previews wait for the highlight to rest while it is moved quickly
+        self._preview_debounce = AdaptiveDebounce(
+            config["interface"]["preview_debounce"]["delay"]
+        )
+        self._preview_timer: Timer | None = None
+
+    @property
+    def items_in_cwd(self) -> KeysView[str]:
+        """The names of every item in the listed directory, hidden ones included."""
+        return self._entries_in_cwd.keys()
 
     def on_mount(self) -> None:
         if not self.dummy and self.parent:
@@ -77,6 +184,11 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
         else:
             return None
 
+    def _highlighted_index(self) -> int | None:
+        # `highlighted` is typed as the reactive itself, this narrows it to its value
+        highlighted = self.highlighted
+        return highlighted if isinstance(highlighted, int) else None
+
     # ignore single clicks
     async def _on_click(self, event: events.Click) -> None:
         """
@@ -132,10 +244,12 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
             callback (Callable | None): A callback function to call after updating the file list.
         """
         cwd = path_utils.normalise(getcwd())
+        self._listed_cwd = None
 
         # Query StateManager for sort preferences
         state_manager = self.app.query_one("StateManager", StateManager)
         sort_by, sort_descending = state_manager.get_sort_prefs(cwd)
+        show_hidden = config["interface"]["show_hidden_files"]
 
         # get sessionstate
         try:
@@ -155,32 +269,82 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
 
             # Separate folders and files
             self.list_of_options: list[FileListSelectionWidget | Selection] = []
-            self.items_in_cwd: set[str] = set()
+            self._entries_in_cwd = {}
 
             to_highlight_index: int = -1
             if not focus_on and cwd in session.lastHighlighted:
                 last_highlight = session.lastHighlighted[cwd]
                 focus_on = last_highlight["name"]
             try:
-                worker = path_utils.threaded_get_cwd_object(
+                folders: list[FileEntry] = []
+                files: list[FileEntry] = []
+                # options shown while the scan was still running, reused for the final list
+                streamed_options: dict[str, FileListSelectionWidget] = {}
+                streamed_highlight: int | None = None
+                stop_scan = threading.Event()
+                # hidden items are always scanned, and only filtered out of the view
+                stream = path_utils.stream_cwd_object(
                     self,
                     cwd,
-                    config["interface"]["show_hidden_files"],
-                    sort_by=sort_by,
-                    reverse=sort_descending,
+                    True,
+                    first_chunk_size=max(self.size.height, 50),
+                    return_nothing_if_this_returns_true=stop_scan.is_set,
                 )
                 try:
-                    await worker.wait()
-                except WorkerError:
-                    return
-                if isinstance(worker.result, PermissionError):
-                    raise worker.result
-                folders, files = cast(
-                    tuple[
-                        list[path_utils.CWDObjectReturnDict],
-                        list[path_utils.CWDObjectReturnDict],
-                    ],
-                    worker.result,
+                    while True:
+                        chunk = await asyncio.to_thread(_next_chunk, stream)
+                        if chunk is None:
+                            # cut off early
+                            return
+                        chunk_folders, chunk_files, finished = chunk
+                        folders.extend(chunk_folders)
+                        files.extend(chunk_files)
+                        if finished:
+                            break
+                        # large directory, so show what we have while the scan continues
+                        self._add_streamed_chunk(
+                            *await asyncio.to_thread(
+                                path_utils.sort_cwd_object,
+                                chunk_folders,
+                                chunk_files,
+                                sort_by,
+                                sort_descending,
+                                show_hidden,
+                            ),
+                            streamed_options,
+                        )
+                        if streamed_highlight is None or (
+                            self.highlighted == streamed_highlight
+                            and focus_on in streamed_options
+                        ):
+                            # follow the item to focus on until the user moves
+                            self.highlighted = (
+                                self._option_to_index[streamed_options[focus_on]]
+                                if focus_on in streamed_options
+                                else 0
+                            )
+                            streamed_highlight = self.highlighted
+                finally:
+                    stop_scan.set()
+                    # closes the scandir handle if the scan was left halfway,
+                    # a scan that is still running stops on its own
+                    with contextlib.suppress(ValueError):
+                        stream.close()
+                if (
+                    streamed_highlight is not None
+                    and self.highlighted != streamed_highlight
+                    and isinstance(self.highlighted_option, FileListSelectionWidget)
+                ):
+                    focus_on = self.highlighted_option.dir_entry.name
+                entries_in_cwd = {item.name: item for item in folders}
+                entries_in_cwd.update((item.name, item) for item in files)
+                folders, files = await asyncio.to_thread(
+                    path_utils.sort_cwd_object,
+                    folders,
+                    files,
+                    sort_by,
+                    sort_descending,
+                    show_hidden,
                 )
                 if not folders and not files:
                     self.list_of_options.append(
@@ -192,18 +356,23 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
                     file_list_options = folders + files
 
                     self.list_of_options = [
-                        FileListSelectionWidget(
-                            icon=item["icon"],
-                            label=item["name"],
-                            dir_entry=item["dir_entry"],
-                            clipboard=self.app.Clipboard,
-                        )
+                        streamed_options.get(item.name) or self._make_option(item)
                         for item in file_list_options
                     ]
                     name_to_index: dict[str, int] = {
-                        item["name"]: i for i, item in enumerate(file_list_options)
+                        item.name: i for i, item in enumerate(file_list_options)
+                    }
+                    self._entries_in_cwd = entries_in_cwd
+                    self._listing_version += 1
+                    self._name_to_option = {
+                        option.dir_entry.name: option
+                        for option in self.list_of_options
+                        if isinstance(option, FileListSelectionWidget)
                     }
-                    self.items_in_cwd = set(name_to_index)
+                    self._listed_cwd = cwd
+                    self._listed_sort = (sort_by, sort_descending)
+                    if path_utils.remime_rules and files:
+                        self.classify_files([item.path for item in files])
                     if focus_on in name_to_index:
                         to_highlight_index = name_to_index[focus_on]
 
@@ -310,6 +479,382 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
             if callback:
                 callback()
 
+    def _make_option(self, item: FileEntry) -> FileListSelectionWidget:
+        return FileListSelectionWidget(dir_entry=item, clipboard=self.app.Clipboard)
+
+    def _add_streamed_chunk(
+        self,
+        folders: list[FileEntry],
+        files: list[FileEntry],
+        streamed_options: dict[str, FileListSelectionWidget],
+    ) -> None:
+        """Show a chunk of a directory that is still being scanned.
+
+        Each chunk is sorted on its own and appended, the whole list gets
+        sorted once the scan finishes.
+
+        Args:
+            folders (list[FileEntry]): The sorted folders in this chunk
+            files (list[FileEntry]): The sorted files in this chunk
+            streamed_options (dict[str, FileListSelectionWidget]): The options shown so far, updated in place
+        """
+        new_options = [self._make_option(item) for item in folders + files]
+        for option in new_options:
+            streamed_options[option.dir_entry.name] = option
+        if len(streamed_options) == len(new_options):
+            self.set_options(new_options)
+        else:
+            self.add_options(new_options)
+
+    def apply_changes(
+        self, cwd: str, added: list[FileEntry], removed: set[str]
+    ) -> None:
+        """Apply changes in the listed directory to the options in place.
+
+        New items are inserted at their sorted position, found with a binary
+        search over the sort keys the listed entries already hold, so nothing
+        else is rebuilt or re-sorted. Inserting and removing still moves the
+        options after them along, which is O(n) but only a memmove. An item
+        that was replaced keeps its option if it still sorts to the same
+        place, and its selection if it has to move. The highlighted item, the
+        selection and the scroll offset are left alone. Anything that needs
+        more than that, like the directory becoming empty, falls back to a
+        full update.
+
+        Args:
+            cwd (str): The normalised directory the changes are for
+            added (list[FileEntry]): The items that are new or were replaced, hidden ones included
+            removed (set[str]): The names of the items that are gone
+        """
+        if self.file_list_pause_check or cwd != path_utils.normalise(getcwd()):
+            # moved somewhere else since, that listing is already up to date
+            return
+        removed = (removed | {entry.name for entry in added}) & self.items_in_cwd
+        hidden_added: list[FileEntry] = []
+        if not config["interface"]["show_hidden_files"]:
+            # still kept track of, just not shown
+            hidden_added = [entry for entry in added if entry.hidden]
+            added = [entry for entry in added if not entry.hidden]
+        removed_options = [
+            option
+            for option in map(self._name_to_option.get, removed)
+            if option in self._option_to_index
+        ]
+        if (
+            cwd != self._listed_cwd
+            or self.input.value
+            or len(self._options) - len(removed_options) + len(added) == 0
+        ):
+            # showing search results or a placeholder instead of the listing
+            self.app.cd(cwd)
+            return
+        highlighted_option = self.highlighted_option
+        old_highlighted = self._highlighted_index()
+        self._listing_version += 1
+        sort_by, descending = self._listed_sort
+
+        # replaced items that still sort to the same place keep their option
+        replaced_in_place: set[str] = set()
+        for entry in added:
+            option = self._name_to_option.get(entry.name)
+            index = None if option is None else self._option_to_index.get(option)
+            if (
+                option is not None
+                and index is not None
+                and self._sorts_at(index, entry, sort_by, descending)
+            ):
+                option.replace_dir_entry(entry)
+                self._entries_in_cwd[entry.name] = entry
+                replaced_in_place.add(entry.name)
+        if replaced_in_place:
+            removed -= replaced_in_place
+            added = [entry for entry in added if entry.name not in replaced_in_place]
+            removed_options = [
+                option
+                for option in removed_options
+                if option.dir_entry.name not in replaced_in_place
+            ]
+        # the others move, so their selection is moved onto the new option
+        reselect = {
+            option.dir_entry.name
+            for option in removed_options
+            if option.value in self._selected
+        }
+
+        first_changed = len(self._options)
+        for name in removed:
+            self._entries_in_cwd.pop(name, None)
+            self._name_to_option.pop(name, None)
+        for entry in hidden_added:
+            self._entries_in_cwd[entry.name] = entry
+        if removed_options:
+            removed_indexes = sorted(
+                (self._option_to_index[option] for option in removed_options),
+                reverse=True,
+            )
+            with self.prevent(SelectionList.SelectedChanged):
+                for index in removed_indexes:
+                    option = self._options.pop(index)
+                    self.list_of_options.pop(index)
+                    self._deselect(option.value)
+                    self._values.pop(option.value, None)
+                    del self._option_to_index[option]
+                    if option.id is not None:
+                        self._id_to_option.pop(option.id, None)
+            first_changed = removed_indexes[-1]
+
+        for entry in added:
+            index = self._insertion_index(entry, sort_by, descending)
+            option = self._make_option(entry)
+            self._options.insert(index, option)
+            self.list_of_options.insert(index, option)
+            if option.id is not None:
+                self._id_to_option[option.id] = option
+            first_changed = min(first_changed, index)
+            self._entries_in_cwd[entry.name] = entry
+            self._name_to_option[entry.name] = option
+            if entry.name in reselect:
+                with self.prevent(SelectionList.SelectedChanged):
+                    self._select(option.value)
+
+        self._reindex_options(first_changed)
+        self._restore_highlight(cwd, highlighted_option, old_highlighted)
+
+    @work(exclusive=True)
+    async def update_view(self) -> None:
+        """Re-sort and filter the listed items after the sort order or hidden files setting changed.
+
+        This works on the entries that were already scanned, reusing their
+        options, so the directory is not scanned again. Sorting by size or
+        time only stats entries that were never sorted by it before.
+        """
+        cwd = path_utils.normalise(getcwd())
+        if self.file_list_pause_check or cwd != self._listed_cwd or self.input.value:
+            # a scan is running, or the listing is not what is shown, so list it again
+            self.update_file_list(add_to_session=False)
+            return
+        state_manager = self.app.query_one("StateManager", StateManager)
+        sort_by, sort_descending = state_manager.get_sort_prefs(cwd)
+        show_hidden = config["interface"]["show_hidden_files"]
+        listing_version = self._listing_version
+        options, created = await asyncio.to_thread(
+            self._sorted_options, sort_by, sort_descending, show_hidden
+        )
+        if cwd != self._listed_cwd:
+            # being listed again already
+            return
+        if listing_version != self._listing_version:
+            # changes were applied while sorting, so sort again
+            self.update_view()
+            return
+        if not options:
+            # leave the placeholder to a full update
+            self.update_file_list(add_to_session=False)
+            return
+        highlighted_option = self.highlighted_option
+        old_highlighted = self._highlighted_index()
+        for option in created:
+            self._name_to_option[option.dir_entry.name] = option
+        shown_changed = bool(created) or len(options) != len(self._options)
+        self._options[:] = options
+        self.list_of_options = list(options)
+        self._option_to_index.clear()
+        self._values.clear()
+        self._listed_sort = (sort_by, sort_descending)
+        self._reindex_options(0)
+        if shown_changed:
+            self._id_to_option.clear()
+            self._id_to_option.update(zip(map(attrgetter("_id"), options), options))
+            with self.prevent(SelectionList.SelectedChanged):
+                for value in list(self._selected):
+                    if value not in self._values:
+                        # hidden now
+                        self._deselect(value)
+        self._restore_highlight(cwd, highlighted_option, old_highlighted)
+
+    def _sorted_options(
+        self, sort_by: SortByOptions, descending: bool, show_hidden: bool
+    ) -> tuple[list[FileListSelectionWidget], list[FileListSelectionWidget]]:
+        """Sort and filter the listed entries into options, meant to run in a thread.
+
+        Args:
+            sort_by (SortByOptions): What to sort by
+            descending (bool): Whether to sort in descending order
+            show_hidden (bool): Whether to show hidden items
+
+        Returns:
+            tuple[list[FileListSelectionWidget], list[FileListSelectionWidget]]:
+                The options to show, and the ones among them that had to be made
+        """
+        entries = list(self._entries_in_cwd.values())
+        folders, files = path_utils.sort_cwd_object(
+            [entry for entry in entries if entry.is_dir()],
+            [entry for entry in entries if not entry.is_dir()],
+            sort_by,
+            descending,
+            show_hidden,
+        )
+        name_to_option = self._name_to_option
+        options: list[FileListSelectionWidget] = []
+        created: list[FileListSelectionWidget] = []
+        for item in folders + files:
+            option = name_to_option.get(item.name)
+            if option is None:
+                option = self._make_option(item)
+                created.append(option)
+            options.append(option)
+        return options, created
+
+    def _reindex_options(self, start: int) -> None:
+        """Update the index maps and caches after options were moved around.
+
+        `list_of_options` is expected to be updated along with the options.
+
+        Args:
+            start (int): The index of the first option that moved
+        """
+        moved = self._options[start:]
+        new_indexes = range(start, len(self._options))
+        self._option_to_index.update(zip(moved, new_indexes))
+        self._values.update(zip(map(attrgetter("_value"), moved), new_indexes))
+        self._mouse_hovering_over = None
+        # rendered options hold their index, for the mouse to find them
+        self._clear_caches()
+        self._update_lines()
+
+    def _restore_highlight(
+        self,
+        cwd: str,
+        highlighted_option: FileListSelectionWidget | None,
+        old_highlighted: int | None,
+    ) -> None:
+        """Keep the highlight on the same item after options were moved around.
+
+        Args:
+            cwd (str): The listed directory
+            highlighted_option (FileListSelectionWidget | None): The option that was highlighted
+            old_highlighted (int | None): The index that was highlighted
+        """
+        current_option = (
+            None
+            if highlighted_option is None
+            else self._name_to_option.get(highlighted_option.dir_entry.name)
+        )
+        if current_option not in self._option_to_index:
+            current_option = None
+        if current_option is not None and current_option is highlighted_option:
+            # same item, maybe moved, so there is nothing new to preview
+            with self.prevent(OptionList.OptionHighlighted):
+                self.highlighted = self._option_to_index[current_option]
+            self.app.tabWidget.active_tab.session.lastHighlighted[cwd] = {
+                "name": current_option.dir_entry.name,
+                "index": self.highlighted,
+            }
+        else:
+            # the highlighted item was replaced or is gone, so preview what is there now
+            self.highlighted = None
+            self.highlighted = (
+                old_highlighted
+                if current_option is None
+                else self._option_to_index[current_option]
+            )
+        if self.select_mode_enabled:
+            session: SessionManager = self.app.tabWidget.active_tab.session
+            session.selectedItems = [
+                {
+                    "name": option.dir_entry.name,
+                    "index": self._option_to_index[option],
+                }
+                for option in map(self.get_option, self.selected)
+                if isinstance(option, FileListSelectionWidget)
+            ]
+        self.update_border_subtitle()
+
+    def _sorts_at(
+        self, index: int, entry: FileEntry, sort_by: SortByOptions, descending: bool
+    ) -> bool:
+        """Check whether an entry can replace the option at an index and stay sorted.
+
+        Args:
+            index (int): The index of the option it replaces
+            entry (FileEntry): The new entry
+            sort_by (SortByOptions): What the options are sorted by
+            descending (bool): Whether the options are in descending order
+
+        Returns:
+            bool: Whether the options stay sorted with the entry at that index
+        """
+        options = self._options
+        is_dir = entry.is_dir()
+        if options[index].dir_entry.is_dir() != is_dir:
+            return False
+        sort_key = path_utils.get_sort_key(sort_by, folders=is_dir)
+        if sort_key is None:
+            return True
+        new_key = sort_key(entry)
+        # folders always come before files, so only neighbours of the same kind count
+        if index > 0 and options[index - 1].dir_entry.is_dir() == is_dir:
+            before = sort_key(options[index - 1].dir_entry)
+            if (before < new_key) if descending else (new_key < before):
+                return False
+        if index + 1 < len(options) and options[index + 1].dir_entry.is_dir() == is_dir:
+            after = sort_key(options[index + 1].dir_entry)
+            if (new_key < after) if descending else (after < new_key):
+                return False
+        return True
+
+    def _insertion_index(
+        self, entry: FileEntry, sort_by: SortByOptions, descending: bool
+    ) -> int:
+        """Find where an entry goes in the sorted options with a binary search.
+
+        Args:
+            entry (FileEntry): The entry to insert
+            sort_by (SortByOptions): What the options are sorted by
+            descending (bool): Whether the options are in descending order
+
+        Returns:
+            int: The index to insert the entry at
+        """
+        options = self._options
+        # folders always come before files
+        folder_count = bisect.bisect_left(
+            options, True, key=lambda option: not option.dir_entry.is_dir()
+        )
+        if entry.is_dir():
+            low, high = 0, folder_count
+        else:
+            low, high = folder_count, len(options)
+        sort_key = path_utils.get_sort_key(sort_by, folders=entry.is_dir())
+        if sort_key is None:
+            return high
+        new_key = sort_key(entry)
+        if not descending:
+            return bisect.bisect_right(
+                options,
+                new_key,
+                low,
+                high,
+                key=lambda option: sort_key(option.dir_entry),
+            )
+        while low < high:
+            middle = (low + high) // 2
+            if sort_key(options[middle].dir_entry) < new_key:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    @work(thread=True, exclusive=True, group="file_magic")
+    def classify_files(self, file_paths: list[str]) -> None:
+        """Get file(1)'s MIME types of a folder's files in the background,
+        so previewing a file that is remimed does not wait for it.
+
+        Args:
+            file_paths (list[str]): The files, in the order they are listed
+        """
+        path_utils.file_magic.classify_many(file_paths, utils.should_cancel)
+
     @work(thread=True)
     def update_from_session(
         self, session: SessionManager, name_to_index: dict[str, int]
@@ -421,25 +966,90 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
         # total files as footer
         if self.highlighted is None:
             self.highlighted = 0
-        # preview
-        await self.app.query_one("PreviewContainer").show_preview(
+        if self._preview_timer is not None:
+            self._preview_timer.stop()
+            self._preview_timer = None
+        delay = (
+            self._preview_debounce.delay_for()
+            if config["interface"]["preview_debounce"]["enabled"]
+            else 0
+        )
+        if not delay:
+            await self.show_highlighted_preview(highlighted_option.dir_entry)
+            return
+        # only the name is shown until the highlight stops moving
+        self.app.query_one("PreviewContainer").show_placeholder(
             highlighted_option.dir_entry.path
         )
-        self.app.query_one("MetadataContainer").update_metadata(event.option.dir_entry)
+        self.app.query_one("#unzip").disabled = True
+        self._preview_timer = self.set_timer(
+            delay, partial(self.show_highlighted_preview, highlighted_option.dir_entry)
+        )
+
+    async def show_highlighted_preview(self, dir_entry: FileEntry) -> None:
+        """Preview a highlighted file, and show its metadata.
+
+        Args:
+            dir_entry (FileEntry): The file, skipped if it is no longer highlighted
+        """
+        self._preview_timer = None
+        highlighted_option = self.highlighted_option
+        if (
+            highlighted_option is None
+            or highlighted_option.dir_entry.path != dir_entry.path
+        ):
+            return
+        preview_container = self.app.query_one("PreviewContainer")
+        await preview_container.show_preview(dir_entry.path)
+        preview_container.prefetch_previews(
+            self.get_neighbour_paths(config["settings"]["cache"]["preview_prefetch"])
+        )
+        self.app.query_one("MetadataContainer").update_metadata(dir_entry)
         self.app.query_one("#unzip").disabled = not await utils.is_archive(
-            highlighted_option.dir_entry.path
+            dir_entry.path
         )
 
     @property
     def options(self) -> Sequence[FileListSelectionWidget]:
         return self._options
 
+    def get_neighbour_paths(self, count: int) -> list[str]:
+        """Get the files around the highlighted option, nearest first.
+
+        Args:
+            count (int): How many options above and below to look at
+
+        Returns:
+            list[str]: The paths, starting with the direction the highlight moved in
+        """
+        highlighted = self._highlighted_index()
+        if highlighted is None:
+            return []
+        step = (
+            -1
+            if self._previous_highlighted is not None
+            and self._previous_highlighted > highlighted
+            else 1
+        )
+        self._previous_highlighted = highlighted
+        paths: list[str] = []
+        for distance in range(1, count + 1):
+            for index in (highlighted + distance * step, highlighted - distance * step):
+                if not 0 <= index < len(self._options):
+                    continue
+                option = self._options[index]
+                if isinstance(option, FileListSelectionWidget) and (
+                    option.dir_entry.is_file()
+                ):
+                    paths.append(option.dir_entry.path)
+        return paths
+
     async def toggle_hidden_files(self) -> None:
         """Toggle the visibility of hidden files."""
         config["interface"]["show_hidden_files"] = not config["interface"][
             "show_hidden_files"
         ]
-        self.update_file_list(add_to_session=False)
+        self.update_view()
         status = (
             "[$success underline]shown"
             if config["interface"]["show_hidden_files"]
@@ -500,15 +1110,11 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
         Args:
             paths (list[str]): The list of paths to dim.
         """
-        if paths is None:
-            paths = []
         if self.option_count == 0 or self.get_option_at_index(0).disabled:
             return
+        cut_paths = set(paths or [])
         for option in self.options:
-            if path_utils.normalise(option.dir_entry.path) in paths:
-                option._set_prompt(option.prompt.stylize("dim"))
-            else:
-                option._set_prompt(option.prompt.stylize(TextualStyle(dim=False)))
+            option.update_dimmed(cut_paths)
         self._clear_caches()
         self._update_lines()
         self.refresh()
@@ -794,6 +1400,20 @@ class FileList(CheckboxRenderingMixin, SelectionList, inherit_bindings=False):
                 immediate=True,
             )
 
+    def _update_lines(self) -> None:
+        # every option is exactly one line, see SingleLineCache
+        if not self.scrollable_content_region:
+            return
+        self._single_line_cache.lines.length = len(self._options)
+        width = self.scrollable_content_region.width - self._get_left_gutter_width()
+        virtual_size = Size(width, len(self._options))
+        if virtual_size != self.virtual_size:
+            self.virtual_size = virtual_size
+            self._scroll_update(virtual_size)
+
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        return len(self._options)
+
     def set_options(
         self,
         options: Iterable[
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import contextlib
+import os
 import subprocess
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from functools import partial
 from io import BytesIO
 from os import path
 from time import time
-from typing import cast
+from typing import Any, Literal, cast
 
 import textual_image.widget
-from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
+from PIL import Image, UnidentifiedImageError
 from PIL.Image import Image as PILImage
 from resvg_py import svg_to_bytes
 from rich.syntax import Syntax
@@ -21,27 +23,35 @@ from textual.containers import Container
 from textual.css.query import NoMatches
 from textual.dom import DOMNode
 from textual.geometry import Size
-from textual.highlight import guess_language
 from textual.message import Message
 from textual.timer import Timer
 from textual.widget import Widget
 from textual.widgets import Static
 from textual.widgets.selection_list import Selection
+from textual.worker import Worker
 
 from rovr.classes.archive import Archive, BadArchiveError
+from rovr.classes.cancellable_process import CancellableProcess, ProcessResult
+from rovr.classes.exceptions import ProcessCancelled
+from rovr.classes.line_index import LineIndex
+from rovr.classes.mime_cache import CachedMime, MimeCache
+from rovr.classes.pdf_page_cache import PDFPageCache
+from rovr.classes.preview_cache import PreviewKey
 from rovr.classes.textual_options import (
     ArchiveFileListSelection,
     FileListSelectionWidget,
 )
 from rovr.core import FileList
+from rovr.functions import highlight, preview_utils
 from rovr.functions import icons as icon_utils
 from rovr.functions import path as path_utils
-from rovr.functions import preview_utils
-from rovr.functions.pdf import get_pdf_images, get_pdf_info
+from rovr.functions.pdf import get_pdf_images, get_pdf_info, get_scale_to
 from rovr.functions.utils import should_cancel
-from rovr.variables.constants import PreviewContainerTitles, config, file_executable
+from rovr.variables.constants import PreviewContainerTitles, config
 
 titles = PreviewContainerTitles()
+# the most of bat's output that is kept, more than enough to fill the preview
+BAT_MAX_OUTPUT = 1024 * 1024
 
 
 # to any ai models looking at this, shut the fuck up
@@ -62,32 +72,36 @@ class PDFHandler:
     # like get_pdf_images expects 1 based indexing
     current_page: int = 0
     total_pages: int = 0
-    images: list[PILImage] | None = None
-
-    def count_loaded(self) -> int:
-        return 0 if self.images is None else len(self.images)
-
-    def must_load_next_batch(self) -> bool:
-        return self.current_page >= self.count_loaded()
-
-    def should_load_next_batch(self) -> bool:
-        if self.count_loaded() >= self.total_pages:
-            return False
-
-        # If going further down half the batch will cross currently loaded pages
-        # then its better to preload in advance
-        return (
-            self.current_page + PDFHandler.pdf_batch_size() // 2
-        ) >= self.count_loaded()
-
-    def get_last_page_to_load(self) -> int:
-        # We should load till current page, if user scrolls too fast and reaches
-        # beyond the batch before our load. This can happen on slow loads, and smaller batch sizes
-        last_page = max(
-            self.current_page + 1,
-            self.count_loaded() + PDFHandler.pdf_batch_size(),
+    # whether the page count is known and the first page was shown
+    loaded: bool = False
+    pages: PDFPageCache = field(
+        default_factory=lambda: PDFPageCache(
+            config["settings"]["cache"]["pdf_pages_max_memory"] * 1024 * 1024
         )
-        return min(last_page, self.total_pages)
+    )
+    # the pixel size the loaded pages were rendered to fit in
+    render_size: tuple[int, int] | None = None
+    # how poppler is asked to scale pages, None for a fixed DPI
+    scale_to: tuple[int, int] | None = None
+
+    def reset(self) -> None:
+        self.current_page = 0
+        self.total_pages = 0
+        self.loaded = False
+        self.pages.clear()
+        self.render_size = None
+        self.scale_to = None
+
+    def get_pages_to_load(self) -> list[int]:
+        # Only the current page and the ones around it are rendered, so jumping
+        # far ahead never renders every page in between
+        first_page = max(0, self.current_page - PDFHandler.pdf_batch_size() // 2)
+        last_page = min(
+            self.total_pages - 1, self.current_page + PDFHandler.pdf_batch_size()
+        )
+        return [
+            page for page in range(first_page, last_page + 1) if page not in self.pages
+        ]
 
     @staticmethod
     def pdf_batch_size() -> int:
@@ -102,6 +116,37 @@ class PDFHandler:
         return poppler_folder
 
 
+@dataclass
+class TextHandler:
+    # the lines of the file, opened once the preview is first scrolled
+    index: LineIndex | None = None
+    encoding: str = "utf-8"
+    # where the first line shown starts, in bytes
+    offset: int = 0
+    # the 0 indexed number of the first line shown, None until it is indexed
+    line: int | None = 0
+    # scrolling that has not been shown yet, as keys can come in faster than that
+    pending_lines: int = 0
+    # the start, the end, or a 0 indexed line to jump to
+    jump_to: Literal["home", "end"] | int | None = None
+    # digits typed before a jump, to pick the line to jump to
+    count: str = ""
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    render_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def reset(self) -> None:
+        with self.lock:
+            if self.index is not None:
+                self.index.stop()
+            self.index = None
+            self.encoding = "utf-8"
+            self.offset = 0
+            self.line = 0
+            self.pending_lines = 0
+            self.jump_to = None
+            self.count = ""
+
+
 class LoadingPreview(Static):
     """Make the preview look empty"""
 
@@ -140,6 +185,9 @@ class PreviewContainer(Container):
         self._file_type: str = "none"
         self._file_mtime: float | None = None
         self._mime_type: path_utils.MimeResult | None = None
+        self._preview_key: PreviewKey | None = None
+        # the finished preview of the current file, when it came from the preview cache
+        self._cached_renderable: Any = None
         self._preview_texts: dict[str, str] = config["interface"]["preview_text"]
         # this is kind of necessary, take a look at
         # https://github.com/NSPC911/textual-trials/blob/master/loading_has_no_size.py
@@ -148,11 +196,31 @@ class PreviewContainer(Container):
         # caching it solves it, so i guess we are caching it for now /shrug
         self._cached_size: Size | None = None
         self.pdf = PDFHandler()
+        self.text = TextHandler()
         self._loading_debounce_timer: Timer | None = None
+        # files to render previews for in the background, nearest first
+        self._prefetch_paths: list[str] = []
+        self._prefetching: str | None = None
+        self._prefetch_worker: Worker | None = None
+        # prefetching waits for the visible preview, so it never competes with it
+        self._previews_running = 0
+        # notified when the last running preview finishes, or prefetching is cancelled
+        self._previews_done = threading.Condition()
 
     def compose(self) -> ComposeResult:
         yield Static(self._preview_texts["start"], classes="special")
 
+    def on_unmount(self) -> None:
+        # wake up prefetching waiting on a preview, so it sees it was cancelled
+        self.workers.cancel_group(self, "preview_prefetch")
+        with self._previews_done:
+            self._previews_done.notify_all()
+        preview_utils.resample_pool.shutdown()
+        preview_utils.shared_memory_pool.close()
+        self.text.reset()
+        path_utils.mime_cache.save()
+        path_utils.file_magic.close()
+
     def get_loading_widget(self) -> Widget:
         """Get a widget to display a loading indicator.
 
@@ -190,6 +258,42 @@ class PreviewContainer(Container):
         except NoMatches:
             return None
 
+    def cache_preview(self, renderable: Any = None) -> None:
+        """Keep the preview that was just shown, so coming back to it is instant.
+
+        Args:
+            renderable(Any): The finished preview, if there is one to keep
+        """
+        if should_cancel():
+            return
+        preview_utils.preview_cache.put(
+            self._preview_key,
+            self._file_type,
+            self._mime_type,
+            self._current_content,
+            renderable,
+        )
+
+    def mount_image(self, image: PILImage) -> None:
+        """Show an image, reusing the image widget if there is one. Runs in a thread.
+
+        Args:
+            image(PILImage): The image to show
+        """
+        if should_cancel():
+            return
+        if image_widget := self.has_child(".image_preview"):
+            self.app.call_from_thread(setattr, image_widget, "image", image)
+        else:
+            self.app.call_from_thread(self.remove_children)
+
+            if should_cancel():
+                return
+
+            image_widget = NewImage(image)
+            image_widget.can_focus = True
+            self.app.call_from_thread(self.mount, image_widget)
+
     def show_font_preview(self) -> None:
         """Show font preview with PIL.ImageFont and a custom PIL.ImageDraw"""
         from textual.color import Color
@@ -199,7 +303,15 @@ class PreviewContainer(Container):
 
         self.app.call_from_thread(setattr, self, "border_title", titles.font)
 
+        if isinstance(self._cached_renderable, PILImage):
+            self.mount_image(self._cached_renderable)
+            return
+
         fg_color = Color.parse(self.app.theme_variables["foreground"])
+        canvas_size = (
+            max(1000, preview_utils.MAX_SIZE[0] // 2),
+            max(1000, preview_utils.MAX_SIZE[1] // 2),
+        )
         text_fill: tuple[int, ...]
         # need to do this weird check because sixel doesn't support transparency
         # so just check whether auto renderer is sixel, and config configured
@@ -213,30 +325,25 @@ class PreviewContainer(Container):
             config["interface"]["image_viewer"]["protocol"] in ("Sixel", "Auto", "")
         ):
             bg_color = Color.parse(self.app.theme_variables["background"])
-            img = Image.new(
-                "RGB",
-                (
-                    max(1000, preview_utils.MAX_SIZE[0] // 2),
-                    max(1000, preview_utils.MAX_SIZE[1] // 2),
-                ),
-                color=(bg_color.r, bg_color.g, bg_color.b),
-            )
+            mode = "RGB"
+            background: tuple[int, ...] = (bg_color.r, bg_color.g, bg_color.b)
             text_fill = (fg_color.r, fg_color.g, fg_color.b)
         else:
-            img = Image.new(
-                "RGBA",
-                (
-                    max(1000, preview_utils.MAX_SIZE[0] // 2),
-                    max(1000, preview_utils.MAX_SIZE[1] // 2),
-                ),
-                color=(0, 0, 0, 0),
-            )
+            mode = "RGBA"
+            background = (0, 0, 0, 0)
             text_fill = (fg_color.r, fg_color.g, fg_color.b, 255)
-        draw = ImageDraw.Draw(img)
 
         try:
-            font = ImageFont.truetype(self._current_file_path, size=40)
-            if should_cancel():
+            # drawn in the resample pool, so a huge font can be killed when cancelled
+            img = preview_utils.render_font(
+                self._current_file_path,
+                self._preview_texts["font_text"],
+                canvas_size,
+                mode,
+                background,
+                text_fill,
+            )
+            if img is None or should_cancel():
                 return
         except OSError:
             if should_cancel():
@@ -250,37 +357,11 @@ class PreviewContainer(Container):
                 ),
             )
             return
-        text = self._preview_texts["font_text"]
-        # used for centering
-        bbox = draw.multiline_textbbox((0, 0), text, font=font)
-        text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        width, height = img.size
-
-        draw.multiline_text(
-            (
-                (width - text_width) // 2 - bbox[0],
-                (height - text_height) // 2 - bbox[1],
-            ),
-            text,
-            font=font,
-            fill=text_fill,
-        )
-        if should_cancel():
-            return
 
         try:
-            if image_widget := self.has_child(".image_preview"):
-                self.app.call_from_thread(setattr, image_widget, "image", img)
-            else:
-                self.app.call_from_thread(self.remove_children)
-
-                if should_cancel():
-                    return
-
-                image_widget = NewImage(img)
-                # no need to resample, already ensured that canvas is max size
-                image_widget.can_focus = True
-                self.app.call_from_thread(self.mount, image_widget)
+            # no need to resample, already ensured that canvas is max size
+            self.mount_image(img)
+            self.cache_preview(img)
         except Exception as exc:
             if should_cancel():
                 return
@@ -294,35 +375,42 @@ class PreviewContainer(Container):
             )
             return
 
+    def render_svg(self, file_path: str) -> PILImage:
+        """Render an svg with resvg and resample it. Runs in a thread.
+
+        Args:
+            file_path(str): The svg file
+
+        Returns:
+            PILImage: The rendered image
+        """
+        # load svg as bytes
+        with open(file_path, "r", encoding="utf-8") as f:
+            svg_data = f.read()
+        png_bytes = svg_to_bytes(svg_data)
+        pil_object = preview_utils.resample(Image.open(BytesIO(png_bytes)))
+        # force a load
+        pil_object.load()
+        return pil_object
+
     def show_resvg_preview(self) -> None:
         """Show svg preview using resvg"""
         if should_cancel() or self._current_file_path is None:
             return
+        if isinstance(self._cached_renderable, PILImage):
+            self.mount_image(self._cached_renderable)
+            self.app.call_from_thread(setattr, self, "border_title", titles.svg)
+            return
         self.app.call_from_thread(setattr, self, "border_title", "loading...")
 
-        # load svg as bytes
         try:
-            with open(self._current_file_path, "r", encoding="utf-8") as f:
-                svg_data = f.read()
-            png_bytes = svg_to_bytes(svg_data)
-            pil_object = preview_utils.resample(Image.open(BytesIO(png_bytes)))
-            # force a load
-            pil_object.load()
+            pil_object = self.render_svg(self._current_file_path)
 
             if should_cancel():
                 return
 
-            if image_widget := self.has_child(".image_preview"):
-                self.app.call_from_thread(setattr, image_widget, "image", pil_object)
-            else:
-                self.app.call_from_thread(self.remove_children)
-
-                if should_cancel():
-                    return
-
-                image_widget = NewImage(pil_object)
-                image_widget.can_focus = True
-                self.app.call_from_thread(self.mount, image_widget)
+            self.mount_image(pil_object)
+            self.cache_preview(pil_object)
         except ValueError as exc:
             if should_cancel():
                 return
@@ -355,8 +443,16 @@ class PreviewContainer(Container):
             return
         self.app.call_from_thread(setattr, self, "border_title", titles.image)
 
+        if isinstance(self._cached_renderable, PILImage):
+            self.mount_image(self._cached_renderable)
+            return
+
+        size = self._cached_size or Size(0, 0)
         try:
-            pil_object = preview_utils.resample_file(self._current_file_path)
+            pil_object = preview_utils.resample_file(
+                self._current_file_path,
+                preview_utils.preview_pixel_size(size.width, size.height),
+            )
             if pil_object is None:
                 return
         except UnidentifiedImageError:
@@ -384,22 +480,8 @@ class PreviewContainer(Container):
             )
             return
 
-        if image_widget := self.has_child(".image_preview"):
-            if should_cancel():
-                return
-            self.app.call_from_thread(setattr, image_widget, "image", pil_object)
-        else:
-            self.app.call_from_thread(self.remove_children)
-
-            if should_cancel():
-                return
-
-            image_widget = NewImage(pil_object)
-            image_widget.can_focus = True
-            self.app.call_from_thread(self.mount, image_widget)
-
-        if should_cancel():
-            return
+        self.mount_image(pil_object)
+        self.cache_preview(pil_object)
 
     def update_current_pdf_page_by_diff(self, diff: int) -> None:
         """Updates the current pages by a diff"""
@@ -421,6 +503,35 @@ class PreviewContainer(Container):
         )
         self._trigger_pdf_update()
 
+    def render_pdf_pages(self, pages: list[int]) -> dict[int, PILImage]:
+        """Render pages into the page cache, a contiguous run at a time. Runs in a thread.
+
+        Args:
+            pages(list[int]): The 0 indexed pages to render
+
+        Returns:
+            dict[int, PILImage]: The rendered pages, or nothing if cancelled
+
+        Raises:
+            ValueError: If PDF conversion returns 0 pages.
+        """  # noqa: DOC502
+        pages = sorted(pages)
+        rendered: dict[int, PILImage] = {}
+        run_start = 0
+        for index, page in enumerate(pages):
+            if index + 1 < len(pages) and pages[index + 1] == page + 1:
+                continue
+            run = pages[run_start : index + 1]
+            run_start = index + 1
+            result = self.load_pdf_pages(first_page=run[0] + 1, last_page=run[-1] + 1)
+            # a cancelled render may belong to a file that is not shown anymore
+            if should_cancel():
+                return {}
+            rendered.update(zip(run, result))
+        for page, image in rendered.items():
+            self.pdf.pages.put(page, image)
+        return rendered
+
     def load_pdf_pages(self, first_page: int, last_page: int) -> list[PILImage]:
         """
         Returns:
@@ -441,51 +552,79 @@ class PreviewContainer(Container):
             use_pdftocairo=config["plugins"]["poppler"]["use_pdftocairo"],
             thread_count=config["plugins"]["poppler"]["threads"],
             poppler_path=PDFHandler.get_poppler_folder(),
+            scale_to=self.pdf.scale_to,
+            use_pdfium=config["plugins"]["pdfium"]["enabled"],
+            timeout=config["plugins"]["poppler"]["timeout"],
         )
         if len(result) == 0:
             raise ValueError(
                 "Obtained 0 pages from Poppler. Something may have gone wrong..."
             )
-        # Resample images once when loaded for better performance
-        return preview_utils.resample_batch(result)
+        # pages are already rendered to fit, so this only resamples pages
+        # shaped differently from the first one, or all of them at a fixed DPI
+        return preview_utils.resample_batch(
+            result, self.pdf.render_size or preview_utils.MAX_SIZE
+        )
 
     def show_pdf_preview(self, depth: int = 0) -> None:
         """
         Show PDF preview. Runs in a thread.
-        The job of this function is to load the pdf file for the first time.
-        Or ensure the batched loading
+        The job of this function is to load the pdf file for the first time,
+        then render the current page and the ones around it as needed.
         """
         self.app.call_from_thread(setattr, self, "border_title", titles.pdf)
 
         if should_cancel() or self._current_file_path is None:
             return
 
-        # Convert PDF to images if not already done
-        if self.pdf.images is None:
-            try:
-                self.pdf.total_pages = int(
-                    get_pdf_info(
-                        str(self._current_file_path),
-                        poppler_path=PDFHandler.get_poppler_folder(),
-                    )["Pages"]
-                )
-                result = self.load_pdf_pages(
-                    first_page=1, last_page=self.pdf.get_last_page_to_load()
-                )
-            except Exception as exc:
-                if should_cancel():
-                    return
-                self.app.call_from_thread(self.remove_children)
-                self.app.call_from_thread(
-                    self.mount,
-                    Static(f"{type(exc).__name__}: {str(exc)}", classes="special"),
+        size = self._cached_size or Size(0, 0)
+        render_size = preview_utils.preview_pixel_size(size.width, size.height)
+        first_load = not self.pdf.loaded
+        # Saving the value per thread instead of recalculating after the load
+        # Even if something changes in between, we want the threads that set the status to
+        # loading, to always unset it
+        toggle_loading = False
+        try:
+            if first_load or self.pdf.render_size != render_size:
+                # cached by modification time, so this is cheap after a resize
+                pdf_info = get_pdf_info(
+                    str(self._current_file_path),
+                    poppler_path=PDFHandler.get_poppler_folder(),
+                    use_pdfium=config["plugins"]["pdfium"]["enabled"],
+                    timeout=config["plugins"]["poppler"]["timeout"],
                 )
+                self.pdf.total_pages = int(pdf_info["Pages"])
+                if self.pdf.render_size != render_size:
+                    # the pages were rendered for another size, so render them again
+                    self.pdf.pages.clear()
+                self.pdf.render_size = render_size
+                self.pdf.scale_to = get_scale_to(pdf_info, render_size)
+            current_image = self.pdf.pages.get(self.pdf.current_page)
+            if current_image is None:
+                toggle_loading = not first_load
+                if toggle_loading:
+                    self.post_message(self.SetLoading(True))
+                rendered = self.render_pdf_pages(self.pdf.get_pages_to_load())
+                current_image = rendered.get(self.pdf.current_page)
+        except Exception as exc:
+            if should_cancel():
                 return
-            self.pdf.images = result
+            self.app.call_from_thread(self.remove_children)
+            self.app.call_from_thread(
+                self.mount,
+                Static(f"{type(exc).__name__}: {str(exc)}", classes="special"),
+            )
+            return
+        if toggle_loading:
+            self.call_later(lambda: self.post_message(self.SetLoading(False)))
+        # Also we must ensure to cancel only after you reset the SetLoading(false)
+        # We don't want threads to Set the screen in Loading state, and never turn it back
+        if should_cancel() or current_image is None:
+            return
 
-            # The only one case when current page and border subtitles
-            # should be manually adjusted. Not the best design though.
-            self.pdf.current_page = 0
+        if first_load:
+            self.pdf.loaded = True
+            # The only one case when border subtitles should be manually adjusted.
             self.app.call_from_thread(
                 setattr,
                 self,
@@ -493,51 +632,6 @@ class PreviewContainer(Container):
                 f"Page {self.pdf.current_page + 1}/{self.pdf.total_pages}",
             )
 
-        elif self.pdf.should_load_next_batch():
-            # Saving the value per thread instead of recalculating after the load
-            # Even if something changes in between, we want the threads that set the status to
-            # loading, to always unset it
-            toggle_loading = self.pdf.must_load_next_batch()
-
-            if toggle_loading:
-                self.post_message(self.SetLoading(True))
-            try:
-                result = self.load_pdf_pages(
-                    first_page=self.pdf.count_loaded() + 1,
-                    last_page=self.pdf.get_last_page_to_load(),
-                )
-            except Exception as exc:
-                if should_cancel():
-                    return
-                self.app.call_from_thread(self.remove_children)
-                self.app.call_from_thread(
-                    self.mount,
-                    Static(f"{type(exc).__name__}: {str(exc)}", classes="special"),
-                )
-                return
-            if toggle_loading:
-                self.call_later(lambda: self.post_message(self.SetLoading(False)))
-            # Note - This should_cancel must be kept here, not before the `load_pdf_pages` call
-            # That, somehow doesn't prevents multiple threads executing the load
-            # even though, we successful prevent multiple threads
-            # appending the results via this one
-            # Also we must ensure to cancel only after you reset the SetLoading(false)
-            # We don't want threads to Set the screen in Loading state, and never turn it back
-            if should_cancel():
-                return
-
-            # This mutation on the `images` object should be done by one one thread
-            # and the entire flow of checking `should_load_next_batch` to loading
-            # to appending the pages should be atomic.
-            # At this point, we are using `should_cancel` to allow only one thread
-            # to reach here
-            self.pdf.images += result
-
-        if should_cancel():
-            return
-
-        current_image = self.pdf.images[self.pdf.current_page]
-
         if image_widget := self.has_child(".image_preview"):
             if should_cancel():
                 return
@@ -556,78 +650,145 @@ class PreviewContainer(Container):
         if should_cancel():
             return
 
-    def show_bat_file_preview(self) -> bool:
-        """Show bat file preview. Runs in a thread.
+        # the current page is shown, so render the ones around it in the background
+        if missing_pages := self.pdf.get_pages_to_load():
+            # errors are shown once one of these pages is viewed
+            with contextlib.suppress(Exception):
+                self.render_pdf_pages(missing_pages)
+
+    def run_bat(
+        self, file_path: str, size: Size, content: str | None = None
+    ) -> ProcessResult:
+        """Run bat on the part of a file that fits in the preview. Runs in a thread.
+
+        Args:
+            file_path(str): The file to preview
+            size(Size): The size of the preview
+            content(str | None): Lines of the file to highlight instead of its
+                start, without line numbers, as bat would number them from 1
 
         Returns:
-            bool: True if successful, False otherwise.
-        """
+            ProcessResult: The finished bat process
+
+        Raises:
+            ProcessCancelled: If the worker was cancelled while bat ran
+            subprocess.TimeoutExpired: If bat took longer than its timeout
+        """  # noqa: DOC502
         bat_executable = config["plugins"]["bat"]["executable"]
         command = [
             bat_executable,
             "--force-colorization",
             "--paging=never",
             "--style=numbers"
-            if config["interface"]["show_line_numbers"]
+            if config["interface"]["show_line_numbers"] and content is None
             else "--style=plain",
         ]
-        max_lines = self._cached_size.height
+        max_lines = size.height
         if max_lines > 0:
             command.append(f"--line-range=:{max_lines}")
-        command.extend(["--", self._current_file_path])
+        if content is None:
+            command.extend(["--", file_path])
+        else:
+            # the name is still given, so the language is picked from it
+            command.extend([f"--file-name={file_path}", "-"])
+        # a single long line, like in minified files, is not cut by the line range
+        return CancellableProcess.run(
+            command,
+            config["plugins"]["bat"]["timeout"],
+            max_output=BAT_MAX_OUTPUT,
+            input=None if content is None else content.encode("utf-8"),
+        )
+
+    def highlight_bat_text(
+        self, file_path: str, content: str, size: Size, start_line: int | None
+    ) -> Text | None:
+        """Highlight lines of a file with bat, like `highlight_text`. Runs in a thread.
 
+        Args:
+            file_path(str): The file, used to pick the language
+            content(str): The lines to show
+            size(Size): The size of the preview
+            start_line(int | None): The number of the first line, None to hide line numbers
+
+        Returns:
+            Text | None: The highlighted lines, or None if bat failed
+        """
+        try:
+            result = self.run_bat(file_path, size, content)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError):
+            return None
+        if result.returncode != 0 and not result.truncated:
+            return None
+        bat_output = result.stdout.decode("utf-8", errors="ignore")
+        highlighted = Text.from_ansi(bat_output.removesuffix("\n"))
+        if start_line is None or not config["interface"]["show_line_numbers"]:
+            return highlighted
+        lines = highlighted.split(allow_blank=True)
+        width = max(4, len(str(start_line + len(lines) - 1)))
+        return Text("\n").join(
+            Text.assemble((f"{number:>{width}} ", "dim"), line)
+            for number, line in enumerate(lines, start_line)
+        )
+
+    def show_bat_file_preview(self) -> bool:
+        """Show bat file preview. Runs in a thread.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
         if should_cancel():
             return False
         self.app.call_from_thread(setattr, self, "border_title", titles.bat)
 
         try:
-            # Use synchronous subprocess since we're already in a thread
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,
-            )
-
-            if should_cancel():
-                return False
-
-            if result.returncode == 0:
-                bat_output = result.stdout.decode("utf-8", errors="ignore")
-                new_content = Text.from_ansi(bat_output)
+            if isinstance(self._cached_renderable, Text):
+                new_content = self._cached_renderable
+            else:
+                file_path, size = self._current_file_path, self._cached_size
+                if file_path is None or size is None:
+                    return False
+                result = self.run_bat(file_path, size)
 
                 if should_cancel():
                     return False
 
-                if static_widget := self.has_child("Static"):
-                    self.log("Using existing Static")
-                    self.app.call_from_thread(static_widget.update, new_content)
-                    self.app.call_from_thread(static_widget.set_classes, "bat_preview")
-                else:
-                    self.log("Mounting new Static")
-                    self.app.call_from_thread(self.remove_children)
-
+                if result.returncode != 0 and not result.truncated:
+                    error_message = result.stderr.decode("utf-8", errors="ignore")
                     if should_cancel():
                         return False
+                    self.app.call_from_thread(self.remove_children)
+                    self.app.call_from_thread(
+                        self.notify,
+                        error_message,
+                        title="Plugins: Bat",
+                        severity="warning",
+                    )
+                    return False
+                bat_output = result.stdout.decode("utf-8", errors="ignore")
+                new_content = Text.from_ansi(bat_output)
 
-                    static_widget = Static(new_content, classes="bat_preview")
-                    self.app.call_from_thread(self.mount, static_widget)
-                    if should_cancel():
-                        return False
-                    static_widget.can_focus = True
+            if should_cancel():
+                return False
 
-                return True
+            if static_widget := self.has_child("Static"):
+                self.log("Using existing Static")
+                self.app.call_from_thread(static_widget.update, new_content)
+                self.app.call_from_thread(static_widget.set_classes, "bat_preview")
             else:
-                error_message = result.stderr.decode("utf-8", errors="ignore")
+                self.log("Mounting new Static")
+                self.app.call_from_thread(self.remove_children)
+
                 if should_cancel():
                     return False
-                self.app.call_from_thread(self.remove_children)
-                self.app.call_from_thread(
-                    self.notify,
-                    error_message,
-                    title="Plugins: Bat",
-                    severity="warning",
-                )
-                return False
+
+                static_widget = Static(new_content, classes="bat_preview")
+                self.app.call_from_thread(self.mount, static_widget)
+                if should_cancel():
+                    return False
+                static_widget.can_focus = True
+
+            self.cache_preview(new_content)
+            return True
         except Exception as exc:
             if should_cancel():
                 return False
@@ -643,61 +804,26 @@ class PreviewContainer(Container):
             return
         self.app.call_from_thread(setattr, self, "border_title", titles.file)
 
-        if not isinstance(self._current_content, str):
-            # force read by brute-forcing encoding methods
-            encodings_to_try = [
-                "utf8",
-                "utf16",
-                "utf32",
-                "latin1",
-                "iso8859-1",
-                "mbcs",
-                "ascii",
-                "us-ascii",
-            ]
-            for encoding in encodings_to_try:
-                try:
-                    with open(self._current_file_path, "r", encoding=encoding) as f:
-                        self._current_content = f.read(1024)
-                    break
-                except (UnicodeDecodeError, FileNotFoundError):
-                    continue
-            if self._current_content is None:
-                self._current_content = self._preview_texts["error"]
-                self.mount_special_messages()
-                return
-
-        lines = self._current_content.splitlines()
-        max_lines = self._cached_size.height
-        if max_lines > 0:
-            if len(lines) > max_lines:
-                lines = lines[:max_lines]
+        if isinstance(self._cached_renderable, Syntax):
+            syntax = self._cached_renderable
         else:
-            lines = []
-        max_width = self._cached_size.width * 2
-        if max_width > 0:
-            processed_lines = []
-            for line in lines:
-                if len(line) > max_width:
-                    processed_lines.append(line[:max_width])
-                else:
-                    processed_lines.append(line)
-            lines = processed_lines
-        text_to_display = "\n".join(lines)
-        # add syntax highlighting
-        language = (
-            guess_language(text_to_display, path=self._current_file_path) or "text"
-        )
-        syntax = Syntax(
-            text_to_display,
-            lexer=language,
-            line_numbers=config["interface"]["show_line_numbers"],
-            word_wrap=False,
-            tab_size=4,
-            theme=config["theme"]["preview"],
-            background_color="default",
-            code_width=max_width,
-        )
+            file_path, size = self._current_file_path, self._cached_size
+            if file_path is None or size is None:
+                return
+            content = self._current_content
+            if not isinstance(content, str):
+                content = path_utils.read_text(file_path)
+                if content is None:
+                    self._current_content = self._preview_texts["error"]
+                    self.mount_special_messages()
+                    return
+                self._current_content = content
+            syntax = self.highlight_text(
+                file_path,
+                content,
+                size,
+                self._mime_type.language if self._mime_type else None,
+            )
 
         if should_cancel():
             return
@@ -710,10 +836,175 @@ class PreviewContainer(Container):
             if should_cancel():
                 return
 
-            self.app.call_from_thread(self.mount, Static(syntax))
+            static_widget = Static(syntax)
+            static_widget.can_focus = True
+            self.app.call_from_thread(self.mount, static_widget)
+
+        self.cache_preview(syntax)
+
+    @staticmethod
+    def highlight_text(
+        file_path: str,
+        content: str,
+        size: Size,
+        language: str | None = None,
+        start_line: int | None = 1,
+        window: tuple[int, int, int] | None = None,
+    ) -> Syntax:
+        """Highlight the part of a file that fits in the preview.
+
+        Args:
+            file_path(str): The file, used to guess the language
+            content(str): The lines to show
+            size(Size): The size of the preview
+            language(str | None): The lexer to use, guessed if not given
+            start_line(int | None): The number of the first line, None to hide line numbers
+            window(tuple | None): The offset, line count and line
+                size the lines were read with, None if they are the start of the file
 
+        Returns:
+            Syntax: The highlighted text
+        """
+        max_lines = size.height
+        max_width = size.width * 2
+        if not language:
+            language = highlight.guess_language(content, file_path) or "text"
+        # rich would show a blank line after a line ending at the very end
+        content = content.removesuffix("\n").removesuffix("\r")
+        # the whole text is given, but only the lines that fit are lexed, and the
+        # tokens are cached, so showing it again at another size does not lex it again
+        try:
+            file_stat = os.stat(file_path)
+            lexer = highlight.get_cached_lexer(
+                language,
+                (file_path, file_stat.st_mtime_ns, file_stat.st_size, window),
+            )
+        except OSError:
+            lexer = highlight.get_lexer(language)
+        return Syntax(
+            content if max_lines > 0 else "",
+            lexer=lexer,
+            line_numbers=config["interface"]["show_line_numbers"]
+            and start_line is not None,
+            start_line=start_line or 1,
+            line_range=(1, max_lines),
+            word_wrap=False,
+            tab_size=4,
+            theme=config["theme"]["preview"],
+            background_color="default",
+            code_width=max_width,
+        )
+
+    def scroll_text(
+        self, lines: int = 0, jump_to: Literal["home", "end"] | int | None = None
+    ) -> None:
+        """Scroll the text preview, and spawn a worker to show the lines in view
+
+        Args:
+            lines(int): How many lines to scroll by, negative to scroll up
+            jump_to(Literal["home", "end"] | int | None): Jump to the start, the
+                end, or a 0 indexed line instead
+        """
+        with self.text.lock:
+            if jump_to is not None:
+                self.text.jump_to = jump_to
+                self.text.pending_lines = 0
+            else:
+                self.text.pending_lines += lines
+        self._trigger_text_update()
+
+    @work(thread=True, exclusive=True)
+    def _trigger_text_update(self) -> None:
+        """Trigger text preview update from a thread."""
+        try:
+            self.show_text_window()
+        except (OSError, ValueError) as exc:
+            # the file was removed or cut short while it was shown
+            path_utils.dump_exc(self, exc)
+
+    def show_text_window(self) -> None:
+        """Show the lines the text preview is scrolled to. Runs in a thread.
+
+        Only the lines in view are read, so any part of a file of any size
+        can be shown quickly. Files in utf-16 or utf-32 are not scrolled.
+        """
+        file_path = self._current_file_path
+        size = self._cached_size
+        if file_path is None or size is None or size.height <= 0 or should_cancel():
+            return
+        # workers left running after being cancelled still take turns moving
+        with self.text.render_lock:
+            with self.text.lock:
+                index, encoding = self.text.index, self.text.encoding
+                offset, line = self.text.offset, self.text.line
+                lines_to_move, self.text.pending_lines = self.text.pending_lines, 0
+                jump_to, self.text.jump_to = self.text.jump_to, None
+            if index is None:
+                file_bytes = path_utils.read_file_start(file_path)
+                if file_bytes is None:
+                    return
+                _, encoding = path_utils.decode_text(
+                    file_bytes, complete=len(file_bytes) < path_utils.TEXT_PREVIEW_SIZE
+                )
+                # a newline is more than one byte in these
+                if encoding.startswith(("utf-16", "utf-32")):
+                    return
+                index = LineIndex(file_path)
+                with self.text.lock:
+                    if file_path != self._current_file_path:
+                        return
+                    self.text.index = index
+                    self.text.encoding = encoding
+                index.start()
+
+            if jump_to == "home":
+                offset, line = 0, 0
+            elif jump_to == "end":
+                offset, line = index.last_lines(size.height), None
+            elif isinstance(jump_to, int):
+                offset, line = index.line_offset(jump_to)
+            offset, moved = index.skip_lines(
+                offset, lines_to_move, keep_lines=size.height
+            )
+            line = index.line_number(offset) if line is None else line + moved
+            with self.text.lock:
+                # the preview moved on to another file meanwhile
+                if self.text.index is not index:
+                    return
+                self.text.offset, self.text.line = offset, line
+
+            max_width = size.width * 2
+            # enough for max_width characters of up to 4 bytes each
+            max_line_size = max_width * 4 if max_width > 0 else index.size
+            lines = index.read_lines(offset, size.height, max_line_size)
+        text = "\n".join(
+            line_bytes.decode(encoding, errors="replace") for line_bytes in lines
+        )
+        if line is None:
+            subtitle = f"{offset * 100 // max(index.size, 1)}%"
+        elif index.line_count is None:
+            subtitle = f"Line {line + 1}"
+        else:
+            subtitle = f"Line {line + 1}/{index.line_count}"
+
+        start_line = None if line is None else line + 1
+        highlighted: Text | Syntax | None = None
+        if self.border_title == titles.bat:
+            highlighted = self.highlight_bat_text(file_path, text, size, start_line)
+        if highlighted is None:
+            highlighted = self.highlight_text(
+                file_path,
+                text,
+                size,
+                self._mime_type.language if self._mime_type else None,
+                start_line,
+                (offset, size.height, max_line_size),
+            )
         if should_cancel():
             return
+        if static_widget := self.has_child("Static"):
+            self.app.call_from_thread(static_widget.update, highlighted)
+            self.app.call_from_thread(setattr, self, "border_subtitle", subtitle)
 
     def show_folder_preview(self, folder_path: str) -> None:
         """Show folder preview."""
@@ -777,10 +1068,7 @@ class PreviewContainer(Container):
                 for index, item in enumerate(file_list_options):
                     options.append(
                         FileListSelectionWidget(
-                            icon=item["icon"],
-                            label=item["name"],
-                            dir_entry=item["dir_entry"],
-                            clipboard=self.app.Clipboard,
+                            dir_entry=item, clipboard=self.app.Clipboard
                         )
                     )
                     if start_time + 0.25 < time():
@@ -869,22 +1157,201 @@ class PreviewContainer(Container):
             return
         self.app.call_from_thread(file_list.set_options, options)
         self.app.call_from_thread(setattr, self, "border_subtitle", "")
+        # the member list is the slow part, the options are cheap to rebuild
+        self.cache_preview()
 
-    async def show_preview(self, file_path: str) -> None:
-        """Public method to show preview."""
-        if (
+    def resolve_preview_type(
+        self, file_path: str
+    ) -> tuple[str, path_utils.MimeResult | None, str | list[str] | None] | None:
+        """Work out how to preview a file, listing archive members if it is one.
+        Runs in a thread.
+
+        Args:
+            file_path(str): The file to preview
+
+        Returns:
+            tuple: The preview type, MIME type and content of the file
+            None: If the worker was cancelled
+        """
+        # the extension settles it, so the file is not read until it is shown
+        file_type = path_utils.match_extension_to_preview_type(file_path)
+        if file_type is not None:
+            self.log(f"Previewing as {file_type} from its extension")
+            return self.load_preview_content(
+                file_path,
+                file_type,
+                path_utils.mime_type_from_extension(file_path, file_type),
+            )
+
+        cache_key = None
+        with contextlib.suppress(OSError):
+            cache_key = MimeCache.make_key(os.stat(file_path))
+        cached = None if cache_key is None else path_utils.mime_cache.get(cache_key)
+        if cached is not None:
+            # the cache is read from disk, so a method that does not exist is
+            # ignored and the file is looked at again
+            match cached.method:
+                case "basic" | "puremagic" | "file1" | "extension" as method:
+                    self.log(f"Previewing as {cached.preview_type} from the MIME cache")
+                    mime_result = path_utils.MimeResult(
+                        method, cached.mime_type, None, cached.language
+                    )
+                    return self.load_preview_content(
+                        file_path, cached.preview_type, mime_result
+                    )
+
+        # read once, for both detecting the type and showing it as text
+        file_bytes = path_utils.read_file_start(file_path)
+        if file_bytes is None:
+            self.log(f"Could not read {file_path}")
+            return "file", None, self._preview_texts["error"]
+        mime_result = path_utils.get_mime_type(file_path, file_bytes=file_bytes)
+        self.log(mime_result)
+        if mime_result is None:
+            self.log(f"Could not get MIME type for {file_path}")
+            return "file", None, self._preview_texts["error"]
+        file_type = path_utils.match_mime_to_preview_type(self, mime_result.mime_type)
+        if file_type == "remime":
+            mime_result = path_utils.get_mime_type(file_path, ["basic", "puremagic"])
+            if mime_result is None:
+                self.log("Could not get MIME type for remime")
+                return "file", None, self._preview_texts["error"]
+            file_type = path_utils.match_mime_to_preview_type(
+                self, mime_result.mime_type
+            )
+        if file_type is None:
+            self.log("Could not match MIME type to preview type")
+            return "file", mime_result, self._preview_texts["error"]
+        self.log(f"Previewing as {file_type} (MIME: {mime_result.mime_type})")
+        if cache_key is not None:
+            path_utils.mime_cache.put(
+                cache_key,
+                CachedMime(
+                    mime_result.method,
+                    mime_result.mime_type,
+                    mime_result.language,
+                    file_type,
+                ),
+            )
+        return self.load_preview_content(file_path, file_type, mime_result, file_bytes)
+
+    def load_preview_content(
+        self,
+        file_path: str,
+        file_type: str,
+        mime_result: path_utils.MimeResult,
+        file_bytes: bytes | None = None,
+    ) -> tuple[str, path_utils.MimeResult | None, str | list[str] | None] | None:
+        """Get what a file is previewed with, once its preview type is known.
+        Runs in a thread.
+
+        Args:
+            file_path(str): The file to preview
+            file_type(str): The preview type
+            mime_result(path_utils.MimeResult): The MIME type of the file
+            file_bytes(bytes | None): The start of the file if it was already read
+
+        Returns:
+            tuple: The preview type, MIME type and content of the file
+            None: If the worker was cancelled
+        """
+        content = mime_result.content
+        if file_type == "archive":
+            all_files = self.list_archive_files(file_path)
+            if all_files is None:
+                return None
+            return file_type, mime_result, all_files
+        # text found by the basic check is always shown as its start
+        if content is None and (file_type == "text" or mime_result.method == "basic"):
+            content = path_utils.read_text(file_path, file_bytes)
+            if content is None:
+                self.log(f"Could not read {file_path}")
+                return "file", None, self._preview_texts["error"]
+        return file_type, mime_result, content
+
+    def list_archive_files(self, file_path: str) -> list[str] | None:
+        """List the files in an archive. Runs in a thread.
+
+        Args:
+            file_path(str): The archive
+
+        Returns:
+            list[str]: The files, or the error text if the archive cannot be read
+            None: If the worker was cancelled
+        """
+        try:
+            with Archive(file_path, mode="r") as archive:
+                all_files = []
+                for member in archive.infolist():
+                    if should_cancel():
+                        return None
+
+                    filename = getattr(member, "filename", getattr(member, "name", ""))
+                    is_dir_func = getattr(
+                        member, "is_dir", getattr(member, "isdir", None)
+                    )
+                    is_dir = (
+                        is_dir_func()
+                        if is_dir_func
+                        else filename.replace("\\", "/").endswith("/")
+                    )
+                    if not is_dir:
+                        all_files.append(filename)
+            return all_files
+        except (
+            BadArchiveError,
+            ValueError,
+            FileNotFoundError,
+        ):
+            return [self._preview_texts["error"]]
+
+    @property
+    def previews_hidden(self) -> bool:
+        return (
             "hide" in self.classes
             or "-no-preview" in self.screen.classes
             or "-filelist-only" in self.screen.classes
-        ):
+        )
+
+    async def show_preview(self, file_path: str) -> None:
+        """Public method to show preview."""
+        if self.previews_hidden:
             self._pending_preview_path = file_path
             return
         self._pending_preview_path = None
         self.perform_show_preview(file_path)
 
+    def show_placeholder(self, file_path: str) -> None:
+        """Show only the name of a file, while the highlight moves too quickly to preview it.
+
+        Args:
+            file_path(str): The file that is highlighted
+        """
+        if self.previews_hidden:
+            self._pending_preview_path = file_path
+            return
+        # the file being previewed is no longer wanted
+        self.workers.cancel_group(self, "default")
+        # so that coming back to the file shown last previews it again
+        self._file_mtime = None
+        self.post_message(self.SetLoading(False))
+        self.border_title = ""
+        self.border_subtitle = ""
+        # file names are not markup
+        display_content = Text(path.basename(file_path) or file_path)
+        if static_widget := self.has_child("Static"):
+            static_widget = cast(Static, static_widget)
+            static_widget.update(display_content)
+            static_widget.set_classes("special")
+        else:
+            self.remove_children()
+            self.mount(Static(display_content, classes="special"))
+
     @work(exclusive=True, thread=True)
     def perform_show_preview(self, file_path: str) -> None:
         """Main preview worker. Runs in a thread."""
+        with self._previews_done:
+            self._previews_running += 1
         try:
             if should_cancel():
                 return
@@ -902,11 +1369,9 @@ class PreviewContainer(Container):
                 self._cached_size = self.size
             self.post_message(self.SetLoading(True))
 
-            # Reset PDF state when changing files
-            if file_path != self._current_file_path:
-                self.pdf.images = None
-                self.pdf.current_page = 0
-                self.pdf.total_pages = 0
+            # Reset PDF state when changing files, or when the file was modified
+            self.pdf.reset()
+            self.text.reset()
 
             if path.isdir(file_path):
                 self.update_ui(
@@ -915,105 +1380,36 @@ class PreviewContainer(Container):
                     file_type="folder",
                 )
             else:
-                content = None  # for now
-                mime_result = path_utils.get_mime_type(file_path)
-                self.log(mime_result)
-                if mime_result is None:
-                    self.log(f"Could not get MIME type for {file_path}")
+                size = self._cached_size or Size(0, 0)
+                preview_key = preview_utils.preview_cache.make_key(
+                    file_path, size.width, size.height, self.app.theme
+                )
+                cached = preview_utils.preview_cache.get(preview_key)
+                if cached is not None:
+                    self.log(f"Previewing as {cached.file_type} from the preview cache")
                     self.update_ui(
-                        file_path=file_path,
-                        file_type="file",
-                        content=self._preview_texts["error"],
+                        file_path,
+                        file_type=cached.file_type,
+                        content=cached.content,
+                        mime_type=cached.mime_type,
+                        preview_key=preview_key,
+                        renderable=cached.renderable,
                     )
                     self.call_later(lambda: self.post_message(self.SetLoading(False)))
                     return
-                content = mime_result.content
 
-                file_type = path_utils.match_mime_to_preview_type(
-                    self, mime_result.mime_type
-                )
-                if file_type is None:
-                    self.log("Could not match MIME type to preview type")
-                    self.update_ui(
-                        file_path=file_path,
-                        file_type="file",
-                        mime_type=mime_result,
-                        content=self._preview_texts["error"],
-                    )
+                resolved = self.resolve_preview_type(file_path)
+                if resolved is None:
                     self.call_later(lambda: self.post_message(self.SetLoading(False)))
                     return
-                elif file_type == "remime":
-                    mime_result = path_utils.get_mime_type(
-                        file_path, ["basic", "puremagic"]
-                    )
-                    if mime_result is None:
-                        self.log("Could not get MIME type for remime")
-                        self.update_ui(
-                            file_path=file_path,
-                            file_type="file",
-                            content=self._preview_texts["error"],
-                            mime_type=mime_result,
-                        )
-                        self.call_later(
-                            lambda: self.post_message(self.SetLoading(False))
-                        )
-                        return
-                    file_type = path_utils.match_mime_to_preview_type(
-                        self, mime_result.mime_type
-                    )
-                    if file_type is None:
-                        self.log("Could not match MIME type to preview type")
-                        self.update_ui(
-                            file_path=file_path,
-                            file_type="file",
-                            mime_type=mime_result,
-                            content=self._preview_texts["error"],
-                        )
-                        self.call_later(
-                            lambda: self.post_message(self.SetLoading(False))
-                        )
-                        return
-                self.log(f"Previewing as {file_type} (MIME: {mime_result.mime_type})")
-
-                if file_type == "archive":
-                    try:
-                        with Archive(file_path, mode="r") as archive:
-                            all_files = []
-                            for member in archive.infolist():
-                                if should_cancel():
-                                    self.call_later(
-                                        lambda: self.post_message(
-                                            self.SetLoading(False)
-                                        )
-                                    )
-                                    return
-
-                                filename = getattr(
-                                    member, "filename", getattr(member, "name", "")
-                                )
-                                is_dir_func = getattr(
-                                    member, "is_dir", getattr(member, "isdir", None)
-                                )
-                                is_dir = (
-                                    is_dir_func()
-                                    if is_dir_func
-                                    else filename.replace("\\", "/").endswith("/")
-                                )
-                                if not is_dir:
-                                    all_files.append(filename)
-                        content = all_files
-                    except (
-                        BadArchiveError,
-                        ValueError,
-                        FileNotFoundError,
-                    ):
-                        content = [self._preview_texts["error"]]
+                file_type, mime_result, content = resolved
 
                 self.update_ui(
                     file_path,
                     file_type=file_type,
                     content=content,
                     mime_type=mime_result,
+                    preview_key=preview_key,
                 )
 
             if should_cancel():
@@ -1028,6 +1424,132 @@ class PreviewContainer(Container):
                 severity="error",
             )
             path_utils.dump_exc(self, exc)
+        finally:
+            with self._previews_done:
+                self._previews_running -= 1
+                if not self._previews_running:
+                    self._previews_done.notify_all()
+
+    def prefetch_previews(self, file_paths: list[str]) -> None:
+        """Render previews for files in the background, so showing them is instant.
+
+        The file being rendered is only cancelled once it is no longer wanted,
+        the rest are picked up in order as the worker gets to them.
+
+        Args:
+            file_paths(list[str]): The files to render, nearest first
+        """
+        if not preview_utils.preview_cache.enabled or self.previews_hidden:
+            return
+        self._prefetch_paths = file_paths
+        worker = self._prefetch_worker
+        if worker is not None and not (worker.is_finished or worker.is_cancelled):
+            if self._prefetching is None or self._prefetching in file_paths:
+                return
+            worker.cancel()
+            with self._previews_done:
+                self._previews_done.notify_all()
+        if file_paths:
+            self._prefetch_worker = self.perform_prefetch()
+
+    @work(thread=True, group="preview_prefetch")
+    def perform_prefetch(self) -> None:
+        """Prefetch worker. Runs in a thread."""
+        attempted: set[str] = set()
+        try:
+            while not should_cancel():
+                with self._previews_done:
+                    # the timeout only catches cancellations nothing notified about
+                    self._previews_done.wait_for(
+                        lambda: not self._previews_running or should_cancel(),
+                        timeout=1,
+                    )
+                    if self._previews_running:
+                        continue
+                file_paths = self._prefetch_paths
+                file_path = next(
+                    (
+                        file_path
+                        for file_path in file_paths
+                        if file_path not in attempted
+                    ),
+                    None,
+                )
+                if file_path is None:
+                    if file_paths is self._prefetch_paths:
+                        return
+                    continue
+                attempted.add(file_path)
+                self._prefetching = file_path
+                self.prefetch_preview(file_path)
+        except Exception as exc:
+            path_utils.dump_exc(self, exc)
+        finally:
+            self._prefetching = None
+
+    def prefetch_preview(self, file_path: str) -> None:
+        """Render a preview into the preview cache without showing it. Runs in a thread.
+
+        Only previews that are slow to make are rendered, files that fail to
+        render are left for the visible preview to report.
+
+        Args:
+            file_path(str): The file to render
+        """
+        size = self._cached_size or Size(0, 0)
+        preview_key = preview_utils.preview_cache.make_key(
+            file_path, size.width, size.height, self.app.theme
+        )
+        if (
+            preview_key is None
+            or preview_utils.preview_cache.get(preview_key) is not None
+        ):
+            return
+        resolved = self.resolve_preview_type(file_path)
+        if resolved is None or should_cancel():
+            return
+        file_type, mime_result, content = resolved
+        renderable: Any = None
+        try:
+            if file_type == "image":
+                renderable = preview_utils.resample_file(
+                    file_path,
+                    preview_utils.preview_pixel_size(size.width, size.height),
+                )
+                if renderable is None:
+                    return
+            elif file_type == "resvg":
+                renderable = self.render_svg(file_path)
+            elif (
+                file_type in ("text", "file")
+                and content not in self._preview_texts.values()
+            ):
+                if config["plugins"]["bat"]["enabled"]:
+                    result = self.run_bat(file_path, size)
+                    if result.returncode != 0 and not result.truncated:
+                        return
+                    renderable = Text.from_ansi(
+                        result.stdout.decode("utf-8", errors="ignore")
+                    )
+                else:
+                    if not isinstance(content, str):
+                        content = path_utils.read_text(file_path)
+                        if content is None:
+                            return
+                    renderable = self.highlight_text(
+                        file_path,
+                        content,
+                        size,
+                        mime_result.language if mime_result else None,
+                    )
+        except Exception:
+            return
+        if should_cancel():
+            return
+        # pdfs and fonts only skip mime detection, they are rendered once shown
+        preview_utils.preview_cache.put(
+            preview_key, file_type, mime_result, content, renderable
+        )
 
     def update_ui(
         self,
@@ -1035,6 +1557,8 @@ class PreviewContainer(Container):
         file_type: str,
         content: str | list[str] | None = None,
         mime_type: path_utils.MimeResult | None = None,
+        preview_key: PreviewKey | None = None,
+        renderable: Any = None,
     ) -> None:
         """
         Update the preview UI. Runs in a thread, uses call_from_thread for UI ops.
@@ -1042,6 +1566,8 @@ class PreviewContainer(Container):
         self._current_file_path = file_path
         self._current_content = content
         self._mime_type = mime_type
+        self._preview_key = preview_key
+        self._cached_renderable = renderable
         self._file_mtime = path.getmtime(file_path)
 
         self._file_type = file_type
@@ -1070,7 +1596,10 @@ class PreviewContainer(Container):
                 self.log("Showing special preview")
                 self.mount_special_messages()
             else:
-                if config["plugins"]["bat"]["enabled"]:
+                # a cached highlight means bat failed on this file last time
+                if config["plugins"]["bat"]["enabled"] and not isinstance(
+                    renderable, Syntax
+                ):
                     self.log("Showing bat preview")
                     if self.show_bat_file_preview():
                         return
@@ -1085,23 +1614,20 @@ class PreviewContainer(Container):
         self.app.call_from_thread(setattr, self, "border_title", "")
 
         display_content: str = self._current_content
-        if self._mime_type:
+        if isinstance(self._cached_renderable, str):
+            display_content = self._cached_renderable
+        elif self._mime_type:
             display_content = f"MIME Type: {self._mime_type.mime_type}"
+            file_path = self._current_file_path
             if (
-                config["plugins"]["file_one"]["enabled"]
+                file_path is not None
+                and config["plugins"]["file_one"]["enabled"]
                 and config["plugins"]["file_one"]["get_description"]
             ):
-                try:
-                    process = subprocess.run(
-                        [file_executable, "--brief", "--", self._current_file_path],
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                        timeout=1,
-                    )
-                    display_content += f"\n{process.stdout.strip()}"
-                except (subprocess.SubprocessError, FileNotFoundError) as exc:
-                    path_utils.dump_exc(self, exc)
+                description = path_utils.file_magic.describe(file_path)
+                if description:
+                    display_content += f"\n{description}"
+            self.cache_preview(display_content)
 
         if static_widget := self.has_child("Static"):
             self.app.call_from_thread(static_widget.update, display_content)
@@ -1116,16 +1642,26 @@ class PreviewContainer(Container):
         cast(Static, static_widget).can_focus = True
 
     def on_mouse_scroll_up(self, event: events.MouseScrollUp) -> None:
-        """Handle mouse scroll up for PDF navigation."""
+        """Handle mouse scroll up for PDF and text navigation."""
         if self.border_title == titles.pdf and self._file_type == "pdf":
             event.stop()
             self.update_current_pdf_page_by_diff(-1)
+        elif (
+            self.border_title in (titles.file, titles.bat) and self._file_type == "text"
+        ):
+            event.stop()
+            self.scroll_text(-1)
 
     def on_mouse_scroll_down(self, event: events.MouseScrollDown) -> None:
-        """Handle mouse scroll down for PDF navigation."""
+        """Handle mouse scroll down for PDF and text navigation."""
         if self.border_title == titles.pdf and self._file_type == "pdf":
             event.stop()
             self.update_current_pdf_page_by_diff(1)
+        elif (
+            self.border_title in (titles.file, titles.bat) and self._file_type == "text"
+        ):
+            event.stop()
+            self.scroll_text(1)
 
     # not sure if exclusive does anything, but whatever
     @work(thread=True, exclusive=True)
@@ -1133,6 +1669,21 @@ class PreviewContainer(Container):
         """Trigger PDF preview update from a thread."""
         self.show_pdf_preview()
 
+    def on_resize(self, event: events.Resize) -> None:
+        """Render PDF pages again once the preview is resized"""
+        if (
+            self._file_type != "pdf"
+            or not self.pdf.loaded
+            or event.size.width <= 0
+            or event.size.height <= 0
+        ):
+            return
+        if self.pdf.render_size != preview_utils.preview_pixel_size(
+            event.size.width, event.size.height
+        ):
+            self._cached_size = event.size
+            self._trigger_pdf_update()
+
     # commented out until further notice
     # felt like there was an issue with the way file list
     # updates on resize, so this remains as is, until i
@@ -1149,6 +1700,8 @@ class PreviewContainer(Container):
     @work(thread=True)
     def _trigger_resize_update(self) -> None:
         """Trigger resize update from a thread."""
+        # the cached preview was made for the old size
+        self._cached_renderable = None
         if config["plugins"]["bat"]["enabled"] and self.show_bat_file_preview():
             return
         self.show_normal_file_preview()
@@ -1161,7 +1714,7 @@ class PreviewContainer(Container):
         if (
             self.border_title == titles.pdf
             and self._file_type == "pdf"
-            and self.pdf.images is not None
+            and self.pdf.loaded
         ):
             if check_key(
                 event, config["keybinds"]["down"] + config["keybinds"]["page_down"]
@@ -1181,6 +1734,38 @@ class PreviewContainer(Container):
                 self.update_current_pdf_page(self.pdf.total_pages - 1)
             else:
                 return
+        elif (
+            self.border_title in (titles.file, titles.bat) and self._file_type == "text"
+        ):
+            page = max(1, (self._cached_size or self.size).height)
+            # like in vim, a number before the home or end key jumps to that line
+            count, self.text.count = self.text.count, ""
+            if event.character is not None and event.character.isdecimal():
+                event.stop()
+                self.text.count = count + event.character
+            elif count and check_key(
+                event, config["keybinds"]["home"] + config["keybinds"]["end"]
+            ):
+                event.stop()
+                self.scroll_text(jump_to=int(count) - 1)
+            elif check_key(event, config["keybinds"]["up"]):
+                event.stop()
+                self.scroll_text(-1)
+            elif check_key(event, config["keybinds"]["down"]):
+                event.stop()
+                self.scroll_text(1)
+            elif check_key(event, config["keybinds"]["page_up"]):
+                event.stop()
+                self.scroll_text(-page)
+            elif check_key(event, config["keybinds"]["page_down"]):
+                event.stop()
+                self.scroll_text(page)
+            elif check_key(event, config["keybinds"]["home"]):
+                event.stop()
+                self.scroll_text(jump_to="home")
+            elif check_key(event, config["keybinds"]["end"]):
+                event.stop()
+                self.scroll_text(jump_to="end")
         elif self.border_title == titles.archive:
             widget: FileList = self.query_one(FileList)
             if check_key(event, config["keybinds"]["up"]):
@@ -2,7 +2,8 @@ import stat
 import time
 from contextlib import suppress
 from datetime import datetime
-from os import DirEntry, lstat, path, walk
+from os import lstat, path, stat_result, walk
+from os import stat as os_stat
 
 from textual import events, on, work
 from textual.containers import VerticalGroup, VerticalScroll
@@ -11,8 +12,8 @@ from textual.widget import MountError
 from textual.widgets import Static
 from textual.worker import WorkerState
 
+from rovr.classes.file_entry import FileEntry
 from rovr.functions import utils
-from rovr.functions.path import get_direntry_for, is_hidden_file
 from rovr.variables.constants import config, scroll_bindings
 from rovr.variables.maps import SPINNER, SPINNER_LENGTH
 
@@ -26,21 +27,17 @@ class MetadataContainer(VerticalScroll, inherit_bindings=False):
         self._size_worker = None
         self._update_task = None
         self._queued_task = None
-        self._queued_task_args: None | DirEntry = None
+        self._queued_task_args: None | FileEntry = None
 
-    def info_of_dir_entry(self, dir_entry: DirEntry, type_string: str) -> str:
-        """Get the permission line from a given DirEntry object
+    def info_of_dir_entry(self, link_stat: stat_result, type_string: str) -> str:
+        """Get the permission line from an item's lstat result
         Args:
-            dir_entry (DirEntry): The nt.DirEntry class
+            link_stat (stat_result): The lstat result of the item
             type_string (str): The type of file. It should already be handled.
         Returns:
             str: A permission string.
         """
-        try:
-            file_stat = lstat(dir_entry.path)
-        except (OSError, FileNotFoundError):
-            return "?????????"
-        mode = file_stat.st_mode
+        mode = link_stat.st_mode
 
         permission_string = ""
         match type_string:
@@ -77,11 +74,11 @@ class MetadataContainer(VerticalScroll, inherit_bindings=False):
             return True
         return False
 
-    def update_metadata(self, dir_entry: DirEntry) -> None:
+    def update_metadata(self, dir_entry: FileEntry) -> None:
         """
         Debounce the update, because some people can be speed travellers
         Args:
-            dir_entry (DirEntry): The nt.DirEntry object
+            dir_entry (FileEntry): The file list's entry for the item
         """
         if any(
             worker.is_running
@@ -95,22 +92,30 @@ class MetadataContainer(VerticalScroll, inherit_bindings=False):
             self._perform_update(dir_entry)
 
     @work(thread=True)
-    def _perform_update(self, dir_entry: DirEntry) -> None:
+    def _perform_update(self, dir_entry: FileEntry) -> None:
         """
         After debouncing the update
         Args:
-            dir_entry (DirEntry): The nt.DirEntry object
+            dir_entry (FileEntry): The file list's entry for the item
 
         Raises:
             MountError: if something happens while attempting to fix a mount
         """
         if self.any_in_queue():
             return
-        # just sanity check
-        updated_dir_entry = get_direntry_for(dir_entry.path)
-        if updated_dir_entry is not None:
-            dir_entry = updated_dir_entry
-        if not path.exists(dir_entry.path):
+        # just sanity check, the item could have changed since it was listed.
+        # this is a single lstat (and a stat for symlinks), no matter how
+        # large the directory it is in is
+        link_stat: stat_result | None = None
+        file_stat: stat_result | None = None
+        with suppress(OSError):
+            link_stat = lstat(dir_entry.path)
+            file_stat = (
+                os_stat(dir_entry.path)
+                if stat.S_ISLNK(link_stat.st_mode)
+                else link_stat
+            )
+        if link_stat is None or file_stat is None:
             try:
                 self.app.call_from_thread(self.remove_children)
                 self.app.call_from_thread(
@@ -123,6 +128,15 @@ class MetadataContainer(VerticalScroll, inherit_bindings=False):
                 # just a defensive raise
                 raise
 
+        dir_entry = FileEntry.from_stat(
+            dir_entry.name,
+            dir_entry.parent,
+            link_stat,
+            file_stat,
+            dir_entry.icon,
+            dir_entry.hidden,
+        )
+
         type_str = "Unknown"
         if dir_entry.is_junction():
             type_str = "Junction"
@@ -132,10 +146,8 @@ class MetadataContainer(VerticalScroll, inherit_bindings=False):
             type_str = "Directory"
         elif dir_entry.is_file():
             type_str = "File"
-        file_info = self.info_of_dir_entry(dir_entry, type_str)
-        # got the type, now we follow
-        file_stat = dir_entry.stat()
-        is_hidden = is_hidden_file(dir_entry.path)
+        file_info = self.info_of_dir_entry(link_stat, type_str)
+        is_hidden = dir_entry.hidden
 
         values_list = []
         for field in config["metadata"]["fields"]:
@@ -2,6 +2,7 @@ import json
 import os
 from importlib import resources
 from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
 from os import path
 from shutil import which
 from typing import Callable, Literal, cast
@@ -445,4 +446,6 @@ def load_config() -> tuple[dict, RovrConfig]:
         # in the config schema, but pdfinfo_path can be None when
         # resolved from PATH, so we suppress the type error
         config["plugins"]["poppler"]["poppler_folder"] = pdfinfo_path  # ty: ignore[invalid-assignment]
+    if config["plugins"]["pdfium"]["enabled"] and find_spec("pypdfium2") is None:
+        config["plugins"]["pdfium"]["enabled"] = False
     return schema_dict, config
@@ -0,0 +1,126 @@
+import re
+from fnmatch import translate
+from functools import cache, lru_cache
+from importlib import import_module
+from os import path
+
+from pygments.lexer import Lexer
+from pygments.lexers import LEXERS, get_lexer_by_name
+from pygments.plugin import find_plugin_lexers
+from pygments.util import ClassNotFound
+from textual import highlight
+
+from rovr.classes.token_cache import CachedLexer, TokenCache, TokenSource
+
+# patterns that only look at the extension, like `*.py` or `*.html.j2`
+EXTENSION_PATTERN = re.compile(r"\*(\.[^*?\[\]]+)")
+
+token_cache = TokenCache(64)
+
+
+@cache
+def _filename_patterns() -> tuple[
+    dict[str, set[type[Lexer]]], list[tuple[re.Pattern[str], type[Lexer]]]
+]:
+    """Group the filename patterns of every lexer, the same ones pygments matches.
+
+    Returns:
+        tuple: The lexers for each extension, and every other pattern with its lexer
+    """
+    lexers: list[type[Lexer]] = [
+        getattr(import_module(module_name), class_name)
+        for class_name, (module_name, *_) in LEXERS.items()
+    ]
+    lexers.extend(find_plugin_lexers())
+    by_extension: dict[str, set[type[Lexer]]] = {}
+    other_patterns: list[tuple[re.Pattern[str], type[Lexer]]] = []
+    for lexer in lexers:
+        for pattern in (*lexer.filenames, *lexer.alias_filenames):
+            if match := EXTENSION_PATTERN.fullmatch(pattern):
+                by_extension.setdefault(match.group(1), set()).add(lexer)
+            else:
+                other_patterns.append((re.compile(translate(pattern)), lexer))
+    return by_extension, other_patterns
+
+
+@lru_cache(maxsize=1024)
+def lexer_for_filename(filename: str) -> str | None:
+    """Get the lexer for a file from its name alone, when only one lexer claims it.
+
+    Args:
+        filename(str): The name of the file, without the folder
+
+    Returns:
+        str | None: The lexer's alias, or None if its content has to be checked
+    """
+    by_extension, other_patterns = _filename_patterns()
+    matching: set[type[Lexer]] = set()
+    # `*.ext` patterns match any name ending in `.ext`, so check every suffix
+    start = filename.find(".")
+    while start != -1:
+        matching.update(by_extension.get(filename[start:], ()))
+        start = filename.find(".", start + 1)
+    matching.update(
+        lexer for pattern, lexer in other_patterns if pattern.match(filename)
+    )
+    if len(matching) != 1:
+        return None
+    lexer = matching.pop()
+    return lexer.aliases[0] if lexer.aliases else lexer.name
+
+
+def guess_language(content: str, file_path: str) -> str:
+    """Guess the language of a file, only looking at its content when its name is ambiguous.
+
+    A name that only one lexer claims decides the lexer on its own, as it does
+    in pygments, so this gives what `textual.highlight.guess_language` would
+    without lexing the content of most files.
+
+    Args:
+        content(str): The start of the file
+        file_path(str): The file
+
+    Returns:
+        str: The language, suitable for use with Pygments
+    """
+    filename = path.basename(file_path)
+    # textual special cases these, as pygments does not know them
+    if not filename.endswith(".tcss") and (language := lexer_for_filename(filename)):
+        return language
+    return highlight.guess_language(content, file_path)
+
+
+@lru_cache(maxsize=128)
+def get_lexer(language: str, tab_size: int = 4) -> Lexer:
+    """Get a lexer, with the options rich would give it.
+
+    Args:
+        language(str): The lexer's name or alias
+        tab_size(int): The tab size the text is shown with
+
+    Returns:
+        Lexer: The lexer, or a plain text one if the language is unknown
+    """
+    # the same options rich uses when it is given a lexer name
+    options = {"stripnl": False, "ensurenl": True, "tabsize": tab_size}
+    try:
+        lexer = get_lexer_by_name(language, **options)
+    except ClassNotFound:
+        lexer = get_lexer_by_name("text", **options)
+    return lexer
+
+
+def get_cached_lexer(
+    language: str, source: TokenSource, tab_size: int = 4
+) -> CachedLexer:
+    """Get a lexer that keeps the tokens it makes for a file in the token cache.
+
+    Args:
+        language(str): The lexer's name or alias
+        source(TokenSource): The file the text to highlight was read from
+        tab_size(int): The tab size the text is shown with
+
+    Returns:
+        CachedLexer: The lexer, or a plain text one if the language is unknown
+    """
+    return CachedLexer(get_lexer(language, tab_size), token_cache, source)
@@ -1,30 +1,38 @@
 import asyncio
 import base64
+import codecs
 import ctypes
+import json
+import mimetypes
 import os
 import re
 import stat
-import subprocess
+import time
+import zlib
 from os import path
-from typing import Callable, Literal, NamedTuple, TypedDict, overload
+from typing import Any, Callable, Generator, Literal, NamedTuple, overload
 
 import psutil
 import puremagic
-from natsort import natsorted
+from natsort import natsort_keygen
 from rich.console import Console
 from rich.traceback import Traceback
 from textual import work
 from textual.app import App
 from textual.dom import DOMNode
 
+from rovr.classes.file_entry import FileEntry
+from rovr.classes.file_magic import FileMagic
+from rovr.classes.listing_cache import ListingCache
+from rovr.classes.mime_cache import MimeCache
 from rovr.classes.type_aliases import (
-    DirEntryType,
-    DirEntryTypes,
     PreviewTypes,
     SortByOptions,
 )
+from rovr.functions.config import get_version
 from rovr.functions.icons import get_icon_for_file, get_icon_for_folder
 from rovr.variables.constants import config, file_executable, log_name, os_type
+from rovr.variables.maps import VAR_TO_DIR
 
 pprint = Console().print
 
@@ -33,6 +41,24 @@ mime_re_cache: dict[
     list[re.Pattern],
 ] = {}
 mime_preview_cache: dict[str, PreviewTypes | None] = {}
+listing_cache = ListingCache(
+    config["settings"]["cache"]["listings"],
+    config["settings"]["cache"]["listings_max_memory"] * 1024 * 1024,
+)
+file_magic = FileMagic(file_executable, config["plugins"]["file_one"]["timeout"])
+# only then are file(1)'s mime types used, so only then are folders classified ahead of time
+remime_rules = "remime" in config["interface"]["mime_rules"].values()
+# results made with other mime rules, another version or without `file` are not reused
+mime_cache = MimeCache(
+    path.join(VAR_TO_DIR["CONFIG"], "mime_cache.bin"),
+    config["settings"]["cache"]["mime_types"],
+    zlib.crc32(
+        json.dumps(
+            [config["interface"]["mime_rules"], get_version(), file_executable],
+            sort_keys=True,
+        ).encode()
+    ),
+)
 
 
 def normalise(*location: str | bytes) -> str:
@@ -179,14 +205,8 @@ def get_filtered_dir_names(cwd: str | bytes, show_hidden: bool = False) -> set[s
     return names
 
 
-class CWDObjectReturnDict(TypedDict):
-    name: str
-    icon: list[str]
-    dir_entry: DirEntryType
-
-
-def get_extension_sort_key(file_dict: dict) -> tuple[int, str]:
-    name = file_dict["name"]
+def get_extension_sort_key(entry: FileEntry) -> tuple[int, str]:
+    name = entry.name
     if "." not in name:
         # files without extensions
         return (1, name.lower())
@@ -206,11 +226,7 @@ def threaded_get_cwd_object(
     sort_by: SortByOptions = "name",
     reverse: bool = False,
     return_nothing_if_this_returns_true: Callable[[], bool] | None = None,
-) -> (
-    tuple[list[CWDObjectReturnDict], list[CWDObjectReturnDict]]
-    | tuple[None, None]
-    | PermissionError
-):
+) -> tuple[list[FileEntry], list[FileEntry]] | tuple[None, None] | PermissionError:
     try:
         return sync_get_cwd_object(
             node,
@@ -231,7 +247,7 @@ def sync_get_cwd_object(
     show_hidden: bool = False,
     sort_by: SortByOptions = "name",
     reverse: bool = False,
-) -> tuple[list[CWDObjectReturnDict], list[CWDObjectReturnDict]]: ...
+) -> tuple[list[FileEntry], list[FileEntry]]: ...
 
 
 @overload
@@ -242,9 +258,7 @@ def sync_get_cwd_object(
     sort_by: SortByOptions = "name",
     reverse: bool = False,
     return_nothing_if_this_returns_true: Callable[[], bool] | None = None,
-) -> (
-    tuple[list[CWDObjectReturnDict], list[CWDObjectReturnDict]] | tuple[None, None]
-): ...
+) -> tuple[list[FileEntry], list[FileEntry]] | tuple[None, None]: ...
 
 
 def sync_get_cwd_object(
@@ -256,7 +270,7 @@ def sync_get_cwd_object(
     ] = "name",
     reverse: bool = False,
     return_nothing_if_this_returns_true: Callable[[], bool] | None = None,
-) -> tuple[list[CWDObjectReturnDict], list[CWDObjectReturnDict]] | tuple[None, None]:
+) -> tuple[list[FileEntry], list[FileEntry]] | tuple[None, None]:
     """
     Get the objects (files and folders) in a provided directory
     Args:
@@ -272,10 +286,136 @@ def sync_get_cwd_object(
         tuple[None, None]: When early termination is triggered
 
     Raises:
-        TypeError: if the wrong type is received
         PermissionError: When access to the directory is denied
+    """  # noqa: DOC502
+    folders: list[FileEntry] = []
+    files: list[FileEntry] = []
+    finished = False
+    # hidden items are filtered out after scanning, so that every listing of
+    # a directory shares one cache entry
+    for chunk_folders, chunk_files, finished in stream_cwd_object(
+        dom_node,
+        cwd,
+        True,
+        return_nothing_if_this_returns_true=return_nothing_if_this_returns_true,
+    ):
+        folders.extend(chunk_folders)
+        files.extend(chunk_files)
+    if not finished:
+        return None, None
+
+    if (
+        return_nothing_if_this_returns_true is not None
+        and return_nothing_if_this_returns_true()
+    ):
+        if globals().get("is_dev", False):
+            dom_node.log("Cut off early before sorting results")
+        return None, None
+    folders, files = sort_cwd_object(folders, files, sort_by, reverse, show_hidden)
+
+    if globals().get("is_dev", False):
+        dom_node.log(f"Found {len(folders)} folders and {len(files)} files in {cwd}")
+    return folders, files
+
+
+def stream_cwd_object(
+    dom_node: DOMNode,
+    cwd: str,
+    show_hidden: bool = False,
+    chunk_size: int = 1000,
+    first_chunk_size: int | None = None,
+    return_nothing_if_this_returns_true: Callable[[], bool] | None = None,
+) -> Generator[tuple[list[FileEntry], list[FileEntry], bool], None, None]:
+    """
+    Get the unsorted objects in a provided directory in chunks, going through the listing cache
+    Args:
+        dom_node(DOMNode): The DOM node requesting this operation
+        cwd(str): The working directory to check
+        show_hidden(bool): Whether to include hidden files/folders
+        chunk_size(int): The number of items per chunk
+        first_chunk_size(int | None): The number of items in the first chunk, defaults to `chunk_size`
+        return_nothing_if_this_returns_true(Callable[[], bool] | None): A callable that returns a bool. If it returns True, the generator stops early.
+
+    Yields:
+        tuple[list[dict], list[dict], bool]: (folders, files, finished) for each chunk.
+            Only the last chunk has `finished` set, so a generator that stops
+            without one was cut off early. A cached listing is yielded as a
+            single finished chunk.
+
+    Raises:
+        PermissionError: When access to the directory is denied
+    """
+    cache_key = normalise(cwd)
+    cached = listing_cache.get(cache_key, show_hidden)
+    if cached is not None:
+        if globals().get("is_dev", False):
+            dom_node.log(f"Using cached listing for {cwd}")
+        # the lists are shared with the cache, so callers must not mutate them
+        yield cached.folders, cached.files, True
+        return
+
+    scan_started_ns = time.time_ns()
+    try:
+        mtime_ns = os.stat(cwd).st_mtime_ns
+    except OSError:
+        raise PermissionError(f"PermissionError: Unable to access {cwd}")
+
+    folders: list[FileEntry] = []
+    files: list[FileEntry] = []
+    # the last chunk is kept until the listing is cached, so that a
+    # directory that fits into a single chunk is only yielded once
+    last: tuple[list[FileEntry], list[FileEntry]] = ([], [])
+    for chunk_folders, chunk_files, more in iter_cwd_object(
+        dom_node,
+        cwd,
+        show_hidden,
+        chunk_size,
+        first_chunk_size,
+        return_nothing_if_this_returns_true,
+    ):
+        folders.extend(chunk_folders)
+        files.extend(chunk_files)
+        if more:
+            yield chunk_folders, chunk_files, False
+        else:
+            last = (chunk_folders, chunk_files)
+    if (
+        return_nothing_if_this_returns_true is not None
+        and return_nothing_if_this_returns_true()
+    ):
+        return
+
+    dom_node.log(f"Collected {len(folders)} folders and {len(files)} files in {cwd}")
+    listing_cache.put(cache_key, show_hidden, mtime_ns, folders, files, scan_started_ns)
+    yield last[0], last[1], True
+
+
+def iter_cwd_object(
+    dom_node: DOMNode,
+    cwd: str,
+    show_hidden: bool = False,
+    chunk_size: int = 1000,
+    first_chunk_size: int | None = None,
+    return_nothing_if_this_returns_true: Callable[[], bool] | None = None,
+) -> Generator[tuple[list[FileEntry], list[FileEntry], bool], None, None]:
     """
+    Scan a directory into chunks of unsorted folders and files, without touching the cache
+    Args:
+        dom_node(DOMNode): The DOM node requesting this operation
+        cwd(str): The working directory to check
+        show_hidden(bool): Whether to include hidden files/folders
+        chunk_size(int): The number of items per chunk
+        first_chunk_size(int | None): The number of items in the first chunk, defaults to `chunk_size`
+        return_nothing_if_this_returns_true(Callable[[], bool] | None): A callable that returns a bool. If it returns True, the generator stops early.
 
+    Yields:
+        tuple[list[dict], list[dict], bool]: (folders, files, more) for each chunk.
+            A chunk is only yielded once the entry after it was read, so
+            `more` is False for the last chunk alone, which may be empty.
+
+    Raises:
+        PermissionError: When access to the directory is denied
+    """
     try:
         scanned_entries = os.scandir(cwd)
     except (PermissionError, FileNotFoundError, OSError):
@@ -288,84 +428,167 @@ def sync_get_cwd_object(
         ):
             if globals().get("is_dev", False):
                 print("Cut off early after scandir")
-            return None, None
+            return
 
-        folders: list[CWDObjectReturnDict] = []
-        files: list[CWDObjectReturnDict] = []
+        folders: list[FileEntry] = []
+        files: list[FileEntry] = []
+        limit = first_chunk_size or chunk_size
 
         for item in entries:
-            if not isinstance(item, DirEntryTypes):
-                raise TypeError(f"Expected a DirEntry object but got {type(item)}")
-            if not show_hidden and is_hidden_file(item.path):
+            if len(folders) + len(files) >= limit:
+                yield folders, files, True
+                folders, files = [], []
+                limit = chunk_size
+            # when hidden items are kept, entries only check if they are hidden once asked
+            hidden = None if show_hidden else is_hidden_file(item.path)
+            if hidden:
                 continue
 
             if item.is_dir():
-                folders.append({
-                    "name": item.name,
-                    "icon": get_icon_for_folder(item.name),
-                    "dir_entry": item,
-                })
+                folders.append(
+                    FileEntry.from_dir_entry(
+                        item, cwd, get_icon_for_folder(item.name), hidden
+                    )
+                )
             else:
-                files.append({
-                    "name": item.name,
-                    "icon": get_icon_for_file(item.name),
-                    "dir_entry": item,
-                })
+                files.append(
+                    FileEntry.from_dir_entry(
+                        item, cwd, get_icon_for_file(item.name), hidden
+                    )
+                )
             if (
                 return_nothing_if_this_returns_true is not None
                 and return_nothing_if_this_returns_true()
             ):
                 if globals().get("is_dev", False):
                     dom_node.log("Cut off early during dictionary building")
-                return None, None
+                return
 
-    dom_node.log(f"Collected {len(folders)} folders and {len(files)} files in {cwd}")
+    yield folders, files, False
 
-    # sort order
+
+def get_sort_key(
+    sort_by: SortByOptions = "name", folders: bool = False
+) -> Callable[[FileEntry], Any] | None:
+    """
+    Get the key that folders or files are sorted by
+    Args:
+        sort_by(str): What to sort by
+        folders(bool): Whether the key is for folders instead of files
+
+    Returns:
+        Callable | None: The sort key, or None to keep the scan order
+    """
     match sort_by:
         case "name":
-            folders.sort(key=lambda x: x["name"].lower())
-            files.sort(key=lambda x: x["name"].lower())
+            return _name_sort_key
         case "natural":
             # no we will not be using `natsort`'s os_sorted
-            folders: list[CWDObjectReturnDict] = natsorted(
-                folders, key=lambda x: x["name"].lower()
-            )
-            files: list[CWDObjectReturnDict] = natsorted(
-                files, key=lambda x: x["name"].lower()
-            )
+            return _natural_sort_key
         case "created":
-            folders.sort(key=lambda x: x["dir_entry"].stat().st_ctime_ns)
-            files.sort(key=lambda x: x["dir_entry"].stat().st_ctime_ns)
+            return _ctime_sort_key
         case "modified":
-            folders.sort(key=lambda x: x["dir_entry"].stat().st_mtime_ns)
-            files.sort(key=lambda x: x["dir_entry"].stat().st_mtime_ns)
+            return _mtime_sort_key
         case "size":
             # no we will not be calculating the folder size
-            folders.sort(key=lambda x: x["name"].lower())
-            files.sort(key=lambda x: x["dir_entry"].stat().st_size)
+            return _name_sort_key if folders else _size_sort_key
         case "extension":
             # folders dont have extensions btw
             # and i will not count dot prepended folders
-            folders.sort(key=lambda x: x["name"].lower())
-            files.sort(key=get_extension_sort_key)
+            return _name_sort_key if folders else get_extension_sort_key
+        case _:
+            return None
+
+
+def _name_sort_key(entry: FileEntry) -> str:
+    return entry.name.lower()
+
+
+_natural_sort_key = natsort_keygen(key=_name_sort_key)
+
+
+def _ctime_sort_key(entry: FileEntry) -> int:
+    return entry.ctime_ns
+
+
+def _mtime_sort_key(entry: FileEntry) -> int:
+    return entry.mtime_ns
+
+
+def _size_sort_key(entry: FileEntry) -> int:
+    return entry.size
+
+
+def sort_cwd_object(
+    folders: list[FileEntry],
+    files: list[FileEntry],
+    sort_by: SortByOptions = "name",
+    reverse: bool = False,
+    show_hidden: bool = True,
+) -> tuple[list[FileEntry], list[FileEntry]]:
+    """
+    Sort scanned folders and files into new lists
+    Args:
+        folders(list[dict]): The folders to sort
+        files(list[dict]): The files to sort
+        sort_by(str): What to sort by
+        reverse(bool): Whether to reverse the sorting
+        show_hidden(bool): Whether to keep hidden files/folders
+
+    Returns:
+        tuple[list[dict], list[dict]]: The sorted (folders, files)
+    """
+    if not show_hidden:
+        folders = [item for item in folders if not item.hidden]
+        files = [item for item in files if not item.hidden]
+    folder_key = get_sort_key(sort_by, folders=True)
+    file_key = get_sort_key(sort_by)
+    folders = list(folders) if folder_key is None else sorted(folders, key=folder_key)
+    files = list(files) if file_key is None else sorted(files, key=file_key)
 
-    if (
-        return_nothing_if_this_returns_true is not None
-        and return_nothing_if_this_returns_true()
-    ):
-        if globals().get("is_dev", False):
-            dom_node.log("Cut off early before reversing results")
-        return None, None
     if reverse:
         files.reverse()
         folders.reverse()
-
-    if globals().get("is_dev", False):
-        dom_node.log(f"Found {len(folders)} folders and {len(files)} files in {cwd}")
     return folders, files
 
 
+def get_cwd_entry(cwd: str, name: str, show_hidden: bool = False) -> FileEntry | None:
+    """
+    Get the listing entry for a single item, the same way a scan would
+    Args:
+        cwd(str): The directory the item is in
+        name(str): The name of the item
+        show_hidden(bool): Whether to include hidden files/folders
+
+    Returns:
+        FileEntry | None: The entry, or None if it does not exist or is hidden
+    """
+    item_path = path.join(cwd, name)
+    try:
+        link_stat = os.lstat(item_path)
+    except OSError:
+        return None
+    hidden = is_hidden_file(item_path)
+    if hidden and not show_hidden:
+        return None
+    target_stat: os.stat_result | None = link_stat
+    if stat.S_ISLNK(link_stat.st_mode):
+        try:
+            target_stat = os.stat(item_path)
+        except OSError:
+            # broken symlink
+            target_stat = None
+    is_dir = target_stat is not None and stat.S_ISDIR(target_stat.st_mode)
+    return FileEntry.from_stat(
+        name,
+        cwd,
+        link_stat,
+        target_stat,
+        get_icon_for_folder(name) if is_dir else get_icon_for_file(name),
+        hidden,
+    )
+
+
 def file_is_type(
     file_path: str,
 ) -> Literal["unknown", "symlink", "directory", "junction", "file"]:
@@ -666,14 +889,166 @@ def match_mime_to_preview_type(
     return None
 
 
+extension_rules = {
+    extension.lower(): rule
+    for extension, rule in config["interface"]["extension_rules"].items()
+}
+
+
+def match_extension_to_preview_type(
+    file_path: str,
+) -> Literal["text", "image", "pdf", "archive", "resvg", "font"] | None:
+    """
+    Match a file's extension against configured rules, without reading the file.
+
+    Args:
+        file_path: The file
+
+    Returns:
+        str : The preview type the longest matching extension settles
+        None: None if no rule matches, or the rule asks for the content to be checked
+    """
+    filename = path.basename(file_path).lower()
+    # longest first, so `.tar.gz` is matched before `.gz`
+    start = filename.find(".", 1)
+    while start != -1:
+        rule = extension_rules.get(filename[start:])
+        if rule is not None:
+            return None if rule.get("verify", False) else rule["type"]
+        start = filename.find(".", start + 1)
+    return None
+
+
+def mime_type_from_extension(file_path: str, preview_type: str) -> "MimeResult":
+    """
+    Get the MIME type of a file that was matched by its extension.
+
+    Args:
+        file_path: The file
+        preview_type: The preview type its extension settled
+
+    Returns:
+        MimeResult: The MIME type its name suggests, and its lexer if it is text
+    """
+    from rovr.functions.highlight import lexer_for_filename
+
+    mime_type = mimetypes.guess_type(path.basename(file_path), strict=False)[0]
+    if preview_type != "text":
+        return MimeResult("extension", mime_type or "application/octet-stream")
+    language = lexer_for_filename(path.basename(file_path))
+    return MimeResult(
+        "extension",
+        mime_type or f"text/{language or 'plain'}",
+        None,
+        language,
+    )
+
+
+# how much of a file is read to detect its type and preview it as text
+TEXT_PREVIEW_SIZE = 1024
+# utf-32 goes first, as its little endian BOM starts with the utf-16 one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _detect_unicode_encoding(data: bytes) -> str | None:
+    """Detect utf-16 or utf-32 text, and text with a BOM.
+
+    Args:
+        data(bytes): The start of the file
+
+    Returns:
+        str | None: The encoding, or None if it is none of them
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    # without a BOM, utf-16 and utf-32 text starting with an ascii character
+    # has its zero bytes in a pattern that tells the byte order
+    if len(data) >= 4 and 0 in data[:4]:
+        if not data[0]:
+            return "utf-16-be" if data[1] else "utf-32-be"
+        if not data[1]:
+            return "utf-16-le" if data[2] or data[3] else "utf-32-le"
+    return None
+
+
+def decode_text(data: bytes, complete: bool = True) -> tuple[str, str]:
+    """Decode the start of a text file, detecting its encoding from a BOM or its bytes.
+
+    Args:
+        data(bytes): The start of the file
+        complete(bool): Whether `data` is the whole file. If not, a character
+            cut off at the end is dropped instead of failing the decode
+
+    Returns:
+        tuple[str, str]: The text, and the encoding it was decoded with
+    """
+    # cp1252 is the usual legacy encoding, but leaves a few bytes undefined
+    encodings = ["utf-8", "cp1252"]
+    if detected := _detect_unicode_encoding(data):
+        encodings.insert(0, detected)
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            return decoder.decode(data, final=complete), encoding
+        except UnicodeDecodeError:
+            continue
+    # every byte is valid latin-1, so this always gives something to show
+    return data.decode("latin-1"), "latin-1"
+
+
+def read_file_start(file_path: str, size: int = TEXT_PREVIEW_SIZE) -> bytes | None:
+    """Read the start of a file with a single read.
+
+    Args:
+        file_path(str): The file to read
+        size(int): The most bytes to read
+
+    Returns:
+        bytes | None: The start of the file, or None if it could not be read
+    """
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(size)
+    except OSError:
+        return None
+
+
+def read_text(file_path: str, file_bytes: bytes | None = None) -> str | None:
+    """Read the start of a file as text, detecting its encoding.
+
+    Args:
+        file_path(str): The file to read
+        file_bytes(bytes | None): The start of the file if it was already read
+
+    Returns:
+        str | None: The start of the file, or None if it could not be read
+    """
+    if file_bytes is None:
+        file_bytes = read_file_start(file_path)
+        if file_bytes is None:
+            return None
+    return decode_text(file_bytes, complete=len(file_bytes) < TEXT_PREVIEW_SIZE)[0]
+
+
 class MimeResult(NamedTuple):
-    method: Literal["basic", "puremagic", "file1"]
+    method: Literal["basic", "puremagic", "file1", "extension"]
     mime_type: str
     content: str | None = None
+    # the lexer guessed from the content, so it is not guessed again to highlight it
+    language: str | None = None
 
 
 def get_mime_type(
-    file_path: str, ignore: list[Literal["basic", "puremagic", "file1"]] | None = None
+    file_path: str,
+    ignore: list[Literal["basic", "puremagic", "file1"]] | None = None,
+    file_bytes: bytes | None = None,
 ) -> MimeResult | None:
     """
     Synchronous/Threaded wrapper to get the MIME type of a file.
@@ -681,6 +1056,7 @@ def get_mime_type(
     Args:
         file_path: Path to the file to check
         ignore: List of detection methods to skip
+        file_bytes: The start of the file from `read_file_start`, if it was already read
 
     Returns:
         MimeResult: The method used and the detected MIME type
@@ -692,12 +1068,11 @@ def get_mime_type(
     file_extension = path.splitext(file_path)[1].lower()
 
     # Read file bytes once, reuse for both puremagic and basic detection
-    try:
-        with open(file_path, "rb") as f:
-            file_bytes = f.read(1024)  # Read first 1KiB
-    except OSError:
-        # Cannot open file at all
-        return None
+    if file_bytes is None:
+        file_bytes = read_file_start(file_path)
+        if file_bytes is None:
+            # Cannot open file at all
+            return None
 
     # Step 1: Try puremagic (magic byte detection) first
     if "puremagic" not in ignore:
@@ -718,73 +1093,21 @@ def get_mime_type(
             # puremagic failed, continue to next method
             pass
 
-    # Step 2: Try decoding as text, checking all encodings in order of most likely
+    # Step 2: Try decoding as text
     # If puremagic didn't recognise it, it might perhaps be a plain text file
     if "basic" not in ignore:
-        from textual.highlight import guess_language
-
-        encodings_to_try = [
-            "utf8",
-            "utf16",
-            "utf32",
-            "latin1",
-            "iso8859-1",
-            "mbcs",
-            "ascii",
-            "us-ascii",
-        ]
-
-        for encoding in encodings_to_try:
-            try:
-                content = file_bytes.decode(encoding)
-                return MimeResult(
-                    "basic", f"text/{guess_language(content, file_path)}", content
-                )
-            except UnicodeDecodeError:
-                pass
-
-    # Step 3: Fall back to file(1) command if available
-    if "file1" not in ignore:
-        try:
-            process = subprocess.run(
-                [file_executable, "--mime-type", "-b", file_path],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=1,
-            )
-            mime_type = process.stdout.strip()
-            if mime_type:
-                return MimeResult("file1", mime_type)
-        except (
-            subprocess.CalledProcessError,
-            subprocess.TimeoutExpired,
-            FileNotFoundError,
-        ):
-            # file(1) command failed or is not available
-            pass
-
-    return None
+        from rovr.functions.highlight import guess_language
 
+        content, _ = decode_text(
+            file_bytes, complete=len(file_bytes) < TEXT_PREVIEW_SIZE
+        )
+        language = guess_language(content, file_path)
+        return MimeResult("basic", f"text/{language}", content, language)
 
-def get_direntry_for(file_path: str) -> DirEntryType | None:
-    """Get the DirEntry object for a given file path.
+    # Step 3: Fall back to file(1)'s magic if available
+    if "file1" not in ignore and (mime_type := file_magic.mime_type(file_path)):
+        return MimeResult("file1", mime_type)
 
-    Args:
-        file_path (str): The path to the file
-
-    Returns:
-        DirEntryType | None: The DirEntry object if found, else None
-    """
-    parent_dir = path.dirname(file_path)
-    base_name = path.basename(file_path)
-    try:
-        with os.scandir(parent_dir) as it:
-            for entry in it:
-                if entry.name == base_name:
-                    return entry
-    except (PermissionError, FileNotFoundError, OSError):
-        return None
     return None
 
 
@@ -2,15 +2,18 @@ from __future__ import annotations
 
 import os
 import platform
+import re
 import shutil
 import subprocess
 import tempfile
+from functools import lru_cache
 from io import BytesIO
-from subprocess import PIPE, Popen, TimeoutExpired
 
 from PIL import Image
 from PIL.Image import Image as PILImage
 
+from rovr.classes.cancellable_process import CancellableProcess
+
 # Keys whose values should be parsed as integers from pdfinfo output
 pdfinfo_turn_to_int = {"Pages"}
 
@@ -59,6 +62,19 @@ def _get_env(poppler_path: str | None = None) -> dict[str, str]:
     return env
 
 
+def _get_resolution_args(scale_to: tuple[int, int] | None) -> list[str]:
+    """Build the arguments that set the size pages are rendered at.
+    Args:
+        scale_to: The width and height to scale to, -1 keeping the aspect ratio
+
+    Returns:
+        The arguments for pdftoppm or pdftocairo
+    """
+    if scale_to is None:
+        return ["-r", "200"]
+    return ["-scale-to-x", str(scale_to[0]), "-scale-to-y", str(scale_to[1])]
+
+
 def _parse_ppm_buffer(data: bytes) -> list[PILImage]:
     """Parse concatenated PPM images from pdftoppm stdout.
 
@@ -120,11 +136,16 @@ def _load_images_from_folder(
 def get_pdf_info(
     pdf_path: str,
     poppler_path: str | None = None,
+    use_pdfium: bool = False,
+    timeout: float = 5,
 ) -> dict[str, str | int]:
-    """Get PDF metadata
+    """Get PDF metadata, cached by the file's modification time and size
     Args:
         pdf_path: Path to the PDF file
         poppler_path: Optional directory containing poppler binaries
+        use_pdfium: Read the PDF with pypdfium2 instead of pdfinfo, which
+            only gives the page count and first page size
+        timeout: How long pdfinfo may run, in seconds
 
     Returns:
         dict: metadata info with int values parsed as integers, rest as strings
@@ -132,26 +153,87 @@ def get_pdf_info(
     Raises:
         ValueError: Page count cannot be determined from output.
         TimeoutExpired: If the pdfinfo command takes too long to execute.
+        ProcessCancelled: If the worker was cancelled while pdfinfo ran.
+        OSError: If the file cannot be read with pypdfium2.
+    """  # noqa: DOC502
+    try:
+        file_stat = os.stat(pdf_path)
+    except OSError:
+        if use_pdfium:
+            raise
+        # let pdfinfo report the error
+        return _run_pdfinfo(pdf_path, poppler_path, timeout)
+    return dict(
+        _get_pdf_info(
+            pdf_path,
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+            poppler_path,
+            use_pdfium,
+            timeout,
+        )
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_pdf_info(
+    pdf_path: str,
+    mtime_ns: int,
+    size: int,
+    poppler_path: str | None,
+    use_pdfium: bool,
+    timeout: float,
+) -> dict[str, str | int]:
+    """Get PDF metadata, with `mtime_ns` and `size` only used as part of the cache key
+    Args:
+        pdf_path: Path to the PDF file
+        mtime_ns: The file's modification time
+        size: The file's size
+        poppler_path: Optional directory containing poppler binaries
+        use_pdfium: Read the PDF with pypdfium2 instead of pdfinfo
+        timeout: How long pdfinfo may run, in seconds
+
+    Returns:
+        dict: metadata info, which must not be modified
     """
+    if use_pdfium:
+        # imported here, as it pulls in the config and the resample pool
+        from rovr.functions import preview_utils
+
+        return preview_utils.get_pdfium_info(pdf_path)
+    return _run_pdfinfo(pdf_path, poppler_path, timeout)
+
+
+def _run_pdfinfo(
+    pdf_path: str, poppler_path: str | None, timeout: float
+) -> dict[str, str | int]:
+    """Run pdfinfo and parse its output
+    Args:
+        pdf_path: Path to the PDF file
+        poppler_path: Optional directory containing poppler binaries
+        timeout: How long pdfinfo may run, in seconds
+
+    Returns:
+        dict: metadata info with int values parsed as integers, rest as strings
+
+    Raises:
+        ValueError: Page count cannot be determined from output.
+        TimeoutExpired: If the pdfinfo command takes too long to execute.
+        ProcessCancelled: If the worker was cancelled while pdfinfo ran.
+    """  # noqa: DOC502
     command = [_get_command_path("pdfinfo", poppler_path), pdf_path]
 
-    proc = Popen(
+    process = CancellableProcess.run(
         command,
+        timeout,
         env=_get_env(poppler_path),
-        stdout=PIPE,
-        stderr=PIPE,
         startupinfo=_get_startupinfo(),
     )
-    try:
-        out, err = proc.communicate(timeout=5)
-    except TimeoutExpired:
-        proc.kill()
-        proc.communicate()
-        raise
+    out, err = process.stdout, process.stderr
 
-    if proc.returncode != 0:
+    if process.returncode != 0:
         raise ValueError(
-            f"pdfinfo failed with error code {proc.returncode}.\n{err.decode('utf8', 'ignore')}"
+            f"pdfinfo failed with error code {process.returncode}.\n{err.decode('utf8', 'ignore')}"
         )
 
     result: dict[str, str | int] = {}
@@ -170,6 +252,34 @@ def get_pdf_info(
     return result
 
 
+def get_scale_to(
+    pdf_info: dict[str, str | int], max_size: tuple[int, int]
+) -> tuple[int, int] | None:
+    """Work out how to scale pages so the first page just fits in a box.
+
+    Only the side that limits the fit is given, so pages keep their aspect
+    ratio, and other pages of the same shape fit exactly as well.
+
+    Args:
+        pdf_info: The metadata from `get_pdf_info`
+        max_size: The width and height of the box, in pixels
+
+    Returns:
+        The `scale_to` for `get_pdf_images`, or None if the page size is unknown
+    """
+    match = re.match(r"([\d.]+) x ([\d.]+)", str(pdf_info.get("Page size", "")))
+    if match is None:
+        return None
+    width, height = float(match[1]), float(match[2])
+    if width <= 0 or height <= 0:
+        return None
+    if str(pdf_info.get("Page rot", "0")) in ("90", "270"):
+        width, height = height, width
+    if width / height >= max_size[0] / max_size[1]:
+        return (max_size[0], -1)
+    return (-1, max_size[1])
+
+
 def get_pdf_images(
     pdf_path: str,
     first_page: int = 1,
@@ -177,8 +287,11 @@ def get_pdf_images(
     poppler_path: str | None = None,
     use_pdftocairo: bool = False,
     thread_count: int = 1,
+    scale_to: tuple[int, int] | None = None,
+    use_pdfium: bool = False,
+    timeout: float = 15,
 ) -> list[PILImage]:
-    """Render PDF pages as PIL images using poppler's `pdftoppm` or `pdftocairo`.
+    """Render PDF pages as PIL images using poppler's `pdftoppm` or `pdftocairo`, or pypdfium2.
     Args:
         pdf_path: Path to the PDF file
         first_page: First page to render (1-indexed)
@@ -187,6 +300,12 @@ def get_pdf_images(
         poppler_path: Optional directory containing poppler binaries
         use_pdftocairo: Use pdftocairo instead of pdftoppm (render to ppm from stdout vs png files in temp folder)
         thread_count: Number of parallel subprocess invocations
+        scale_to: The width and height to scale each page to, where -1 keeps
+            the page's aspect ratio (see `get_scale_to`). If None, pages are
+            rendered at 200 DPI.
+        use_pdfium: Render in the resample pool with pypdfium2 instead, which
+            keeps the document open between calls. `last_page` must be given.
+        timeout: How long each poppler command may run, in seconds
 
     Returns:
         List of PIL images, one per rendered page
@@ -194,6 +313,13 @@ def get_pdf_images(
     if last_page is not None and first_page > last_page:
         return []
 
+    if use_pdfium and last_page is not None:
+        from rovr.functions import preview_utils
+
+        return preview_utils.render_pdfium_pages(
+            pdf_path, first_page, last_page, scale_to
+        )
+
     page_count = (last_page - first_page + 1) if last_page is not None else None
 
     if thread_count < 1:
@@ -213,8 +339,10 @@ def get_pdf_images(
             page_count=page_count,
             poppler_path=poppler_path,
             thread_count=thread_count,
+            scale_to=scale_to,
             env=env,
             startupinfo=startupinfo,
+            timeout=timeout,
         )
     else:
         return _render_with_pdftoppm(
@@ -224,8 +352,10 @@ def get_pdf_images(
             page_count=page_count,
             poppler_path=poppler_path,
             thread_count=thread_count,
+            scale_to=scale_to,
             env=env,
             startupinfo=startupinfo,
+            timeout=timeout,
         )
 
 
@@ -236,8 +366,10 @@ def _render_with_pdftoppm(
     page_count: int | None,
     poppler_path: str | None,
     thread_count: int,
+    scale_to: tuple[int, int] | None,
     env: dict[str, str],
     startupinfo: subprocess.STARTUPINFO | None,
+    timeout: float,
 ) -> list[PILImage]:
     """Render pages via pdftoppm, reading PPM bytes from stdout.
 
@@ -248,75 +380,62 @@ def _render_with_pdftoppm(
         page_count: Total pages to render, or None if last_page is None
         poppler_path: Optional poppler binary directory
         thread_count: Number of parallel subprocesses
+        scale_to: Size to scale pages to, or None for 200 DPI
         env: Environment variables dict
         startupinfo: Windows STARTUPINFO or None
+        timeout: How long each subprocess may run, in seconds
 
     Returns:
         List of PIL images
 
     Raises:
         TimeoutExpired: If any pdftoppm command takes too long to execute
-    """
+        ProcessCancelled: If the worker was cancelled while pdftoppm ran
+    """  # noqa: DOC502
     command_base = _get_command_path("pdftoppm", poppler_path)
 
     if page_count is None or thread_count <= 1:
         # Single process: render all requested pages at once
-        args = [command_base, "-r", "200"]
+        args = [command_base, *_get_resolution_args(scale_to)]
         args.extend(["-f", str(first_page)])
         if last_page is not None:
             args.extend(["-l", str(last_page)])
         args.append(pdf_path)
 
-        try:
-            proc = Popen(
-                args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo
-            )
-            data, _ = proc.communicate(timeout=15)
-        except TimeoutExpired:
-            proc.kill()
-            proc.communicate()
-            raise
-        return _parse_ppm_buffer(data)
+        process = CancellableProcess.run(
+            args, timeout, env=env, startupinfo=startupinfo
+        )
+        return _parse_ppm_buffer(process.stdout)
 
     # Multi-process: split page ranges across subprocesses
     remainder = page_count % thread_count
     current_page = first_page
-    processes: list[Popen] = []
+    processes: list[CancellableProcess] = []
 
     for _ in range(thread_count):
         chunk = page_count // thread_count + int(remainder > 0)
         chunk_last = current_page + chunk - 1
 
-        args = [command_base, "-r", "200"]
+        args = [command_base, *_get_resolution_args(scale_to)]
         args.extend(["-f", str(current_page)])
         args.extend(["-l", str(chunk_last)])
         args.append(pdf_path)
 
         processes.append(
-            Popen(args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo)
+            CancellableProcess(args, timeout, env=env, startupinfo=startupinfo)
         )
 
         current_page += chunk
         remainder -= int(remainder > 0)
 
     images: list[PILImage] = []
-    saved_exception: TimeoutExpired | None = None
-    for proc in processes:
-        if saved_exception is not None:
-            proc.kill()
-            proc.communicate()
-            continue
-        try:
-            data, _ = proc.communicate(timeout=15)
-        except TimeoutExpired as exc:
-            proc.kill()
-            proc.communicate()
-            if not saved_exception:
-                saved_exception = exc
-                continue
-        images += _parse_ppm_buffer(data)
-    if saved_exception is not None:
-        raise saved_exception
+    try:
+        for process in processes:
+            images += _parse_ppm_buffer(process.wait().stdout)
+    finally:
+        # the rest are not needed once one fails
+        for process in processes:
+            process.kill()
 
     return images
 
@@ -328,8 +447,10 @@ def _render_with_pdftocairo(
     page_count: int | None,
     poppler_path: str | None,
     thread_count: int,
+    scale_to: tuple[int, int] | None,
     env: dict[str, str],
     startupinfo: subprocess.STARTUPINFO | None,
+    timeout: float,
 ) -> list[PILImage]:
     """Render pages via pdftocairo, writing PNGs to a temp directory.
 
@@ -340,79 +461,65 @@ def _render_with_pdftocairo(
         page_count: Total pages to render, or None if last_page is None
         poppler_path: Optional poppler binary directory
         thread_count: Number of parallel subprocesses
+        scale_to: Size to scale pages to, or None for 200 DPI
         env: Environment variables dict
         startupinfo: Windows STARTUPINFO or None
+        timeout: How long each subprocess may run, in seconds
 
     Returns:
         List of PIL images
 
     Raises:
         TimeoutExpired: If any pdftocairo command takes too long to execute
-    """
+        ProcessCancelled: If the worker was cancelled while pdftocairo ran
+    """  # noqa: DOC502
     command_base = _get_command_path("pdftocairo", poppler_path)
     output_folder = tempfile.mkdtemp()
 
     try:
         if page_count is None or thread_count <= 1:
             prefix = "page"
-            args = [command_base, "-png", "-r", "200"]
+            args = [command_base, "-png", *_get_resolution_args(scale_to)]
             args.extend(["-f", str(first_page)])
             if last_page is not None:
                 args.extend(["-l", str(last_page)])
             args.extend([pdf_path, os.path.join(output_folder, prefix)])
 
-            proc = Popen(
-                args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo
-            )
-            try:
-                proc.communicate(timeout=15)
-            except TimeoutExpired:
-                proc.kill()
-                proc.communicate()
-                raise
+            CancellableProcess.run(args, timeout, env=env, startupinfo=startupinfo)
             return _load_images_from_folder(output_folder, prefix, "png")
 
         # multi proc stuff
         remainder = page_count % thread_count
         current_page = first_page
-        processes: list[tuple[str, Popen]] = []
+        processes: list[tuple[str, CancellableProcess]] = []
 
         for i in range(thread_count):
             chunk = page_count // thread_count + int(remainder > 0)
             chunk_last = current_page + chunk - 1
             prefix = f"chunk{i}"
 
-            args = [command_base, "-png", "-r", "200"]
+            args = [command_base, "-png", *_get_resolution_args(scale_to)]
             args.extend(["-f", str(current_page)])
             args.extend(["-l", str(chunk_last)])
             args.extend([pdf_path, os.path.join(output_folder, prefix)])
 
             processes.append((
                 prefix,
-                Popen(args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo),
+                CancellableProcess(args, timeout, env=env, startupinfo=startupinfo),
             ))
 
             current_page += chunk
             remainder -= int(remainder > 0)
 
         images: list[PILImage] = []
-        saved_exception: TimeoutExpired | None = None
-        for prefix, proc in processes:
-            if saved_exception is not None:
-                proc.kill()
-                proc.communicate()
-                continue
-            try:
-                proc.communicate(timeout=15)
-            except TimeoutExpired as exc:
-                proc.kill()
-                proc.communicate()
-                if not saved_exception:
-                    saved_exception = exc
-                    continue
-            images += _load_images_from_folder(output_folder, prefix, "png")
-        if saved_exception is not None:
-            raise saved_exception
+        try:
+            for prefix, process in processes:
+                process.wait()
+                images += _load_images_from_folder(output_folder, prefix, "png")
+        finally:
+            # the rest are not needed once one fails
+            for _, process in processes:
+                process.kill()
 
         return images
     finally:
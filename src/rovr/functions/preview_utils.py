@@ -1,10 +1,19 @@
+import contextlib
+import math
 import multiprocessing
-from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
-from multiprocessing.connection import Connection
+import os
+import sys
+from collections import OrderedDict
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
 
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
 from PIL.Image import Image as PILImage
+from textual_image._terminal import TerminalError, get_cell_size
 
+from rovr.classes.preview_cache import PreviewCache
+from rovr.classes.resample_pool import ResamplePool
+from rovr.classes.shared_memory_pool import SharedMemoryPool
 from rovr.functions.utils import should_cancel
 from rovr.variables.constants import config
 
@@ -17,6 +26,9 @@ RESAMPLING_METHOD = {
     "hamming": Image.Resampling.HAMMING,
 }.get(config["interface"]["image_viewer"]["resampling"], Image.Resampling.NEAREST)
 MAX_SIZE: tuple[int, int] = tuple(config["interface"]["image_viewer"]["max_size"])  # ty: ignore
+preview_cache = PreviewCache(
+    config["settings"]["cache"]["previews_max_memory"] * 1024 * 1024
+)
 
 
 def _depalette(image: Image.Image) -> Image.Image:
@@ -30,103 +42,282 @@ def _depalette(image: Image.Image) -> Image.Image:
     return image
 
 
-def resample_worker(
-    args: tuple[bytes, str, tuple[int, int], tuple[int, int], int],
-) -> tuple[bytes, str, tuple[int, int]]:
-    """Resample an image from raw pixel bytes.
+def preview_pixel_size(width: int, height: int) -> tuple[int, int]:
+    """Get the pixel size an image needs to fill a preview.
+
+    Args:
+        width (int): The width of the preview, in cells
+        height (int): The height of the preview, in cells
 
     Returns:
-        Tuple containing resampled image bytes, mode, and size.
+        The size in pixels, capped to MAX_SIZE, or MAX_SIZE if the preview has no size yet.
     """
-    image_data, image_mode, image_size, max_sz, resample_method = args
-    img = Image.frombytes(image_mode, image_size, image_data)
-    img.thumbnail(max_sz, resample=Image.Resampling(resample_method))
-    return (img.tobytes(), img.mode, img.size)
+    if width <= 0 or height <= 0:
+        return MAX_SIZE
+    try:
+        cell_size = get_cell_size()
+    except TerminalError:
+        return MAX_SIZE
+    return (
+        max(1, min(MAX_SIZE[0], width * cell_size.width)),
+        max(1, min(MAX_SIZE[1], height * cell_size.height)),
+    )
+
+
+# pixels are copied into segments about this many bytes at a time
+STRIP_SIZE = 1024 * 1024
+# mode, size and length of the pixel data written to the segment, with the pixel
+# data itself instead if it did not fit
+SharedImage = tuple[str, tuple[int, int], int, bytes | None]
+
+
+def _close_segment(segment: SharedMemory) -> None:
+    # an image may still map the segment if the worker failed, and it is
+    # unmapped once that image is freed instead
+    with contextlib.suppress(BufferError):
+        segment.close()
+
+
+def _row_length(img: Image.Image) -> int:
+    return len(img.crop((0, 0, img.width, 1)).tobytes())
+
+
+def _copy_to_segment(img: Image.Image, segment: SharedMemory) -> int | None:
+    """Copy an image's pixels into a segment, a strip of rows at a time.
+
+    Going through strips avoids building the whole image as bytes first.
+
+    Returns:
+        The length of the pixel data, or None if it does not fit.
+    """
+    width, height = img.size
+    row_length = _row_length(img)
+    if row_length * height > segment.size:
+        return None
+    rows = max(1, STRIP_SIZE // max(row_length, 1))
+    buffer = SharedMemoryPool.buffer(segment)
+    offset = 0
+    for top in range(0, height, rows):
+        data = img.crop((0, top, width, min(height, top + rows))).tobytes()
+        buffer[offset : offset + len(data)] = data
+        offset += len(data)
+    return offset
 
 
-def resample_bytes_worker(
-    conn: Connection,
-    image_data: bytes,
+def _write_shared(img: Image.Image, segment: SharedMemory) -> SharedImage:
+    length = _copy_to_segment(img, segment)
+    if length is None:
+        data = img.tobytes()
+        return (img.mode, img.size, len(data), data)
+    return (img.mode, img.size, length, None)
+
+
+def resample_worker(
+    segment_name: str,
     image_mode: str,
     image_size: tuple[int, int],
     max_sz: tuple[int, int],
     resample_method: int,
-) -> None:
-    """Resample an image from raw pixel bytes."""
+) -> SharedImage:
+    """Resample an image held in a shared memory segment, in place.
+
+    Returns:
+        The mode, size and length of the resampled image.
+    """
+    segment = SharedMemoryPool.attach(segment_name)
     try:
-        conn.send(
-            resample_worker((
-                image_data,
-                image_mode,
-                image_size,
-                max_sz,
-                resample_method,
-            ))
+        # pillow reads any buffer, its stubs only allow bytes
+        img = Image.frombuffer(
+            image_mode,
+            image_size,
+            SharedMemoryPool.buffer(segment),  # ty: ignore[invalid-argument-type]
+            "raw",
+            image_mode,
+            0,
+            1,
         )
-    except Exception as exc:
-        conn.send(exc)
+        img.thumbnail(max_sz, resample=Image.Resampling(resample_method))
+        if img.size == image_size:
+            # already small enough, so the segment holds the result as is
+            return (image_mode, image_size, _row_length(img) * img.height, None)
+        # the result is never larger than the source, so it always fits
+        return _write_shared(img, segment)
     finally:
-        conn.close()
+        img = None
+        _close_segment(segment)
 
 
 def resample_file_worker(
-    conn: Connection,
     file_path: str,
+    segment_name: str,
     max_size: tuple[int, int],
     resample_method: int,
-) -> None:
-    """Open a file, resample it, and send the result back."""
-    try:
-        with Image.open(file_path) as img:
-            img.load()
-            pil = img.copy()
-        pil = _depalette(pil)
+) -> SharedImage:
+    """Open a file and resample it into a shared memory segment.
+
+    Returns:
+        The mode, size and length of the resampled image.
+    """
+    with Image.open(file_path) as img:
+        pil = _depalette(img)
+        # thumbnail decodes JPEGs at a reduced scale with draft, and reduces
+        # other formats before resampling, but only if nothing is loaded yet
         pil.thumbnail(max_size, resample=Image.Resampling(resample_method))
-        conn.send((pil.tobytes(), pil.mode, pil.size))
-    except Exception as exc:
-        conn.send(exc)
+        # it doesn't load images that are already small enough
+        pil.load()
+    segment = SharedMemoryPool.attach(segment_name)
+    try:
+        return _write_shared(pil, segment)
+    finally:
+        _close_segment(segment)
+
+
+def render_font_worker(
+    file_path: str,
+    segment_name: str,
+    text: str,
+    canvas_size: tuple[int, int],
+    mode: str,
+    background: tuple[int, ...],
+    fill: tuple[int, ...],
+) -> SharedImage:
+    """Draw text centered on a canvas with a font file, into a shared memory segment.
+
+    Returns:
+        The mode, size and length of the image.
+
+    Raises:
+        OSError: If the font cannot be loaded
+    """  # noqa: DOC502
+    img = Image.new(mode, canvas_size, color=background)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.truetype(file_path, size=40)
+    # used for centering
+    bbox = draw.multiline_textbbox((0, 0), text, font=font)
+    text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    width, height = img.size
+
+    draw.multiline_text(
+        (
+            (width - text_width) // 2 - bbox[0],
+            (height - text_height) // 2 - bbox[1],
+        ),
+        text,
+        font=font,
+        fill=fill,
+    )
+    segment = SharedMemoryPool.attach(segment_name)
+    try:
+        return _write_shared(img, segment)
     finally:
-        conn.close()
+        _close_segment(segment)
+
+
+# documents a resample process keeps open for the next page, by path and mtime
+_pdfium_documents: OrderedDict[tuple[str, int], Any] = OrderedDict()
+PDFIUM_MAX_DOCUMENTS = 2
 
 
-def _await_resample_process(
-    proc: multiprocessing.Process,
-    parent_conn: multiprocessing.connection.Connection,
-) -> tuple[bytes, str, tuple[int, int]] | None:
-    """Wait for a resample subprocess, checking for worker cancellation.
+def _open_pdfium_document(pdf_path: str, mtime_ns: int) -> Any:
+    """Open a PDF with pypdfium2, reusing the document from earlier pages.
 
     Returns:
-        Raw image data tuple, or None if cancelled/failed.
+        The `pypdfium2.PdfDocument`.
     """
+    import pypdfium2
+
+    key = (pdf_path, mtime_ns)
+    document = _pdfium_documents.pop(key, None)
+    if document is None:
+        if sys.platform == "win32":
+            # an open file cannot be deleted on windows, so keep a copy instead
+            with open(pdf_path, "rb") as file:
+                document = pypdfium2.PdfDocument(file.read())
+        else:
+            document = pypdfium2.PdfDocument(pdf_path)
+    _pdfium_documents[key] = document
+    while len(_pdfium_documents) > PDFIUM_MAX_DOCUMENTS:
+        _, evicted = _pdfium_documents.popitem(last=False)
+        evicted.close()
+    return document
+
+
+def pdfium_info_worker(pdf_path: str, mtime_ns: int) -> dict[str, str | int]:
+    """Read the page count and first page size of a PDF with pypdfium2.
+
+    Returns:
+        The same keys that `get_pdf_info` uses from pdfinfo.
+    """
+    document = _open_pdfium_document(pdf_path, mtime_ns)
+    page = document[0]
     try:
-        while proc.is_alive():
-            if should_cancel():
-                proc.kill()
-                proc.join()
-                return None
-            if parent_conn.poll(0.2):
-                result = parent_conn.recv()
-                proc.join()
-                if isinstance(result, Exception):
-                    raise result
-                return result
-        proc.join()
-        if parent_conn.poll(0):
-            result = parent_conn.recv()
-            if isinstance(result, Exception):
-                raise result
-            return result
-        return None
-    except (EOFError, BrokenPipeError, ConnectionResetError):
-        if proc.is_alive():
-            proc.kill()
-        proc.join()
-        return None
+        # already rotated, so there is no rotation left to report
+        width, height = page.get_size()
     finally:
-        parent_conn.close()
-        if proc.is_alive():
-            proc.kill()
-            proc.join()
+        page.close()
+    return {
+        "Pages": len(document),
+        "Page size": f"{width} x {height} pts",
+        "Page rot": "0",
+    }
+
+
+def _pdfium_scale(
+    width: float, height: float, scale_to: tuple[int, int] | None
+) -> float:
+    # same as poppler's -scale-to-x/-scale-to-y, or -r 200 without them
+    if scale_to is None:
+        return 200 / 72
+    if scale_to[0] == -1:
+        return scale_to[1] / height
+    return scale_to[0] / width
+
+
+def pdfium_page_sizes_worker(
+    pdf_path: str, mtime_ns: int, page_indexes: list[int]
+) -> list[tuple[float, float]]:
+    """Read the size of PDF pages with pypdfium2.
+
+    Returns:
+        The width and height of each page, in points.
+    """
+    document = _open_pdfium_document(pdf_path, mtime_ns)
+    sizes: list[tuple[float, float]] = []
+    for page_index in page_indexes:
+        page = document[page_index]
+        try:
+            sizes.append(page.get_size())
+        finally:
+            page.close()
+    return sizes
+
+
+def pdfium_render_worker(
+    pdf_path: str,
+    mtime_ns: int,
+    page_index: int,
+    scale_to: tuple[int, int] | None,
+    segment_name: str,
+) -> SharedImage:
+    """Render a PDF page with pypdfium2 into a shared memory segment.
+
+    Returns:
+        The mode, size and length of the page.
+    """
+    document = _open_pdfium_document(pdf_path, mtime_ns)
+    page = document[page_index]
+    try:
+        width, height = page.get_size()
+        pil = page.render(
+            scale=_pdfium_scale(width, height, scale_to), rev_byteorder=True
+        ).to_pil()
+    finally:
+        page.close()
+    segment = SharedMemoryPool.attach(segment_name)
+    try:
+        return _write_shared(pil, segment)
+    finally:
+        _close_segment(segment)
 
 
 def _get_resample_pool_size(batch_size: int) -> int:
@@ -137,118 +328,251 @@ def _get_resample_pool_size(batch_size: int) -> int:
     return max(1, min(batch_size, poppler_threads, cpu_count))
 
 
-def _await_resample_futures(
-    executor: ProcessPoolExecutor,
-    futures: dict[Future[tuple[bytes, str, tuple[int, int]]], int],
-) -> list[tuple[bytes, str, tuple[int, int]]]:
-    pending: set[Future[tuple[bytes, str, tuple[int, int]]]] = set(futures)
-    ordered_results: list[tuple[bytes, str, tuple[int, int]] | None] = [None] * len(
-        futures
-    )
+# shared by every preview, so processes are started once instead of per image
+resample_pool = ResamplePool(_get_resample_pool_size(multiprocessing.cpu_count()))
+# pixels cross into and out of the pool through these, instead of being pickled.
+# two segments at the largest preview size are kept, more are made as needed
+shared_memory_pool = SharedMemoryPool(
+    2 * SharedMemoryPool.segment_size(MAX_SIZE[0] * MAX_SIZE[1] * 4)
+)
 
-    try:
-        while pending:
-            if should_cancel():
-                raise RuntimeError("PDF page resampling was cancelled.")
-            done, pending = wait(
-                pending,
-                timeout=0.2,
-                return_when=FIRST_COMPLETED,
-            )
-            for future in done:
-                ordered_results[futures[future]] = future.result()
-    except Exception:
-        for future in pending:
-            future.cancel()
-        executor.shutdown(wait=False, cancel_futures=True)
-        raise
-
-    executor.shutdown(wait=True)
-    results: list[tuple[bytes, str, tuple[int, int]]] = []
-    for result in ordered_results:
-        if result is None:
-            raise RuntimeError("Failed to collect all PDF resample results.")
-        results.append(result)
-    return results
 
+def _share(image: Image.Image) -> SharedMemory:
+    """Copy an image's pixels into a segment from the pool.
+
+    Returns:
+        The segment, which must be released back to the pool.
+    """
+    segment = shared_memory_pool.acquire(_row_length(image) * image.height)
+    _copy_to_segment(image, segment)
+    return segment
+
+
+def _unshare(result: SharedImage, segment: SharedMemory) -> Image.Image:
+    """Copy a worker's result out of its segment.
+
+    Returns:
+        The image, which no longer depends on the segment.
+    """
+    mode, size, length, data = result
+    if data is not None:
+        return Image.frombytes(mode, size, data)
+    with SharedMemoryPool.buffer(segment)[:length] as view:
+        return Image.frombytes(mode, size, view)
+
+
+def resample_batch(
+    images: list[PILImage], max_size: tuple[int, int] = MAX_SIZE
+) -> list[PILImage]:
+    """Resample a batch of images in parallel in the resample pool.
 
-def resample_batch(images: list[PILImage]) -> list[PILImage]:
+    Images that already fit are returned as they are, without a round trip.
+
+    Args:
+        images (list[PILImage]): The images to resample
+        max_size (tuple[int, int]): The size to fit the images in
+
+    Returns:
+        The resampled images, in order.
+
+    Raises:
+        RuntimeError: If the worker was cancelled or a resample process died.
+    """
     if len(images) == 0:
         return []
     if should_cancel():
         raise RuntimeError("PDF page resampling was cancelled.")
 
-    payloads = []
-    for image in images:
-        image = _depalette(image)
-        payloads.append((
-            image.tobytes(),
-            image.mode,
-            image.size,
-            MAX_SIZE,
-            int(RESAMPLING_METHOD),
-        ))
-    executor = ProcessPoolExecutor(max_workers=_get_resample_pool_size(len(payloads)))
+    images = [_depalette(image) for image in images]
+    oversized = [
+        index
+        for index, image in enumerate(images)
+        if image.width > max_size[0] or image.height > max_size[1]
+    ]
+    if not oversized:
+        return images
+    segments: list[SharedMemory] = []
+    try:
+        payloads = []
+        for index in oversized:
+            image = images[index]
+            segments.append(_share(image))
+            payloads.append((
+                segments[-1].name,
+                image.mode,
+                image.size,
+                max_size,
+                int(RESAMPLING_METHOD),
+            ))
+        results = resample_pool.map(resample_worker, payloads, should_cancel)
+        if results is None:
+            if should_cancel():
+                raise RuntimeError("PDF page resampling was cancelled.")
+            raise RuntimeError("Failed to collect all PDF resample results.")
+        for index, result, segment in zip(oversized, results, segments, strict=True):
+            images[index] = _unshare(result, segment)
+        return images
+    finally:
+        for segment in segments:
+            shared_memory_pool.release(segment)
+
+
+def get_pdfium_info(pdf_path: str) -> dict[str, str | int]:
+    """Read a PDF's page count and first page size in the resample pool.
+
+    Returns:
+        The same keys that `get_pdf_info` uses from pdfinfo.
+
+    Raises:
+        RuntimeError: If the worker was cancelled or the process died.
+        pypdfium2.PdfiumError: If the PDF cannot be opened
+    """  # noqa: DOC502
+    result = resample_pool.run(
+        pdfium_info_worker,
+        (pdf_path, os.stat(pdf_path).st_mtime_ns),
+        should_cancel,
+    )
+    if result is None:
+        raise RuntimeError("Reading the PDF was cancelled.")
+    return result
+
+
+def render_pdfium_pages(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    scale_to: tuple[int, int] | None,
+) -> list[PILImage]:
+    """Render PDF pages with pypdfium2, spread over the resample pool.
+
+    Each process keeps the document open, so turning pages never parses it again.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        first_page (int): First page (1-indexed)
+        last_page (int): Last page (1-indexed, inclusive)
+        scale_to (tuple[int, int] | None): See `get_pdf_images`
+
+    Returns:
+        The rendered pages, in order.
+
+    Raises:
+        RuntimeError: If the worker was cancelled or a process died.
+        pypdfium2.PdfiumError: If the PDF cannot be rendered
+    """  # noqa: DOC502
+    mtime_ns = os.stat(pdf_path).st_mtime_ns
+    pages = range(first_page - 1, last_page)
+    # the document stays open in the pool, so this is only a quick round trip
+    sizes = resample_pool.run(
+        pdfium_page_sizes_worker, (pdf_path, mtime_ns, list(pages)), should_cancel
+    )
+    if sizes is None:
+        raise RuntimeError("PDF page rendering was cancelled.")
+    segments: list[SharedMemory] = []
     try:
-        futures = {
-            executor.submit(resample_worker, payload): index
-            for index, payload in enumerate(payloads)
-        }
-    except Exception:
-        executor.shutdown(wait=False, cancel_futures=True)
-        raise
-    results = _await_resample_futures(executor, futures)
-    return [Image.frombytes(mode, size, data) for data, mode, size in results]
+        for width, height in sizes:
+            # pypdfium2 rounds the rendered size up, at most 4 bytes a pixel
+            scale = _pdfium_scale(width, height, scale_to)
+            segments.append(
+                shared_memory_pool.acquire(
+                    math.ceil(width * scale) * math.ceil(height * scale) * 4
+                )
+            )
+        results = resample_pool.map(
+            pdfium_render_worker,
+            [
+                (pdf_path, mtime_ns, page, scale_to, segment.name)
+                for page, segment in zip(pages, segments, strict=True)
+            ],
+            should_cancel,
+        )
+        if results is None:
+            raise RuntimeError("PDF page rendering was cancelled.")
+        return [
+            _unshare(result, segment)
+            for result, segment in zip(results, segments, strict=True)
+        ]
+    finally:
+        for segment in segments:
+            shared_memory_pool.release(segment)
 
 
 def resample(image: Image.Image) -> Image.Image:
-    """Resample an in-memory image in a subprocess that can be killed.
+    """Resample an in-memory image in the resample pool.
 
     Returns:
         The resampled image, or the original if cancelled.
     """
     image = _depalette(image)
-    parent_conn, child_conn = multiprocessing.Pipe()
-    proc = multiprocessing.Process(
-        target=resample_bytes_worker,
-        args=(
-            child_conn,
-            image.tobytes(),
-            image.mode,
-            image.size,
-            MAX_SIZE,
-            int(RESAMPLING_METHOD),
-        ),
-    )
-    proc.start()
-    child_conn.close()
+    segment = _share(image)
+    try:
+        result = resample_pool.run(
+            resample_worker,
+            (segment.name, image.mode, image.size, MAX_SIZE, int(RESAMPLING_METHOD)),
+            should_cancel,
+        )
+        if result is None:
+            return image
+        return _unshare(result, segment)
+    finally:
+        shared_memory_pool.release(segment)
 
-    result = _await_resample_process(proc, parent_conn)
-    if result is None:
-        return image
-    data, mode, size = result
-    return Image.frombytes(mode, size, data)
 
+def resample_file(
+    file_path: str, max_size: tuple[int, int] = MAX_SIZE
+) -> Image.Image | None:
+    """Open and resample an image file in the resample pool.
 
-def resample_file(file_path: str) -> Image.Image | None:
-    """Open and resample an image file in a Process.
+    Args:
+        file_path (str): The path to the image
+        max_size (tuple[int, int]): The size to fit the image in, see `preview_pixel_size`
 
     Returns:
         The resampled image, or None if the worker was cancelled.
 
     Raises:
         Same exceptions as Image.open (UnidentifiedImageError, etc.).
-    """
-    parent_conn, child_conn = multiprocessing.Pipe()
-    proc = multiprocessing.Process(
-        target=resample_file_worker,
-        args=(child_conn, file_path, MAX_SIZE, int(RESAMPLING_METHOD)),
-    )
-    proc.start()
-    child_conn.close()
+    """  # noqa: DOC502
+    # the result fits in max_size, at no more than 4 bytes per pixel
+    segment = shared_memory_pool.acquire(max_size[0] * max_size[1] * 4)
+    try:
+        result = resample_pool.run(
+            resample_file_worker,
+            (file_path, segment.name, max_size, int(RESAMPLING_METHOD)),
+            should_cancel,
+        )
+        if result is None:
+            return None
+        return _unshare(result, segment)
+    finally:
+        shared_memory_pool.release(segment)
 
-    result = _await_resample_process(proc, parent_conn)
-    if result is None:
-        return None
-    data, mode, size = result
-    return Image.frombytes(mode, size, data)
+
+def render_font(
+    file_path: str,
+    text: str,
+    canvas_size: tuple[int, int],
+    mode: str,
+    background: tuple[int, ...],
+    fill: tuple[int, ...],
+) -> Image.Image | None:
+    """Draw a font sample in the resample pool.
+
+    Returns:
+        The sample, or None if the worker was cancelled.
+
+    Raises:
+        OSError: If the font cannot be loaded
+    """  # noqa: DOC502
+    segment = shared_memory_pool.acquire(canvas_size[0] * canvas_size[1] * 4)
+    try:
+        result = resample_pool.run(
+            render_font_worker,
+            (file_path, segment.name, text, canvas_size, mode, background, fill),
+            should_cancel,
+        )
+        if result is None:
+            return None
+        return _unshare(result, segment)
+    finally:
+        shared_memory_pool.release(segment)
@@ -206,13 +206,14 @@ class classproperty:  # noqa: N801
 
 
 async def is_archive(path_str: str) -> bool:
-    from rovr.classes.archive import Archive
+    from rovr.classes.archive import sniff_archive
 
+    # only sniffs the magic bytes, the archive is opened once it is actually used
     try:
-        with Archive(path_str) as _:
-            return True
-    except Exception:
+        sniffed = sniff_archive(path_str)
+    except OSError:
         return False
+    return sniffed.format is not None and not sniffed.encrypted
 
 
 def get_shortest_bind(binds: list[str]) -> str: